@@ -1 +1,9 @@
-from . import agent
\ No newline at end of file
+import importlib
+
+
+# 'adk web' and 'adk run' load the root agent from 'agent.root_agent'. The submodule is imported on first
+# access, so importing the package, or a tool module from it, does not import ADK or build any agent.
+def __getattr__(name: str):
+    if name == "agent":
+        return importlib.import_module(".agent", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,14 +1,21 @@
-from google.adk.agents import LlmAgent
-from google.adk.tools import agent_tool
+import logging
+import threading
 
-from .identify_ticker_agent import identify_ticker
-from .ticker_price_agent import ticker_price
-from .ticker_price_change_agent import ticker_price_change
-from .ticker_news_agent import ticker_news
-from .ticker_analysis_agent import ticker_analysis
+from .config import getenv
+from .registry import get_agent_tool
+from .tracing import configure_tracing
+from .identify_ticker_agent import get_ticker_async
+from .ticker_price_agent import get_ticker_price_async, get_ticker_prices_async, resolve_and_quote_async
+from .ticker_price_change_agent import get_ticker_price_change_async
+
+logger = logging.getLogger(__name__)
 
 MODEL_GEMINI_1_5_FLASH = "gemini-1.5-flash"
 
+# When enabled, the root agent calls the data-fetch tools directly instead of going through
+# the identify, price and price change sub-agents, saving two model calls per lookup.
+FAST_PATH = getenv("STOCK_AGENT_FAST_PATH", "false").lower() in ("1", "true", "yes")
+
 # NOTE:
 # Instead of registering sub-agents using the `sub_agents` parameter, each specialized agent
 # is wrapped as a tool using `AgentTool` and passed to the root agent via the `tools` parameter.
@@ -23,43 +30,110 @@ MODEL_GEMINI_1_5_FLASH = "gemini-1.5-flash"
 # retain control of the conversation, and coordinate multiple tools in a single interaction.
 #
 # This design enables proper multi-agent collaboration while preserving modularity.
+#
+# The sub-agents and their AgentTool wrappers are created on first use by 'registry.get_agent_tool',
+# and the root agent on first access of 'root_agent', so importing the package stays cheap.
 
-identify_ticker_tool = agent_tool.AgentTool(agent=identify_ticker)
-ticker_price_tool = agent_tool.AgentTool(agent=ticker_price)
-ticker_price_change_tool = agent_tool.AgentTool(agent=ticker_price_change)
-ticker_news_tool = agent_tool.AgentTool(agent=ticker_news)
-ticker_analysis_tool = agent_tool.AgentTool(agent=ticker_analysis)
+ROOT_AGENT_DESCRIPTION = (
+    "Main Stock Analysis Agent that coordinates a team of specialized sub-agents to provide stock information. "
+)
 
-# Create the root agent that coordinates the specialized sub-agents
-root_agent = LlmAgent(
-    name="stock_analysis_agent",
-    model=MODEL_GEMINI_1_5_FLASH,
-    description=(
-        "Main Stock Analysis Agent that coordinates a team of specialized sub-agents to provide stock information. "
-    ),
-    instruction="You are the main Stock Analysis Agent coordinating a team of sub-agents. Your primary responsibility is to provide Stock information. "
-                "You have specialized sub-agents: "
-                "1. 'identify_ticker_agent': Handles identifying stock ticker symbols for companies. Delegate to it for any query related to identifying a ticker symbol, and use it for further tasks."
-                "2. 'ticker_price_agent': Retrieves the current stock price for a specified ticker symbol. Delegate to it for any query related to retrieving stock prices."
-                "3. 'ticker_price_change_agent': Retrieves the stock price change for a specified ticker symbol over a given number of days. Delegate to it for any query related to retrieving stock price changes."
-                "4. 'ticker_news_agent': Retrieves the latest news articles for a specified ticker symbol. Delegate to it for any query related to retrieving stock news."
-                "5. 'ticker_analysis_agent': Analyzes stock ticker symbols by retrieving the latest news articles and price changes for a specified ticker symbol. Delegate to it for any query related to analyzing stock tickers. Use it to provide comprehensive insights on stock performance, including news and price changes and answer questions like 'What is the current status of the stock?' and 'Why has the stock price changed over the last 7 days?'."
-                "You will receive user queries that may require the use of multiple sub-agents to gather the necessary information."
-                "Based on the user's request, make a step by step plan to gather the required information using these sub-agents."
-                "Then carefully delegate tasks to the appropriate sub-agents based on the user's request."
-                "You may have to use multiple sub-agents to complete a task, so ensure you manage the flow of information effectively."
-                "Remember to provide clear instructions to the sub-agents and handle their responses appropriately, for further delegation to the next sub-agent or to the user."
-                "For example, if a user asks 'what is the current price of tesla stock?'"
-                "The following steps should be taken:"
-                "1. First identify the company name or keyword from the user query, which in this case is 'tesla'."
-                "2. Identify the ticker symbol for 'tesla' using the 'identify_ticker_agent'."
-                "3. Once the ticker symbol is identified, retrieve the current stock price using the 'ticker_price_agent'."
-                "If a sub-agent fails to provide the required information, handle the error gracefully and inform the user."
-                "Ensure that you provide only the final comprehensive response to the user based on the information gathered from the sub-agents. No need for internal conversation or task management details in the final response."
-                "Remember that you can only use these sub-agents for the stock related user queries, do not use any other information or tools outside of these sub-agents."
-                "For anything else, respond appropriately or state you cannot handle it."
-                "NOTE: ALWAYS RETURN BACK TO THE ROOT AGENT AFTER FINALLY COMPLETING THE TASK, SO THAT IT CAN PROVIDE THE FINAL RESPONSE TO THE USER.",
-    # sub_agents=[identify_ticker, ticker_price, ticker_price_change],
-    tools=[identify_ticker_tool, ticker_price_tool, ticker_price_change_tool, ticker_news_tool, ticker_analysis_tool],
+ROOT_AGENT_INSTRUCTION = (
+    "You are the main Stock Analysis Agent coordinating a team of sub-agents. Your primary responsibility is to provide Stock information. "
+    "You have specialized sub-agents: "
+    "1. 'identify_ticker_agent': Handles identifying stock ticker symbols for companies. Delegate to it for any query related to identifying a ticker symbol, and use it for further tasks."
+    "2. 'ticker_price_agent': Retrieves the current stock price for a specified ticker symbol. Delegate to it for any query related to retrieving stock prices."
+    "3. 'ticker_price_change_agent': Retrieves the stock price change for a specified ticker symbol over a given number of days. Delegate to it for any query related to retrieving stock price changes."
+    "4. 'ticker_news_agent': Retrieves the latest news articles for a specified ticker symbol. Delegate to it for any query related to retrieving stock news."
+    "5. 'ticker_analysis_agent': Analyzes stock ticker symbols by retrieving the latest news articles and price changes for a specified ticker symbol. Delegate to it for any query related to analyzing stock tickers. Use it to provide comprehensive insights on stock performance, including news and price changes and answer questions like 'What is the current status of the stock?' and 'Why has the stock price changed over the last 7 days?'. It can also compare several ticker symbols in a single call, so pass all of them at once for questions like 'Compare NVDA, AMD and INTC'."
+    "You also have the 'get_ticker_prices_async' tool, which retrieves the current prices of a list of ticker symbols in a single call. Use it for watchlist or portfolio queries like 'Prices of AAPL, MSFT and NVDA', instead of delegating each ticker symbol to 'ticker_price_agent'."
+    "You will receive user queries that may require the use of multiple sub-agents to gather the necessary information."
+    "Based on the user's request, make a step by step plan to gather the required information using these sub-agents."
+    "Then carefully delegate tasks to the appropriate sub-agents based on the user's request."
+    "You may have to use multiple sub-agents to complete a task, so ensure you manage the flow of information effectively."
+    "Remember to provide clear instructions to the sub-agents and handle their responses appropriately, for further delegation to the next sub-agent or to the user."
+    "For example, if a user asks 'what is the current price of tesla stock?'"
+    "The following steps should be taken:"
+    "1. First identify the company name or keyword from the user query, which in this case is 'tesla'."
+    "2. Identify the ticker symbol for 'tesla' using the 'identify_ticker_agent'."
+    "3. Once the ticker symbol is identified, retrieve the current stock price using the 'ticker_price_agent'."
+    "If a sub-agent fails to provide the required information, handle the error gracefully and inform the user."
+    "Ensure that you provide only the final comprehensive response to the user based on the information gathered from the sub-agents. No need for internal conversation or task management details in the final response."
+    "Remember that you can only use these sub-agents for the stock related user queries, do not use any other information or tools outside of these sub-agents."
+    "For anything else, respond appropriately or state you cannot handle it."
+    "NOTE: ALWAYS RETURN BACK TO THE ROOT AGENT AFTER FINALLY COMPLETING THE TASK, SO THAT IT CAN PROVIDE THE FINAL RESPONSE TO THE USER."
 )
-print(f"Agent '{root_agent.name}' created successfully.")
\ No newline at end of file
+
+FAST_PATH_INSTRUCTION = (
+    "You are the main Stock Analysis Agent. Your primary responsibility is to provide Stock information. "
+    "You have the following tools: "
+    "1. 'resolve_and_quote_async': Identifies the ticker symbol for a company name and retrieves its current stock price in a single call. Use it for any query about the current price of a company's stock."
+    "2. 'get_ticker_async': Identifies the ticker symbol, company name and currency for a company name or keyword. Use it first whenever another tool needs a ticker symbol."
+    "3. 'get_ticker_price_async': Retrieves the current stock price for a ticker symbol."
+    "4. 'get_ticker_prices_async': Retrieves the current stock prices for a list of ticker symbols in a single call. Use it for watchlist or portfolio queries with several ticker symbols."
+    "5. 'get_ticker_price_change_async': Retrieves the stock price change for a ticker symbol over a given number of days. Example: 1 for today, 7 for a week, 30 for a month, etc."
+    "6. 'ticker_news_agent': Retrieves and summarises the latest news articles for a ticker symbol. Use it for any query related to stock news."
+    "7. 'ticker_analysis_agent': Analyzes stock ticker symbols by retrieving the latest news articles and price changes. Use it to answer questions like 'What is the current status of the stock?' and 'Why has the stock price changed over the last 7 days?'. It can also compare several ticker symbols in a single call."
+    "For example, if a user asks 'what is the current price of tesla stock?', call 'resolve_and_quote_async' with the keyword 'tesla' and answer with the result."
+    "If a user asks 'how has nvidia changed over the last 7 days?', call 'get_ticker_async' with 'nvidia', then 'get_ticker_price_change_async' with the ticker symbol and 7 days."
+    "If a tool fails to provide the required information, handle the error gracefully and inform the user."
+    "Provide only the final comprehensive response to the user, without internal task management details."
+    "Remember that you can only use these tools for the stock related user queries, do not use any other information or tools."
+    "For anything else, respond appropriately or state you cannot handle it."
+)
+
+# Create the root agent that coordinates the specialized sub-agents
+def create_root_agent(fast_path: bool = FAST_PATH):
+    """Creates the root Stock Analysis Agent.
+
+    Args:
+        fast_path (bool): If True, the data-fetch tools are given to the root agent directly, and only the news and analysis
+            sub-agents, which need a model to summarise, are kept as sub-agent tools.
+
+    Returns:
+        LlmAgent: The root agent.
+    """
+
+    from google.adk.agents import LlmAgent
+
+    if fast_path:
+        tools = [resolve_and_quote_async, get_ticker_async, get_ticker_price_async, get_ticker_prices_async,
+                 get_ticker_price_change_async, get_agent_tool("ticker_news_agent"), get_agent_tool("ticker_analysis_agent")]
+        instruction = FAST_PATH_INSTRUCTION
+    else:
+        # sub_agents=[identify_ticker, ticker_price, ticker_price_change],
+        tools = [get_agent_tool("identify_ticker_agent"), get_agent_tool("ticker_price_agent"),
+                 get_agent_tool("ticker_price_change_agent"), get_agent_tool("ticker_news_agent"),
+                 get_agent_tool("ticker_analysis_agent"), get_ticker_prices_async]
+        instruction = ROOT_AGENT_INSTRUCTION
+
+    return LlmAgent(
+        name="stock_analysis_agent",
+        model=MODEL_GEMINI_1_5_FLASH,
+        description=ROOT_AGENT_DESCRIPTION,
+        instruction=instruction,
+        tools=tools,
+    )
+
+_root_agent = None
+_root_agent_lock = threading.Lock()
+
+
+def get_root_agent():
+    """Returns the root agent, creating it and its sub-agents on first use, and sets up tracing from TRACE_EXPORTER."""
+
+    global _root_agent
+    if _root_agent is None:
+        with _root_agent_lock:
+            if _root_agent is None:
+                configure_tracing()
+                _root_agent = create_root_agent()
+                logger.info("Agent '%s' created.", _root_agent.name)
+    return _root_agent
+
+
+# 'adk web' and 'adk run' look up 'agent.root_agent', which builds the agent graph on first access
+def __getattr__(name: str):
+    if name == "root_agent":
+        return get_root_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
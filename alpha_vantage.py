@@ -0,0 +1,372 @@
+import time
+import random
+import asyncio
+import threading
+import functools
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+from .config import getenv
+from .tracing import start_span
+from datetime import datetime, timedelta, timezone
+from .cache import TTLCache, seconds_until_market_close, last_market_close
+from .rate_limiter import RateLimiter, INTERACTIVE, BACKGROUND
+from .replay import open_cassette, CassetteMiss
+
+ALPHA_VANTAGE_API_KEY = getenv("ALPHA_VANTAGE_API_KEY")
+
+# Base URL of the Alpha Vantage query endpoint. Can be overridden to point at a local stub server.
+ALPHA_VANTAGE_URL = getenv("ALPHA_VANTAGE_URL", "https://www.alphavantage.co/query")
+
+# (connect, read) timeouts in seconds for every upstream request
+CONNECT_TIMEOUT = float(getenv("ALPHA_VANTAGE_CONNECT_TIMEOUT", "3.05"))
+READ_TIMEOUT = float(getenv("ALPHA_VANTAGE_READ_TIMEOUT", "10"))
+
+# Maximum number of keep-alive connections held open to the Alpha Vantage host
+POOL_SIZE = int(getenv("ALPHA_VANTAGE_POOL_SIZE", "16"))
+
+# Alpha Vantage call quota shared by every tool in the process. 0 disables a limit.
+CALLS_PER_MINUTE = int(getenv("ALPHA_VANTAGE_CALLS_PER_MINUTE", "5"))
+CALLS_PER_DAY = int(getenv("ALPHA_VANTAGE_CALLS_PER_DAY", "25"))
+
+# Maximum seconds a call waits in the rate limiter queue before giving up
+MAX_QUEUE_WAIT = float(getenv("ALPHA_VANTAGE_MAX_QUEUE_WAIT", "30"))
+
+# Retries after a throttle notice, with exponential backoff starting at BACKOFF_BASE seconds plus jitter
+MAX_RETRIES = int(getenv("ALPHA_VANTAGE_MAX_RETRIES", "3"))
+BACKOFF_BASE = float(getenv("ALPHA_VANTAGE_BACKOFF_BASE", "2"))
+
+# Queue priority of each function. Quotes and symbol lookups answer the user directly,
+# while daily series and news are larger and can wait behind them.
+PRIORITIES = {
+    "SYMBOL_SEARCH": INTERACTIVE,
+    "GLOBAL_QUOTE": INTERACTIVE,
+    "TIME_SERIES_DAILY": BACKGROUND,
+    "NEWS_SENTIMENT": BACKGROUND,
+}
+
+# Maximum number of responses kept in the in-process response cache. Set to 0 to disable caching.
+CACHE_SIZE = int(getenv("ALPHA_VANTAGE_CACHE_SIZE", "1024"))
+
+# Seconds each endpoint's responses stay fresh in the cache.
+# TIME_SERIES_DAILY is not listed, as daily bars only change at the next market close.
+CACHE_TTLS = {
+    "SYMBOL_SEARCH": float(getenv("ALPHA_VANTAGE_TTL_SYMBOL_SEARCH", str(3 * 24 * 60 * 60))),
+    "GLOBAL_QUOTE": float(getenv("ALPHA_VANTAGE_TTL_GLOBAL_QUOTE", "15")),
+    "NEWS_SENTIMENT": float(getenv("ALPHA_VANTAGE_TTL_NEWS_SENTIMENT", "300")),
+}
+
+# Seconds after a market close by which Alpha Vantage has published that day's daily bar. Until then, a daily
+# series fetched without it is cached for TTL_UNPUBLISHED_DAILY seconds only. A series fetched later still
+# without it is taken as complete, as after an exchange holiday.
+DAILY_BAR_DELAY = float(getenv("ALPHA_VANTAGE_DAILY_BAR_DELAY", str(2 * 60 * 60)))
+TTL_UNPUBLISHED_DAILY = float(getenv("ALPHA_VANTAGE_TTL_UNPUBLISHED_DAILY", "900"))
+
+
+class AlphaVantageError(Exception):
+    """Raised when a request to Alpha Vantage fails or returns an unusable response."""
+
+
+class AlphaVantageThrottled(AlphaVantageError):
+    """Raised when the Alpha Vantage call quota is exhausted and the call could not be made."""
+
+
+_session = None
+_session_lock = threading.Lock()
+
+# SQLite file through which worker processes share the response cache and the call quota, see shared_store.py.
+# Empty keeps both within the process.
+SHARED_STORE_PATH = getenv("SHARED_STORE_PATH", "")
+
+# Seconds a worker's lease on a shared cache key lasts, and so the longest other workers wait for its call before
+# making it themselves. It defaults to the longest a call can take: queueing for a token, connecting and reading.
+SHARED_STORE_LEASE_TIMEOUT = float(getenv("SHARED_STORE_LEASE_TIMEOUT", str(MAX_QUEUE_WAIT + CONNECT_TIMEOUT + READ_TIMEOUT)))
+
+if SHARED_STORE_PATH:
+    # Imported only when set, so single-process use does not pay for importing SQLAlchemy
+    from .shared_store import get_engine, SharedTTLCache, SharedRateLimiter
+    _engine = get_engine(SHARED_STORE_PATH)
+    # Cache of decoded responses, shared by all tools and, beyond this process's own LRU cache, by all workers
+    response_cache = SharedTTLCache(_engine, maxsize=CACHE_SIZE, lease_timeout=SHARED_STORE_LEASE_TIMEOUT) if CACHE_SIZE > 0 else TTLCache(maxsize=CACHE_SIZE)
+    # Limiter that queues upstream calls within the Alpha Vantage quota of all workers together
+    rate_limiter = SharedRateLimiter(_engine, CALLS_PER_MINUTE, CALLS_PER_DAY)
+else:
+    # Process-wide cache of decoded responses, shared by all tools
+    response_cache = TTLCache(maxsize=CACHE_SIZE)
+    # Process-wide limiter that queues upstream calls within the Alpha Vantage quota
+    rate_limiter = RateLimiter(CALLS_PER_MINUTE, CALLS_PER_DAY)
+
+# Worker threads for the async tool variants, sized to the connection pool rather than
+# to the CPU count like asyncio's default executor, as the work is network bound.
+_executor = ThreadPoolExecutor(max_workers=POOL_SIZE, thread_name_prefix="alpha_vantage")
+
+# Cassette upstream calls are recorded to or replayed from, set by ALPHA_VANTAGE_REPLAY_MODE. None makes real calls.
+cassette = open_cassette()
+
+
+def get_session() -> requests.Session:
+    """Returns the process-wide HTTP session shared by all Alpha Vantage tools.
+
+    The session keeps connections alive between calls, so repeated tool invocations
+    reuse the same TCP+TLS connection instead of paying a fresh handshake each time.
+    """
+
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def close_session() -> None:
+    """Closes the shared HTTP session and its pooled connections."""
+
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def use_cassette(new_cassette) -> None:
+    """Records upstream calls to, or replays them from, a 'replay.Cassette'. None goes back to real calls."""
+
+    global cassette
+    cassette = new_cassette
+
+
+# Keys Alpha Vantage uses in place of data for invalid calls and rate limit notices
+NOTICE_KEYS = ("Error Message", "Note", "Information")
+
+
+def cache_ttl(function: str, data: dict = None) -> float:
+    """Returns the number of seconds a response of the given Alpha Vantage function stays fresh.
+
+    Error and rate limit notices are returned with a status of 200, so they are never cached.
+    """
+
+    if data is not None and any(key in data for key in NOTICE_KEYS):
+        return 0.0
+    if function == "TIME_SERIES_DAILY":
+        dates = (data or {}).get("Time Series (Daily)") or {}
+        if includes_last_close(max(dates, default=""), datetime.now(timezone.utc)):
+            return seconds_until_market_close()
+        return min(TTL_UNPUBLISHED_DAILY, seconds_until_market_close())
+    return CACHE_TTLS.get(function, 0.0)
+
+
+def includes_last_close(last_date: str, fetched_at: datetime) -> bool:
+    """Returns whether daily bars fetched at 'fetched_at' are up to date with the most recent market close.
+
+    They are if they were fetched after that close and either end with its bar or were fetched
+    DAILY_BAR_DELAY seconds after it, by when the bar would have been published had the market opened.
+
+    Args:
+        last_date (str): Date of the last bar, as 'YYYY-MM-DD'. Empty if there are no bars.
+        fetched_at (datetime): Timezone-aware time the bars were fetched.
+    """
+
+    close = last_market_close()
+    if fetched_at < close:
+        return False
+    return last_date >= close.date().isoformat() or fetched_at >= close + timedelta(seconds=DAILY_BAR_DELAY)
+
+
+def cache_stats() -> dict:
+    """Returns the hit, miss, coalesced and eviction counters of the response cache."""
+
+    return response_cache.stats()
+
+
+def _throttle_notice(data: dict):
+    """Returns the rate limit notice in a payload, or None if it is not a rate limit notice."""
+
+    for key in ("Note", "Information"):
+        notice = data.get(key)
+        if isinstance(notice, str) and any(word in notice.lower() for word in ("rate limit", "call frequency", "per minute", "per day")):
+            return notice
+    return None
+
+
+# Wording of notices about calls made too close together. The free-tier burst notice also quotes the daily
+# limit ("...spread out your requests more sparingly (1 request per second)... 25 requests per day..."),
+# so it is told apart from the daily limit notice by these first.
+_BURST_WORDS = ("per second", "sparingly", "burst", "per minute")
+
+
+def _daily_limit_notice(notice: str) -> bool:
+    """Returns whether a rate limit notice says the daily quota is spent, rather than that calls came too fast."""
+
+    notice = notice.lower()
+    if any(word in notice for word in _BURST_WORDS):
+        return False
+    return "per day" in notice or "daily" in notice
+
+
+def fetch(function: str, *, priority: int = None, **params) -> dict:
+    """Calls an Alpha Vantage API function and returns the decoded JSON payload.
+
+    Responses are served from the response cache while fresh, and concurrent requests
+    for the same function and parameters share a single upstream call.
+
+    Args:
+        function (str): The Alpha Vantage function name. Example: 'GLOBAL_QUOTE', 'SYMBOL_SEARCH'.
+        priority (int): Rate limiter queue priority, INTERACTIVE or BACKGROUND. Defaults to the function's entry in PRIORITIES.
+        **params: Additional query parameters for the function, such as 'symbol' or 'keywords'.
+
+    Returns:
+        dict: The decoded JSON response. It may be shared with other callers and must not be mutated.
+
+    Raises:
+        AlphaVantageThrottled: If the call quota is exhausted and the call could not be made in time.
+        AlphaVantageError: If the request fails, times out or does not return valid JSON.
+    """
+
+    if priority is None:
+        priority = PRIORITIES.get(function, INTERACTIVE)
+    with start_span("alpha_vantage.fetch", **{"alpha_vantage.function": function}) as span:
+        if cache_ttl(function) <= 0:
+            span.set_attribute("alpha_vantage.cache", "bypass")
+            return _fetch_upstream(function, params, priority)
+
+        # The loader only runs on a miss; hits and requests coalesced onto another caller's load skip it
+        loaded = []
+
+        def load():
+            loaded.append(True)
+            return _fetch_upstream(function, params, priority)
+
+        key = (function, tuple(sorted(params.items())))
+        try:
+            return response_cache.get_or_load(key, load, lambda data: cache_ttl(function, data))
+        finally:
+            span.set_attribute("alpha_vantage.cache", "miss" if loaded else "hit")
+
+
+def _http_get(function: str, query: dict) -> requests.Response:
+    # A single upstream request, traced with its latency, status code and response size
+    with start_span("alpha_vantage.http", **{"alpha_vantage.function": function}) as span:
+        recorder = cassette
+        try:
+            if recorder is not None and recorder.mode == "replay":
+                response = recorder.replay(function, query)
+            else:
+                response = get_session().get(ALPHA_VANTAGE_URL, params=query, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+                if recorder is not None:
+                    recorder.record(function, query, response)
+        except CassetteMiss as e:
+            raise AlphaVantageError(str(e)) from e
+        except requests.RequestException as e:
+            raise AlphaVantageError(f"{function} request failed: {e}") from e
+        span.set_attribute("http.status_code", response.status_code)
+        span.set_attribute("http.response_bytes", len(response.content))
+
+    if response.status_code != 200:
+        raise AlphaVantageError(f"{function} request failed with status {response.status_code}.")
+    return response
+
+
+def _acquire(priority: int) -> bool:
+    # Replayed calls never reach Alpha Vantage, so they take no token from its quota
+    recorder = cassette
+    if recorder is not None and recorder.mode == "replay":
+        return True
+    return rate_limiter.acquire(priority, timeout=MAX_QUEUE_WAIT)
+
+
+def _fetch_upstream(function: str, params: dict, priority: int) -> dict:
+    query = {"function": function, **params, "apikey": ALPHA_VANTAGE_API_KEY}
+    with start_span("alpha_vantage.upstream", **{"alpha_vantage.function": function}) as span:
+        queue_wait = 0.0
+        for attempt in range(MAX_RETRIES + 1):
+            span.set_attribute("alpha_vantage.retries", attempt)
+            waiting_since = time.perf_counter()
+            acquired = _acquire(priority)
+            queue_wait += time.perf_counter() - waiting_since
+            span.set_attribute("alpha_vantage.queue_wait_ms", queue_wait * 1000)
+            if not acquired:
+                raise AlphaVantageThrottled(f"{function} request was not made, the Alpha Vantage call quota is exhausted.")
+
+            response = _http_get(function, query)
+            try:
+                data = response.json()
+            except ValueError as e:
+                raise AlphaVantageError(f"{function} returned an invalid JSON response.") from e
+
+            notice = _throttle_notice(data) if isinstance(data, dict) else None
+            if notice is None:
+                return data
+            span.add_event("throttle_notice", {"notice": notice})
+
+            # Retrying does not help once the daily quota is spent
+            if _daily_limit_notice(notice):
+                rate_limiter.exhaust_day()
+                break
+
+            # Hold back every caller, not just this one, with exponential backoff plus jitter
+            if attempt < MAX_RETRIES:
+                rate_limiter.pause(BACKOFF_BASE * 2 ** attempt + random.uniform(0, BACKOFF_BASE * 2 ** attempt))
+
+        raise AlphaVantageThrottled(f"{function} request was throttled by Alpha Vantage.")
+
+
+def fetch_csv(function: str, **params) -> str:
+    """Calls an Alpha Vantage API function that returns CSV, such as 'LISTING_STATUS', and returns the raw text.
+
+    CSV responses are not cached. Unless replayed, the call still takes a token from the rate limiter.
+
+    Raises:
+        AlphaVantageThrottled: If the call quota is exhausted or Alpha Vantage returned a rate limit notice.
+        AlphaVantageError: If the request fails or Alpha Vantage returned an error instead of CSV.
+    """
+
+    if not _acquire(BACKGROUND):
+        raise AlphaVantageThrottled(f"{function} request was not made, the Alpha Vantage call quota is exhausted.")
+
+    query = {"function": function, **params, "apikey": ALPHA_VANTAGE_API_KEY}
+    response = _http_get(function, query)
+
+    # Errors and notices are returned as JSON instead of CSV
+    if response.text.lstrip().startswith("{"):
+        data = response.json()
+        if _throttle_notice(data):
+            raise AlphaVantageThrottled(f"{function} request was throttled by Alpha Vantage.")
+        raise AlphaVantageError(f"{function} returned an error: {data}")
+    return response.text
+
+
+async def run_blocking(func, *args, **kwargs):
+    """Runs a blocking function on the Alpha Vantage worker threads and awaits its result.
+
+    Like 'asyncio.to_thread', the caller's context variables are propagated to the worker thread.
+    """
+
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, func, *args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(_executor, call)
+
+
+def submit_in_context(executor, func, *args, **kwargs):
+    """Submits a function to a thread pool to run with a copy of the caller's context variables.
+
+    Thread pools do not propagate context variables by themselves, so spans started by the
+    function would otherwise not be attached to the caller's trace.
+    """
+
+    return executor.submit(contextvars.copy_context().run, func, *args, **kwargs)
+
+
+async def fetch_async(function: str, **params) -> dict:
+    """Async variant of 'fetch' that runs the request on a worker thread.
+
+    The shared connection pool is still used, but the event loop is free to serve
+    other sessions while the request is in flight.
+    """
+
+    return await run_blocking(fetch, function, **params)
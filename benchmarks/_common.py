@@ -0,0 +1,136 @@
+"""Shared helpers for the benchmark scripts.
+
+The repository root is itself the agent package (as expected by 'adk web'), so the
+benchmarks import it by directory name after putting its parent on sys.path.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import importlib
+import threading
+import statistics
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE_NAME = os.path.basename(PACKAGE_DIR)
+
+
+def load_module(name: str = ""):
+    """Imports the agent package, or one of its submodules, by name."""
+
+    parent = os.path.dirname(PACKAGE_DIR)
+    if parent not in sys.path:
+        sys.path.insert(0, parent)
+    return importlib.import_module(f"{PACKAGE_NAME}.{name}" if name else PACKAGE_NAME)
+
+
+def use_stub(stub, **env) -> None:
+    """Points the Alpha Vantage client at a stub server, with the call quota disabled.
+
+    Must be called before the package is imported, as the client reads its settings at import.
+    Additional keyword arguments are set as environment variables.
+    """
+
+    os.environ["ALPHA_VANTAGE_URL"] = stub.url
+    os.environ["ALPHA_VANTAGE_CALLS_PER_MINUTE"] = "0"
+    os.environ["ALPHA_VANTAGE_CALLS_PER_DAY"] = "0"
+    os.environ.update({key: str(value) for key, value in env.items()})
+
+
+def make_payload(function: str, params: dict) -> dict:
+    """Builds a canned Alpha Vantage style response for the stub server."""
+
+    symbol = (params.get("symbol") or params.get("tickers") or params.get("keywords") or ["TEST"])[0].upper()
+    if function == "SYMBOL_SEARCH":
+        return {"bestMatches": [{"1. symbol": symbol, "2. name": f"{symbol} Inc", "8. currency": "USD"}]}
+    if function == "GLOBAL_QUOTE":
+        return {"Global Quote": {"01. symbol": symbol, "05. price": f"{random.uniform(10, 500):.4f}"}}
+    if function == "TIME_SERIES_DAILY":
+        # Ends today in New York, so the bars include the most recent close like a live response
+        series = {}
+        day = datetime.now(ZoneInfo("America/New_York")).date()
+        price = 100.0
+        while len(series) < 100:
+            if day.weekday() < 5:
+                price *= 1 + random.uniform(-0.02, 0.02)
+                series[day.isoformat()] = {
+                    "1. open": f"{price:.4f}", "2. high": f"{price * 1.01:.4f}", "3. low": f"{price * 0.99:.4f}",
+                    "4. close": f"{price:.4f}", "5. volume": str(random.randint(1_000_000, 5_000_000)),
+                }
+            day -= timedelta(days=1)
+        return {"Meta Data": {"2. Symbol": symbol}, "Time Series (Daily)": series}
+    if function == "NEWS_SENTIMENT":
+        return {
+            "sentiment_score_definition": "x <= -0.35: Bearish; -0.35 < x <= -0.15: Somewhat-Bearish; ...",
+            "feed": [{
+                "title": f"{symbol} headline {i}", "time_published": f"20250602T{i:02d}0000",
+                "source": "Stub", "summary": "Lorem ipsum dolor sit amet. " * 20,
+                "overall_sentiment_score": round(random.uniform(-1, 1), 4), "overall_sentiment_label": "Neutral",
+                "ticker_sentiment": [{"ticker": symbol, "relevance_score": f"{random.random():.4f}",
+                                      "ticker_sentiment_score": f"{random.uniform(-1, 1):.4f}"}],
+            } for i in range(50)],
+        }
+    return {"Error Message": f"Unknown function {function}"}
+
+
+class StubServer:
+    """Local Alpha Vantage stand-in that serves canned payloads over keep-alive HTTP/1.1.
+
+    Args:
+        latency (float): Seconds of artificial upstream latency injected into every response.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.requests = 0
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Send headers and body in one segment so keep-alive connections do not stall on delayed ACKs
+            disable_nagle_algorithm = True
+            wbufsize = 64 * 1024
+
+            def do_GET(self):
+                params = parse_qs(urlparse(self.path).query)
+                with stub._lock:
+                    stub.requests += 1
+                if stub.latency:
+                    time.sleep(stub.latency)
+                body = json.dumps(make_payload(params.get("function", [""])[0], params)).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_port}/query"
+
+    def __enter__(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def report(label: str, samples: list[float]) -> None:
+    """Prints latency percentiles (in milliseconds) for a list of samples in seconds."""
+
+    ordered = sorted(samples)
+    pct = lambda p: ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] * 1000
+    print(f"{label:<40} n={len(samples):<5} mean={statistics.mean(samples) * 1000:8.3f}ms "
+          f"p50={pct(50):8.3f}ms p95={pct(95):8.3f}ms p99={pct(99):8.3f}ms")
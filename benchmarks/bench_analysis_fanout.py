@@ -0,0 +1,64 @@
+"""Measures the wall-clock gain of fanning out the analysis lookups concurrently.
+
+Usage:
+    python benchmarks/bench_analysis_fanout.py [--latency 0.2] [--tickers NVDA AMD INTC ...]
+
+A local stub server injects a fixed latency into every upstream response. The response
+cache is disabled and the daily price store is emptied before every run, so every run
+pays for its upstream calls.
+"""
+
+import os
+import sys
+import time
+import shutil
+import asyncio
+import argparse
+import tempfile
+
+from _common import StubServer, load_module, use_stub
+
+
+def sequential_analysis(news_module, price_change_module, ticker: str, days: int) -> None:
+    # The original code path: news first, then the price change
+    news_module.get_ticker_news(ticker)
+    price_change_module.get_ticker_price_change(ticker, days)
+
+
+def wall(fn, *args) -> float:
+    shutil.rmtree(os.environ["TIMESERIES_STORE_DIR"], ignore_errors=True)
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.2, help="Injected upstream latency in seconds.")
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--tickers", nargs="+", default=["NVDA", "AMD", "INTC", "TSM", "QCOM", "AVGO", "MU", "ARM"])
+    args = parser.parse_args()
+
+    with StubServer(latency=args.latency) as stub, tempfile.TemporaryDirectory() as tmp:
+        use_stub(stub, ALPHA_VANTAGE_CACHE_SIZE=0, TIMESERIES_STORE_DIR=os.path.join(tmp, "timeseries"))
+        news = load_module("ticker_news_agent")
+        price_change = load_module("ticker_price_change_agent")
+        analysis = load_module("ticker_analysis_agent")
+
+        ticker = args.tickers[0]
+        print(f"Single ticker ({ticker}), {args.latency * 1000:.0f}ms upstream latency")
+        print(f"{'sequential (baseline)':<40} {wall(sequential_analysis, news, price_change, ticker, args.days):.3f}s")
+        print(f"{'get_ticker_analysis':<40} {wall(analysis.get_ticker_analysis, ticker, args.days):.3f}s")
+        print(f"{'get_ticker_analysis_async':<40} "
+              f"{wall(lambda: asyncio.run(analysis.get_ticker_analysis_async(ticker, args.days))):.3f}s")
+
+        print(f"\n{len(args.tickers)} tickers, concurrency bound {analysis.MAX_CONCURRENT_ANALYSES}")
+        baseline = wall(lambda: [sequential_analysis(news, price_change, t, args.days) for t in args.tickers])
+        print(f"{'sequential (baseline)':<40} {baseline:.3f}s")
+        print(f"{'get_multi_ticker_analysis':<40} {wall(analysis.get_multi_ticker_analysis, args.tickers, args.days):.3f}s")
+        print(f"{'get_multi_ticker_analysis_async':<40} "
+              f"{wall(lambda: asyncio.run(analysis.get_multi_ticker_analysis_async(args.tickers, args.days))):.3f}s")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+"""Compares quoting a watchlist one ticker per tool call with the batch price tool.
+
+Usage:
+    python benchmarks/bench_batch_quotes.py [--tickers 50] [--latency 0.05]
+
+One tool call per ticker is how the price agent handled a watchlist before the
+batch tool, each call being a separate model turn (model time is not included).
+The batch tool dedupes the list, serves cached quotes and fetches the misses
+concurrently. Runs against a local stub with the call quota disabled.
+"""
+
+import sys
+import time
+import asyncio
+import argparse
+
+from _common import StubServer, use_stub, load_module
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickers", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub upstream latency in seconds.")
+    args = parser.parse_args()
+
+    # Every fifth symbol is repeated, as watchlists assembled from several portfolios often are
+    watchlist = [f"T{i:03d}" for i in range(args.tickers)]
+    watchlist += watchlist[::5]
+
+    with StubServer(latency=args.latency) as stub:
+        use_stub(stub)
+        ticker_price_agent = load_module("ticker_price_agent")
+        alpha_vantage = load_module("alpha_vantage")
+
+        async def one_call_per_ticker():
+            return [await ticker_price_agent.get_ticker_price_async(ticker) for ticker in watchlist]
+
+        print(f"{len(watchlist)} symbols ({len(set(watchlist))} unique), {args.latency * 1000:.0f}ms stub latency\n")
+        runs = [
+            ("one tool call per ticker", one_call_per_ticker, len(watchlist)),
+            ("batch tool, cold cache", lambda: ticker_price_agent.get_ticker_prices_async(watchlist), 1),
+            ("batch tool, warm cache", lambda: ticker_price_agent.get_ticker_prices_async(watchlist), 1),
+        ]
+        for label, run, tool_calls in runs:
+            if label != "batch tool, warm cache":
+                alpha_vantage.response_cache.clear()
+            before = stub.requests
+            start = time.perf_counter()
+            asyncio.run(run())
+            elapsed = time.perf_counter() - start
+            print(f"{label:<26} {elapsed * 1000:9.1f}ms  {tool_calls:>3} tool calls  {stub.requests - before:>3} HTTP requests")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
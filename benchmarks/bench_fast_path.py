@@ -0,0 +1,64 @@
+"""Counts model calls and end-to-end latency per query kind, with and without the fast path.
+
+Usage:
+    python benchmarks/bench_fast_path.py [--model-latency 0.3] [--upstream-latency 0.05]
+
+Gemini is replaced by a scripted fake model that sleeps '--model-latency' seconds per
+call, and Alpha Vantage by a local stub server. The response cache is disabled and the
+daily price store is emptied before every query, so both modes pay for the same upstream calls.
+"""
+
+import os
+import sys
+import time
+import shutil
+import asyncio
+import argparse
+import tempfile
+
+from _common import StubServer, load_module, use_stub
+
+
+async def measure(runner, model, fake_llm, kind: str, keyword: str):
+    calls = model.calls
+    start = time.perf_counter()
+    await fake_llm.run_query(runner, fake_llm.make_query(kind, keyword))
+    return model.calls - calls, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model-latency", type=float, default=0.3, help="Seconds per fake model call.")
+    parser.add_argument("--upstream-latency", type=float, default=0.05, help="Seconds per stub upstream call.")
+    parser.add_argument("--keyword", default="tesla")
+    args = parser.parse_args()
+
+    with StubServer(latency=args.upstream_latency) as stub, tempfile.TemporaryDirectory() as tmp:
+        timeseries_dir = os.path.join(tmp, "timeseries")
+        use_stub(stub, ALPHA_VANTAGE_CACHE_SIZE=0, TIMESERIES_STORE_DIR=timeseries_dir)
+        agent = load_module("agent")
+        import fake_llm
+        from google.adk.runners import InMemoryRunner
+
+        model = fake_llm.ScriptedLlm(latency=args.model_latency)
+        results = {}
+        for mode, fast_path in (("agents", False), ("fast_path", True)):
+            root = agent.create_root_agent(fast_path=fast_path)
+            fake_llm.use_model(root, model)
+            runner = InMemoryRunner(agent=root, app_name="bench")
+            for kind in fake_llm.QUERY_KINDS:
+                shutil.rmtree(timeseries_dir, ignore_errors=True)
+                upstream = stub.requests
+                calls, latency = asyncio.run(measure(runner, model, fake_llm, kind, args.keyword))
+                results[(mode, kind)] = (calls, latency, stub.requests - upstream)
+
+        print(f"Model latency {args.model_latency * 1000:.0f}ms, upstream latency {args.upstream_latency * 1000:.0f}ms\n")
+        print(f"{'query':<10} {'mode':<10} {'model calls':>12} {'upstream calls':>15} {'latency':>10}")
+        for kind in fake_llm.QUERY_KINDS:
+            for mode in ("agents", "fast_path"):
+                calls, latency, upstream = results[(mode, kind)]
+                print(f"{kind:<10} {mode:<10} {calls:>12} {upstream:>15} {latency:>9.3f}s")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
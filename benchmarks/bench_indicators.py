@@ -0,0 +1,88 @@
+"""Benchmarks the vectorised indicator engine against a pure-Python baseline.
+
+Usage:
+    python benchmarks/bench_indicators.py [--tickers 500] [--bars 252]
+
+Both implementations compute the same indicators over a synthetic random-walk
+watchlist, and the results are checked to agree before timings are reported.
+"""
+
+import sys
+import math
+import time
+import argparse
+import numpy as np
+
+from _common import load_module
+
+
+def python_indicators(close: list, volume: list, ind) -> dict:
+    # Straightforward per-ticker loops, as the analysis tool would compute them without NumPy
+    result = {}
+    latest = close[-1]
+    for window in ind.RETURN_WINDOWS:
+        result[f"return_{window}d"] = latest / close[-1 - window] - 1 if len(close) > window else math.nan
+    for window in ind.SMA_WINDOWS:
+        sma = sum(close[-window:]) / window if len(close) >= window else math.nan
+        result[f"sma_{window}"] = sma
+        result[f"price_vs_sma_{window}"] = latest / sma - 1
+    log_returns = [math.log(b / a) for a, b in zip(close, close[1:])]
+    recent = log_returns[-ind.VOLATILITY_WINDOW:]
+    mean = sum(recent) / len(recent)
+    result[f"volatility_{ind.VOLATILITY_WINDOW}d"] = math.sqrt(sum((r - mean) ** 2 for r in recent) / (len(recent) - 1)) * math.sqrt(ind.TRADING_DAYS)
+    peak, drawdown = -math.inf, 0.0
+    for price in close:
+        peak = max(peak, price)
+        drawdown = min(drawdown, price / peak - 1)
+    result["max_drawdown"] = drawdown
+    changes = [b - a for a, b in zip(close, close[1:])][-ind.RSI_WINDOW:]
+    gain = sum(c for c in changes if c > 0) / ind.RSI_WINDOW
+    loss = sum(-c for c in changes if c < 0) / ind.RSI_WINDOW
+    result[f"rsi_{ind.RSI_WINDOW}"] = (50.0 if gain == 0 else 100.0) if loss == 0 else 100 - 100 / (1 + gain / loss)
+    history = volume[-1 - ind.VOLUME_WINDOW:-1]
+    mean = sum(history) / len(history)
+    std = math.sqrt(sum((v - mean) ** 2 for v in history) / (len(history) - 1))
+    result[f"volume_zscore_{ind.VOLUME_WINDOW}"] = (volume[-1] - mean) / std
+    return result
+
+
+def best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickers", type=int, default=500)
+    parser.add_argument("--bars", type=int, default=252)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    ind = load_module("indicators")
+    rng = np.random.default_rng(7)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (args.tickers, args.bars)), axis=1))
+    volume = rng.integers(1_000_000, 5_000_000, (args.tickers, args.bars)).astype("f8")
+    close_lists, volume_lists = close.tolist(), volume.tolist()
+
+    vectorised = ind.compute_indicators(close, volume)
+    baseline = [python_indicators(c, v, ind) for c, v in zip(close_lists, volume_lists)]
+    for name, values in vectorised.items():
+        expected = np.array([row[name] for row in baseline])
+        assert np.allclose(values, expected, equal_nan=True), f"{name} differs from the baseline"
+
+    numpy_time = best_of(lambda: ind.compute_indicators(close, volume), args.repeat)
+    python_time = best_of(lambda: [python_indicators(c, v, ind) for c, v in zip(close_lists, volume_lists)], args.repeat)
+    summary_time = best_of(lambda: [ind.summarize(vectorised, row) for row in range(args.tickers)], args.repeat)
+
+    print(f"{args.tickers} tickers x {args.bars} bars, {len(vectorised)} indicators (results match)")
+    print(f"{'pure Python baseline':<32} {python_time * 1000:9.2f}ms")
+    print(f"{'NumPy batched compute':<32} {numpy_time * 1000:9.2f}ms  ({python_time / numpy_time:.0f}x faster)")
+    print(f"{'summaries for every ticker':<32} {summary_time * 1000:9.2f}ms")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+"""Load-tests the whole agent graph offline, replaying recorded Alpha Vantage calls.
+
+Usage:
+    python benchmarks/bench_load.py [--concurrency 1,4,16] [--requests 200] [--fast-path]
+                                    [--cassette data/cassette.jsonl] [--corpus queries.txt]
+                                    [--model-latency 0.05] [--replay-latency 0.05]
+                                    [--json results.json] [--max-p95-ms 0]
+
+The root agent from agent.py runs with every agent's model replaced by the scripted
+fake model, and the Alpha Vantage client replays a cassette instead of calling the
+network. A missing cassette is first recorded by running the corpus once against a
+local stub. The corpus is one query per line, in the forms understood by the fake
+model; without one, every query kind is asked about a set of companies.
+
+Each concurrency level starts from empty caches and replays '--requests' queries
+from the corpus with that many in flight. It reports latency percentiles,
+throughput, model calls, upstream calls per function and peak memory. With
+'--max-p95-ms', the exit status is 1 if any level's p95 latency exceeds it, so the
+script can gate CI against orchestration regressions.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import asyncio
+import argparse
+import resource
+import tempfile
+import tracemalloc
+
+from _common import StubServer, load_module, use_stub
+
+COMPANIES = ("tesla", "apple", "nvidia", "microsoft", "amazon", "alphabet", "meta", "netflix")
+
+
+def load_corpus(path: str, fake_llm) -> list:
+    if path:
+        with open(path, encoding="utf-8") as f:
+            return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    return [fake_llm.make_query(kind, company) for company in COMPANIES for kind in fake_llm.QUERY_KINDS]
+
+
+def percentile(ordered: list, p: float) -> float:
+    return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+
+async def run_level(runner, fake_llm, queries: list, concurrency: int) -> tuple:
+    latencies = []
+    errors = 0
+    pending = iter(queries)
+
+    async def worker():
+        nonlocal errors
+        for text in pending:
+            start = time.perf_counter()
+            try:
+                await fake_llm.run_query(runner, text)
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - start
+
+
+def record(cassette_path: str, queries: list, fast_path: bool, fake_llm, modules: dict) -> None:
+    # One pass over the corpus against the stub records every call the graph makes
+    replay, alpha_vantage, agent = modules["replay"], modules["alpha_vantage"], modules["agent"]
+    from google.adk.runners import InMemoryRunner
+
+    if os.path.exists(cassette_path):
+        os.remove(cassette_path)
+    alpha_vantage.use_cassette(replay.Cassette(cassette_path, "record"))
+    root = agent.create_root_agent(fast_path=fast_path)
+    fake_llm.use_model(root, fake_llm.ScriptedLlm())
+    runner = InMemoryRunner(agent=root, app_name="load")
+    asyncio.run(run_level(runner, fake_llm, list(dict.fromkeys(queries)), 1))
+    alpha_vantage.use_cassette(None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", default="1,4,16", help="Comma-separated concurrency levels.")
+    parser.add_argument("--requests", type=int, default=200, help="Queries per concurrency level.")
+    parser.add_argument("--fast-path", action="store_true", help="Run the root agent in fast path mode.")
+    parser.add_argument("--cassette", help="Cassette to replay, recorded first if missing. Defaults to a temporary one.")
+    parser.add_argument("--corpus", help="File of user queries, one per line.")
+    parser.add_argument("--model-latency", type=float, default=0.05, help="Seconds per fake model call.")
+    parser.add_argument("--replay-latency", type=float, default=0.05, help="Seconds per replayed upstream call.")
+    parser.add_argument("--tracemalloc", action="store_true", help="Also report the peak Python heap (slows the run).")
+    parser.add_argument("--json", help="Write the results of every level to this file.")
+    parser.add_argument("--max-p95-ms", type=float, default=0, help="0 reports p95 latency without a budget.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp, StubServer() as stub:
+        timeseries_dir = os.path.join(tmp, "timeseries")
+        use_stub(stub, TIMESERIES_STORE_DIR=timeseries_dir, SYMBOL_INDEX_DIR=os.path.join(tmp, "symbol_index"))
+        modules = {name: load_module(name) for name in ("agent", "alpha_vantage", "replay")}
+        alpha_vantage, replay = modules["alpha_vantage"], modules["replay"]
+        import fake_llm
+        from google.adk.runners import InMemoryRunner
+
+        queries = load_corpus(args.corpus, fake_llm)
+        cassette_path = args.cassette or os.path.join(tmp, "cassette.jsonl")
+        if not os.path.exists(cassette_path):
+            record(cassette_path, queries, args.fast_path, fake_llm, modules)
+            print(f"Recorded {stub.requests} upstream calls to {cassette_path}")
+        cassette = replay.Cassette(cassette_path, "replay", latency=args.replay_latency)
+        alpha_vantage.use_cassette(cassette)
+        stub_requests = stub.requests
+
+        model = fake_llm.ScriptedLlm(latency=args.model_latency)
+        root = modules["agent"].create_root_agent(fast_path=args.fast_path)
+        fake_llm.use_model(root, model)
+        runner = InMemoryRunner(agent=root, app_name="load")
+        workload = [queries[i % len(queries)] for i in range(args.requests)]
+
+        print(f"{len(queries)} corpus queries, {args.requests} per level, {'fast path' if args.fast_path else 'sub-agents'}, "
+              f"model latency {args.model_latency * 1000:.0f}ms, replayed upstream latency {args.replay_latency * 1000:.0f}ms\n")
+        print(f"{'conc':>4} {'p50_ms':>8} {'p95_ms':>8} {'p99_ms':>8} {'req/s':>7} {'errors':>6} {'llm':>5} "
+              f"{'upstream':>8} {'rss_mb':>7}{' heap_mb' if args.tracemalloc else ''}  upstream by function")
+        results = []
+        for concurrency in (int(level) for level in args.concurrency.split(",")):
+            alpha_vantage.response_cache.clear()
+            shutil.rmtree(timeseries_dir, ignore_errors=True)
+            cassette.rewind()
+            model_calls = model.calls
+            if args.tracemalloc:
+                tracemalloc.start()
+
+            latencies, errors, elapsed = asyncio.run(run_level(runner, fake_llm, workload, concurrency))
+
+            heap_mb = None
+            if args.tracemalloc:
+                heap_mb = tracemalloc.get_traced_memory()[1] / 2 ** 20
+                tracemalloc.stop()
+            ordered = sorted(latencies)
+            upstream = cassette.stats()["calls"]
+            result = {
+                "concurrency": concurrency,
+                "requests": len(latencies),
+                "errors": errors,
+                "p50_ms": percentile(ordered, 50) * 1000,
+                "p95_ms": percentile(ordered, 95) * 1000,
+                "p99_ms": percentile(ordered, 99) * 1000,
+                "throughput": len(latencies) / elapsed,
+                "llm_calls": model.calls - model_calls,
+                "upstream_calls": sum(upstream.values()),
+                "upstream_by_function": upstream,
+                "cassette_misses": cassette.stats()["misses"],
+                # ru_maxrss is in kilobytes on Linux
+                "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+                "peak_heap_mb": heap_mb,
+            }
+            results.append(result)
+            print(f"{concurrency:>4} {result['p50_ms']:8.1f} {result['p95_ms']:8.1f} {result['p99_ms']:8.1f} "
+                  f"{result['throughput']:7.1f} {errors:>6} {result['llm_calls']:>5} {result['upstream_calls']:>8} "
+                  f"{result['peak_rss_mb']:7.1f}{f' {heap_mb:7.1f}' if heap_mb is not None else ''}  "
+                  + ", ".join(f"{name}={count}" for name, count in sorted(upstream.items())))
+
+        if stub.requests != stub_requests:
+            print(f"\nWarning: {stub.requests - stub_requests} calls reached the stub while replaying")
+        if any(result["cassette_misses"] for result in results):
+            print(f"\nWarning: {sum(result['cassette_misses'] for result in results)} calls had no recorded response")
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=2)
+
+    if args.max_p95_ms and any(result["p95_ms"] > args.max_p95_ms for result in results):
+        print(f"\nFailed: p95 latency above {args.max_p95_ms:.0f}ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""Compares the size of news tool responses before and after budgeting.
+
+Usage:
+    python benchmarks/bench_news_payload.py [--articles 50]
+
+The legacy payload copies the first 15 articles with full summaries and the
+sentiment score definition. The budgeted payload is built by 'news_digest'.
+Sizes are reported in bytes and estimated prompt tokens.
+"""
+
+import sys
+import time
+import random
+import argparse
+
+from _common import load_module, make_payload
+
+LEGACY_ARTICLES = 15
+
+
+def legacy_news(ticker: str, data: dict) -> dict:
+    # The payload shape get_ticker_news returned before budgeting
+    news = {"ticker": ticker, "sentiment_score_definition": data.get("sentiment_score_definition", "N/A"), "feed": []}
+    for article in data["feed"][:LEGACY_ARTICLES]:
+        news["feed"].append({field: article.get(field, "N/A") for field in (
+            "title", "time_published", "source", "summary", "overall_sentiment_score", "overall_sentiment_label")})
+    return {"status": "success", "news": news}
+
+
+def realistic_feed(ticker: str, count: int) -> dict:
+    # Stub articles with varied headlines and relevance, every fourth story syndicated under a slightly different headline
+    random.seed(3)
+    words = ["revenue", "guidance", "chips", "demand", "margin", "growth", "data", "center", "quarter", "outlook",
+             "analysts", "expect", "rally", "slump", "upgrade", "downgrade", "export", "rules", "earnings", "beat"]
+    data = make_payload("NEWS_SENTIMENT", {"tickers": [ticker]})
+    data["feed"] = data["feed"][:count]
+    headlines = []
+    for i, article in enumerate(data["feed"]):
+        if i % 4 == 1:
+            headline = headlines[-1] + " - report"
+        else:
+            headline = f"{ticker} " + " ".join(random.sample(words, 6))
+        headlines.append(headline)
+        article["title"] = headline
+        article["summary"] = " ".join(random.choices(words, k=120))
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ticker", default="NVDA")
+    parser.add_argument("--articles", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    digest = load_module("news_digest")
+    print(f"{'feed':>6} {'legacy bytes':>13} {'legacy tokens':>14} {'budgeted bytes':>15} {'budgeted tokens':>16} {'saved':>7}")
+    for count in sorted({3, 15, args.articles}):
+        data = realistic_feed(args.ticker, count)
+        if count < LEGACY_ARTICLES:
+            legacy = None  # The legacy loop raised IndexError on feeds shorter than 15 articles
+        else:
+            legacy = legacy_news(args.ticker, data)
+        budgeted = {"status": "success", "news": digest.compact_news(args.ticker, data["feed"])}
+        new_bytes, new_tokens = digest.payload_bytes(budgeted), digest.estimate_tokens(budgeted)
+        if legacy is None:
+            print(f"{count:>6} {'IndexError':>13} {'-':>14} {new_bytes:>15} {new_tokens:>16} {'-':>7}")
+            continue
+        old_bytes, old_tokens = digest.payload_bytes(legacy), digest.estimate_tokens(legacy)
+        print(f"{count:>6} {old_bytes:>13} {old_tokens:>14} {new_bytes:>15} {new_tokens:>16} {1 - new_bytes / old_bytes:>7.0%}")
+
+    data = realistic_feed(args.ticker, args.articles)
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        news = digest.compact_news(args.ticker, data["feed"])
+    per_call = (time.perf_counter() - start) / args.repeat
+    print(f"\ncompaction of {args.articles} articles: {per_call * 1000:.2f}ms per call, "
+          f"{len(news['feed'])} articles kept, sentiment {news['sentiment']}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""Measures the warm quote store and the price change stream of the quote refresher.
+
+Usage:
+    python benchmarks/bench_quote_stream.py [--tickers 5] [--interval 0.25] [--seconds 5] [--latency 0.05]
+
+First prints the refresh period the scheduler picks within half of the free and a
+premium Alpha Vantage quota. Then, against a local stub with the quota disabled,
+compares 'get_ticker_price' for unsubscribed tickers, which each cost an upstream
+call, with subscribed tickers read from the warm store, and consumes the change
+stream while the tickers are refreshed every '--interval' seconds, reporting the
+delay between a refresh and its delivery to the subscriber.
+"""
+
+import sys
+import time
+import asyncio
+import argparse
+
+from _common import StubServer, use_stub, load_module, report
+
+# (label, calls per minute, calls per day)
+QUOTAS = [("free", 5, 25), ("premium", 75, 0)]
+
+
+async def consume(quote_stream, tickers: list, seconds: float) -> list:
+    delays = []
+    deadline = time.monotonic() + seconds
+    changes = quote_stream.quote_changes(tickers, heartbeat=0.5)
+    try:
+        async for event in changes:
+            # The stored quotes sent when the stream starts have no previous price and are older than the stream
+            if event is not None and event["previous_price"] is not None:
+                delays.append(time.time() - event["updated_at"])
+            if time.monotonic() >= deadline:
+                break
+    finally:
+        await changes.aclose()
+    return delays
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickers", type=int, default=5)
+    parser.add_argument("--interval", type=float, default=0.25, help="Seconds between refreshes of a ticker.")
+    parser.add_argument("--seconds", type=float, default=5, help="Seconds the change stream is consumed.")
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub upstream latency in seconds.")
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    with StubServer(latency=args.latency) as stub:
+        # Quotes are not kept in the response cache, so every refresh reaches the stub with a new price
+        use_stub(stub, ALPHA_VANTAGE_TTL_GLOBAL_QUOTE=0, QUOTE_REFRESH_INTERVAL=args.interval,
+                 QUOTE_REFRESH_MAX_TICKERS=args.tickers)
+        quote_stream = load_module("quote_stream")
+        ticker_price_agent = load_module("ticker_price_agent")
+
+        print("Refresh period within half of the quota:")
+        for label, per_minute, per_day in QUOTAS:
+            periods = ", ".join(f"{n} ticker{'s' if n > 1 else ''} {quote_stream.refresh_period(n, 60, 0.5, per_minute, per_day):.0f}s"
+                                for n in (1, 5, 10))
+            print(f"    {label:<8} {per_minute}/min, {per_day or 'unlimited'}/day: {periods}")
+        print()
+
+        tickers = [f"S{i:03d}" for i in range(args.tickers)]
+        cold = []
+        for i in range(50):
+            start = time.perf_counter()
+            ticker_price_agent.get_ticker_price(f"C{i:03d}")
+            cold.append(time.perf_counter() - start)
+
+        for ticker in tickers:
+            quote_stream.subscribe(ticker)
+        while any(quote_stream.get_quote(ticker) is None for ticker in tickers):
+            time.sleep(0.01)
+        warm = []
+        for i in range(args.repeat):
+            start = time.perf_counter()
+            ticker_price_agent.get_ticker_price(tickers[i % len(tickers)])
+            warm.append(time.perf_counter() - start)
+
+        report("get_ticker_price, unsubscribed", cold)
+        report("get_ticker_price, warm store", warm)
+
+        before = stub.requests
+        delays = asyncio.run(consume(quote_stream, tickers, args.seconds))
+        upstream = stub.requests - before
+        print(f"\n{len(delays)} price changes streamed in {args.seconds:.0f}s from {upstream} refreshes of "
+              f"{len(tickers)} tickers (expected about {args.seconds / args.interval * len(tickers):.0f})")
+        if delays:
+            report("refresh to subscriber delay", delays)
+        print(f"\n{quote_stream.quote_refresher.stats()}")
+        quote_stream.quote_refresher.stop()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""Measures cold-start import time of the package, in the style of 'python -X importtime'.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 5] [--top 8]
+
+Each target is imported in fresh interpreters started with '-X importtime'. The
+median wall time is reported, along with the modules with the highest cumulative
+import time from the last run. The exit status is 1 if a target exceeds its time
+budget or imports ADK when it should not, so the script can gate CI:
+
+    python benchmarks/bench_startup.py --tools-budget-ms 800
+
+The ADK and budget checks of the package and tool function targets also run, with generous
+budgets, as part of the test suite in tests/test_startup.py.
+"""
+
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+from _common import PACKAGE_DIR, PACKAGE_NAME
+
+# (label, statement, whether ADK may be imported)
+TARGETS = [
+    ("package", f"import {PACKAGE_NAME}", False),
+    ("tool functions", f"from {PACKAGE_NAME}.ticker_price_agent import get_ticker_prices; "
+                       f"from {PACKAGE_NAME}.ticker_news_agent import get_ticker_news; "
+                       f"from {PACKAGE_NAME}.ticker_analysis_agent import get_ticker_analysis", False),
+    ("root agent", f"import {PACKAGE_NAME}; {PACKAGE_NAME}.agent.root_agent", True),
+]
+
+CHILD = """
+import sys, time, json
+start = time.perf_counter()
+exec({statement!r})
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "adk": "google.adk" in sys.modules, "modules": len(sys.modules)}}))
+"""
+
+
+def run_once(statement: str) -> tuple:
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(PACKAGE_DIR), PYTHONDONTWRITEBYTECODE="1")
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", CHILD.format(statement=statement)],
+                               capture_output=True, text=True, env=env, check=True)
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    # '-X importtime' lines look like 'import time:  self [us] | cumulative | imported package'
+    cumulative = []
+    for line in completed.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, total, module = line[len("import time:"):].split("|")
+            if total.strip().isdigit():
+                cumulative.append((int(total), module.rstrip()))
+    return result, cumulative
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8, help="Heaviest imports listed per target.")
+    parser.add_argument("--package-budget-ms", type=float, default=100)
+    parser.add_argument("--tools-budget-ms", type=float, default=1000)
+    parser.add_argument("--agent-budget-ms", type=float, default=0, help="0 reports the root agent without a budget.")
+    args = parser.parse_args()
+
+    # Modules imported by interpreter startup itself are left out of the listings
+    _, startup = run_once("pass")
+    startup_modules = {module for _, module in startup}
+
+    budgets = {"package": args.package_budget_ms, "tool functions": args.tools_budget_ms, "root agent": args.agent_budget_ms}
+    failures = []
+    for label, statement, adk_allowed in TARGETS:
+        runs = [run_once(statement) for _ in range(args.runs)]
+        median_ms = statistics.median(result["seconds"] for result, _ in runs) * 1000
+        result, cumulative = runs[-1]
+        budget = budgets[label]
+
+        status = "ok"
+        if budget and median_ms > budget:
+            status = f"OVER BUDGET ({budget:.0f}ms)"
+        if result["adk"] and not adk_allowed:
+            status = "IMPORTS ADK"
+        if status != "ok":
+            failures.append(label)
+        print(f"{label:<16} {median_ms:8.1f}ms  {result['modules']:>5} modules  adk={'yes' if result['adk'] else 'no ':<3}  {status}")
+        heaviest = sorted((entry for entry in cumulative if entry[1] not in startup_modules), reverse=True)
+        for total, module in heaviest[:args.top]:
+            print(f"    {total / 1000:8.1f}ms  {module}")
+
+    if failures:
+        print(f"\nFailed: {', '.join(failures)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
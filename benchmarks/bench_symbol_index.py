@@ -0,0 +1,109 @@
+"""Measures symbol index build time, load time, resident memory and lookup latency.
+
+Usage:
+    python benchmarks/bench_symbol_index.py [--listings 10000] [--csv LISTING_STATUS.csv]
+
+Without '--csv', a synthetic LISTING_STATUS file with '--listings' rows is generated,
+with a handful of real companies mixed in to check the resolution order.
+"""
+
+import os
+import sys
+import time
+import random
+import string
+import argparse
+import tempfile
+import timeit
+
+from _common import load_module
+
+REAL_LISTINGS = [
+    ("TSLA", "Tesla Inc", "NASDAQ", "Stock"),
+    ("NVDA", "NVIDIA Corp", "NASDAQ", "Stock"),
+    ("F", "Ford Motor Co", "NYSE", "Stock"),
+    ("FORD", "Forward Industries Inc", "NASDAQ", "Stock"),
+    ("AAPL", "Apple Inc", "NASDAQ", "Stock"),
+    ("GOOGL", "Alphabet Inc - Class A", "NASDAQ", "Stock"),
+    ("PLTR", "Palantir Technologies Inc - Class A", "NYSE", "Stock"),
+    ("BAC", "Bank of America Corp", "NYSE", "Stock"),
+]
+
+LOOKUPS = {
+    "ticker (TSLA)": "TSLA",
+    "exact name (tesla)": "tesla",
+    "prefix (bank of)": "bank of",
+    "alias (google)": "google",
+    "fuzzy (nvidai)": "nvidai",
+    "miss (zzzzzz qqq)": "zzzzzz qqq",
+}
+
+
+def synthetic_csv(count: int) -> str:
+    random.seed(7)
+    syllables = ["ac", "bel", "cor", "dyn", "ex", "fin", "gen", "hal", "in", "jet", "kin", "lum", "mar", "nov",
+                 "omn", "pro", "quan", "rex", "sol", "tec", "uni", "ver", "wav", "xen", "yor", "zen"]
+    suffixes = ["Inc", "Corp", "Holdings Inc", "Group Ltd", "Technologies Inc", "Therapeutics Inc", "ETF", "Trust"]
+    lines = ["symbol,name,exchange,assetType,ipoDate,delistingDate,status"]
+    used = {symbol for symbol, *_ in REAL_LISTINGS}
+    for symbol, name, exchange, asset_type in REAL_LISTINGS:
+        lines.append(f"{symbol},{name},{exchange},{asset_type},2010-01-01,null,Active")
+    while len(lines) <= count:
+        symbol = "".join(random.choices(string.ascii_uppercase, k=random.randint(2, 5)))
+        if symbol in used:
+            continue
+        used.add(symbol)
+        name = "".join(random.choices(syllables, k=random.randint(2, 3))).capitalize()
+        suffix = random.choice(suffixes)
+        asset_type = "ETF" if suffix == "ETF" else "Stock"
+        exchange = random.choice(["NYSE", "NASDAQ", "NYSE ARCA", "BATS"])
+        lines.append(f"{symbol},{name} {suffix},{exchange},{asset_type},2015-01-01,null,Active")
+    return "\n".join(lines)
+
+
+def rss_kb() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--listings", type=int, default=10000)
+    parser.add_argument("--csv", help="Use a real LISTING_STATUS CSV instead of synthetic data.")
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    symbol_index = load_module("symbol_index")
+    if args.csv:
+        with open(args.csv, encoding="utf-8") as f:
+            csv_text = f.read()
+    else:
+        csv_text = synthetic_csv(args.listings)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index_dir = os.path.join(tmp, "symbol_index")
+        start = time.perf_counter()
+        count = symbol_index.build_index(csv_text, index_dir)
+        build_time = time.perf_counter() - start
+        size = sum(os.path.getsize(os.path.join(index_dir, name)) for name in os.listdir(index_dir))
+
+        rss_before = rss_kb()
+        start = time.perf_counter()
+        index = symbol_index.SymbolIndex(index_dir)
+        load_time = time.perf_counter() - start
+        for keyword in LOOKUPS.values():
+            index.lookup(keyword)
+        rss_after = rss_kb()
+
+        print(f"{count} listings, {size / 1024:.0f} KiB on disk")
+        print(f"build {build_time * 1000:.1f}ms, load {load_time * 1000:.3f}ms, "
+              f"resident memory after load and lookups +{rss_after - rss_before} KiB\n")
+        for label, keyword in LOOKUPS.items():
+            per_call = timeit.timeit(lambda: index.lookup(keyword), number=args.repeat) / args.repeat
+            result = index.lookup(keyword)
+            print(f"{label:<22} {per_call * 1e6:9.1f}us  -> {result['ticker'] + ' ' + result['name'] if result else None}")
+        print(f"{'ford (name before symbol)':<22} {'':>11}  -> {index.lookup('ford')['ticker']}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
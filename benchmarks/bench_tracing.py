@@ -0,0 +1,92 @@
+"""Traces scripted user requests end to end and prints the per-request breakdown.
+
+Usage:
+    python benchmarks/bench_tracing.py [--model-latency 0.1] [--upstream-latency 0.05] [--keep traces.jsonl]
+
+Each query kind is run through the root agent, first with sub-agents and then in
+fast path mode, with Gemini replaced by the scripted fake model and Alpha Vantage
+by a local stub. Spans go to a JSONL file, which is then summarised per request,
+the same way 'python -m <package>.tracing_export summarize' does, and folded by
+self time. The per-call overhead of a traced tool is measured as well.
+"""
+
+import os
+import sys
+import time
+import shutil
+import asyncio
+import argparse
+import tempfile
+
+from _common import StubServer, load_module, use_stub
+
+COLUMNS = ("duration_ms", "llm_calls", "llm_ms", "agent_tool_calls", "tool_calls", "upstream_calls",
+           "upstream_ms", "response_bytes", "cache_hits", "cache_misses", "retries")
+
+
+def tool_call_cost(ticker_price_agent, repeat: int) -> float:
+    # Quotes are served from the response cache, so this is the cost of the tool itself
+    ticker_price_agent.get_ticker_price("AAPL")
+    start = time.perf_counter()
+    for _ in range(repeat):
+        ticker_price_agent.get_ticker_price("AAPL")
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model-latency", type=float, default=0.1, help="Seconds per fake model call.")
+    parser.add_argument("--upstream-latency", type=float, default=0.05, help="Seconds per stub upstream call.")
+    parser.add_argument("--keyword", default="tesla")
+    parser.add_argument("--top", type=int, default=10, help="Folded stacks listed, by self time.")
+    parser.add_argument("--keep", help="Copy the JSONL trace file here.")
+    args = parser.parse_args()
+
+    with StubServer(latency=args.upstream_latency) as stub, tempfile.TemporaryDirectory() as tmp:
+        trace_path = os.path.join(tmp, "traces.jsonl")
+        use_stub(stub, TIMESERIES_STORE_DIR=os.path.join(tmp, "timeseries"))
+        agent = load_module("agent")
+        tracing = load_module("tracing")
+        tracing_export = load_module("tracing_export")
+        ticker_price_agent = load_module("ticker_price_agent")
+        import fake_llm
+        from google.adk.runners import InMemoryRunner
+
+        untraced = tool_call_cost(ticker_price_agent, 2000)
+        tracing.configure_tracing("jsonl", trace_path)
+        traced = tool_call_cost(ticker_price_agent, 2000)
+        tracing.flush()
+        os.remove(trace_path)
+
+        model = fake_llm.ScriptedLlm(latency=args.model_latency)
+        labels = []
+        for mode, fast_path in (("agents", False), ("fast_path", True)):
+            root = agent.create_root_agent(fast_path=fast_path)
+            fake_llm.use_model(root, model)
+            runner = InMemoryRunner(agent=root, app_name="bench")
+            for kind in fake_llm.QUERY_KINDS:
+                asyncio.run(fake_llm.run_query(runner, fake_llm.make_query(kind, args.keyword)))
+                labels.append((kind, mode))
+        tracing.flush()
+
+        spans = tracing_export.load_spans(trace_path)
+        summaries = tracing_export.summarize_requests(spans)
+        print(f"{len(spans)} spans in {len(summaries)} requests, model latency {args.model_latency * 1000:.0f}ms, "
+              f"upstream latency {args.upstream_latency * 1000:.0f}ms\n")
+        print(f"{'query':<9} {'mode':<10}" + "".join(f" {column:>{max(len(column), 8)}}" for column in COLUMNS))
+        for (kind, mode), summary in zip(labels, summaries):
+            print(f"{kind:<9} {mode:<10}" + "".join(
+                f" {summary[column]:>{max(len(column), 8)}{'.1f' if column.endswith('_ms') else ''}}" for column in COLUMNS))
+
+        print(f"\nTop {args.top} stacks by self time:")
+        stacks = sorted(tracing_export.folded_stacks(spans).items(), key=lambda item: item[1], reverse=True)
+        for stack, micros in stacks[:args.top]:
+            print(f"{micros / 1000:9.1f}ms  {stack}")
+
+        print(f"\nCached get_ticker_price call: {untraced * 1e6:.1f}us untraced, {traced * 1e6:.1f}us traced")
+        if args.keep:
+            shutil.copy(trace_path, args.keep)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
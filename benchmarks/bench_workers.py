@@ -0,0 +1,129 @@
+"""Measures how throughput and upstream calls scale with the number of worker processes.
+
+Usage:
+    python benchmarks/bench_workers.py [--workers 1,2,4] [--requests 128] [--concurrency 4]
+                                       [--model-latency 0.05] [--upstream-latency 0.05]
+
+Each worker process runs the root agent with the scripted fake model, as a serving
+worker started by 'python -m <package>.serve' would, and handles its share of the
+queries with '--concurrency' of them in flight. Alpha Vantage is a local stub. Every
+worker count is run twice: with the response cache and quota shared through a
+SQLite store, and with each worker keeping its own, as separate 'adk web'
+processes would. Worker start-up is not timed.
+
+Throughput only grows with more workers while there are CPU cores to run them on,
+or while more queries in flight still help; the core count is printed alongside.
+"""
+
+import os
+import sys
+import time
+import random
+import shutil
+import asyncio
+import argparse
+import tempfile
+import statistics
+import multiprocessing
+
+from _common import StubServer, load_module, use_stub
+
+
+def worker(queries: list, concurrency: int, model_latency: float, env: dict, barrier, results) -> None:
+    os.environ.update(env)
+    agent = load_module("agent")
+    alpha_vantage = load_module("alpha_vantage")
+    import fake_llm
+    from google.adk.runners import InMemoryRunner
+
+    model = fake_llm.ScriptedLlm(latency=model_latency)
+    root = agent.create_root_agent()
+    fake_llm.use_model(root, model)
+    runner = InMemoryRunner(agent=root, app_name="workers")
+    latencies = []
+    errors = 0
+
+    async def run():
+        nonlocal errors
+        pending = iter(queries)
+
+        async def one():
+            nonlocal errors
+            for text in pending:
+                start = time.perf_counter()
+                try:
+                    await fake_llm.run_query(runner, text)
+                except Exception:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(one() for _ in range(concurrency)))
+
+    barrier.wait()
+    asyncio.run(run())
+    results.put({"latencies": latencies, "errors": errors, "cache": alpha_vantage.cache_stats()})
+
+
+def run_level(workers: int, shared: bool, queries: list, args, tmp: str, stub) -> dict:
+    timeseries_dir = os.path.join(tmp, "timeseries")
+    shutil.rmtree(timeseries_dir, ignore_errors=True)
+    env = {"SHARED_STORE_PATH": os.path.join(tmp, f"shared-{workers}.db") if shared else ""}
+
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(workers + 1)
+    results = context.Queue()
+    processes = [context.Process(target=worker, args=(queries[i::workers], args.concurrency, args.model_latency, env, barrier, results))
+                 for i in range(workers)]
+    for process in processes:
+        process.start()
+    barrier.wait()
+    upstream = stub.requests
+    start = time.perf_counter()
+    outcomes = [results.get() for _ in processes]
+    elapsed = time.perf_counter() - start
+    for process in processes:
+        process.join()
+
+    latencies = sorted(latency for outcome in outcomes for latency in outcome["latencies"])
+    return {
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))] * 1000,
+        "errors": sum(outcome["errors"] for outcome in outcomes),
+        "upstream": stub.requests - upstream,
+        "shared_waits": sum(outcome["cache"].get("shared_waits", 0) for outcome in outcomes),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="1,2,4", help="Comma-separated worker counts.")
+    parser.add_argument("--requests", type=int, default=128, help="Queries per run, split between the workers.")
+    parser.add_argument("--concurrency", type=int, default=4, help="Queries in flight per worker.")
+    parser.add_argument("--model-latency", type=float, default=0.05, help="Seconds per fake model call.")
+    parser.add_argument("--upstream-latency", type=float, default=0.05, help="Seconds per stub upstream call.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with StubServer(latency=args.upstream_latency) as stub, tempfile.TemporaryDirectory() as tmp:
+        use_stub(stub, TIMESERIES_STORE_DIR=os.path.join(tmp, "timeseries"), SYMBOL_INDEX_DIR=os.path.join(tmp, "symbol_index"))
+        import fake_llm
+        import bench_load
+
+        corpus = bench_load.load_corpus(None, fake_llm)
+        queries = [corpus[i % len(corpus)] for i in range(args.requests)]
+        random.Random(args.seed).shuffle(queries)
+
+        print(f"{args.requests} queries ({len(set(queries))} distinct), {args.concurrency} in flight per worker, "
+              f"{os.cpu_count()} CPU cores, model latency {args.model_latency * 1000:.0f}ms, "
+              f"upstream latency {args.upstream_latency * 1000:.0f}ms\n")
+        print(f"{'workers':>7} {'store':<7} {'req/s':>7} {'p50_ms':>8} {'p95_ms':>8} {'errors':>6} {'upstream':>8} {'waits':>6}")
+        for workers in (int(count) for count in args.workers.split(",")):
+            for shared in (True, False):
+                result = run_level(workers, shared, queries, args, tmp, stub)
+                print(f"{workers:>7} {'shared' if shared else 'local':<7} {result['throughput']:7.1f} {result['p50_ms']:8.1f} "
+                      f"{result['p95_ms']:8.1f} {result['errors']:>6} {result['upstream']:>8} {result['shared_waits']:>6}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+"""A scripted stand-in for Gemini that drives the agent graph without any model quota.
+
+The model plays every agent in the graph. It recognises which agent it is serving from
+the tools in the request, and follows a fixed script per query kind, so runs are
+deterministic and every model call can be counted.
+"""
+
+import re
+import json
+import asyncio
+import logging
+import itertools
+from typing import AsyncGenerator
+
+from google.genai import types
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+
+# ADK warns about every tool parameter with a default value each time a request is built
+logging.getLogger("google_adk").setLevel(logging.ERROR)
+
+# Query kinds understood by the script, with an example query for each
+QUERY_KINDS = {
+    "price": "What is the price of {keyword}?",
+    "change": "How has {keyword} changed over the last {days} days?",
+    "news": "What is the latest news about {keyword}?",
+    "analysis": "Why has {keyword} stock moved this week?",
+}
+
+
+def make_query(kind: str, keyword: str, days: int = 7) -> str:
+    """Returns the user query text the script recognises for a query kind."""
+
+    return QUERY_KINDS[kind].format(keyword=keyword, days=days)
+
+
+def parse_query(text: str):
+    """Returns (kind, keyword, days) for a query made by 'make_query', or None if it is not recognised."""
+
+    for kind, template in QUERY_KINDS.items():
+        pattern = re.escape(template).replace(r"\{keyword\}", r"(?P<keyword>.+?)").replace(r"\{days\}", r"(?P<days>\d+)")
+        match = re.fullmatch(pattern, text.strip())
+        if match:
+            return kind, match.group("keyword"), int(match.groupdict().get("days") or 7)
+    return None
+
+
+def _ticker_from(response: dict):
+    # Sub-agent tools return the sub-agent's final text, which the script makes a JSON tool result
+    if isinstance(response.get("result"), str):
+        try:
+            response = json.loads(response["result"])
+        except ValueError:
+            return None
+    return response.get("ticker")
+
+
+# Root agent plans, per mode and query kind: a list of steps that build (tool name, args) from the query and prior responses
+_ROOT_PLANS = {
+    "agents": {
+        "price": [
+            lambda q, r: ("identify_ticker_agent", {"request": q[1]}),
+            lambda q, r: ("ticker_price_agent", {"request": _ticker_from(r[0])}),
+        ],
+        "change": [
+            lambda q, r: ("identify_ticker_agent", {"request": q[1]}),
+            lambda q, r: ("ticker_price_change_agent", {"request": f"{_ticker_from(r[0])} {q[2]}"}),
+        ],
+        "news": [
+            lambda q, r: ("identify_ticker_agent", {"request": q[1]}),
+            lambda q, r: ("ticker_news_agent", {"request": _ticker_from(r[0])}),
+        ],
+        "analysis": [
+            lambda q, r: ("identify_ticker_agent", {"request": q[1]}),
+            lambda q, r: ("ticker_analysis_agent", {"request": f"{_ticker_from(r[0])} {q[2]}"}),
+        ],
+    },
+    "fast_path": {
+        "price": [
+            lambda q, r: ("resolve_and_quote_async", {"keyword": q[1]}),
+        ],
+        "change": [
+            lambda q, r: ("get_ticker_async", {"keyword": q[1]}),
+            lambda q, r: ("get_ticker_price_change_async", {"ticker": _ticker_from(r[0]), "days": q[2]}),
+        ],
+        "news": [
+            lambda q, r: ("get_ticker_async", {"keyword": q[1]}),
+            lambda q, r: ("ticker_news_agent", {"request": _ticker_from(r[0])}),
+        ],
+        "analysis": [
+            lambda q, r: ("get_ticker_async", {"keyword": q[1]}),
+            lambda q, r: ("ticker_analysis_agent", {"request": f"{_ticker_from(r[0])} {q[2]}"}),
+        ],
+    },
+}
+
+# Argument names of the single-tool sub-agents, filled from the words of the request they receive
+_SUB_AGENT_ARGS = {
+    "get_ticker_async": ("keyword",),
+    "get_ticker_price_async": ("ticker",),
+    "get_ticker_price_change_async": ("ticker", "days"),
+    "get_ticker_news_async": ("ticker",),
+    "get_ticker_analysis_async": ("ticker", "days"),
+}
+
+
+class ScriptedLlm(BaseLlm):
+    """Fake model that answers every agent in the graph from a fixed script.
+
+    Attributes:
+        latency (float): Seconds each model call sleeps, to stand in for Gemini's response time.
+        calls (int): Number of model calls made so far.
+    """
+
+    model: str = "scripted"
+    latency: float = 0.0
+    calls: int = 0
+
+    @staticmethod
+    def _text(content: types.Content) -> str:
+        return "".join(part.text for part in content.parts or [] if part.text)
+
+    def _next_step(self, llm_request: LlmRequest):
+        contents = llm_request.contents
+        user_text = next(self._text(c) for c in contents if c.role == "user" and self._text(c))
+        responses = [part.function_response.response for c in contents for part in c.parts or [] if part.function_response]
+        tools = list(llm_request.tools_dict)
+
+        query = parse_query(user_text)
+        if query is not None:
+            # Root agent: follow the plan for its mode
+            mode = "fast_path" if "resolve_and_quote_async" in tools else "agents"
+            plan = _ROOT_PLANS[mode][query[0]]
+            if len(responses) < len(plan):
+                return plan[len(responses)](query, responses)
+            return None
+
+        # Sub-agent: call its tool once with the words of the request, then answer with the result
+        if not responses:
+            tool = next(name for name in tools if name in _SUB_AGENT_ARGS)
+            words = user_text.split()
+            args = {name: int(value) if name == "days" else value for name, value in zip(_SUB_AGENT_ARGS[tool], words)}
+            if tool == "get_ticker_async":
+                args["keyword"] = user_text
+            return tool, args
+        return None
+
+    async def generate_content_async(self, llm_request: LlmRequest, stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        step = self._next_step(llm_request)
+        if step is not None:
+            name, args = step
+            part = types.Part(function_call=types.FunctionCall(name=name, args=args))
+        else:
+            responses = [part.function_response.response for c in llm_request.contents for part in c.parts or [] if part.function_response]
+            part = types.Part(text=json.dumps(responses[-1], default=str) if responses else "I cannot help with that.")
+        yield LlmResponse(content=types.Content(role="model", parts=[part]))
+
+
+def use_model(agent, model: BaseLlm) -> None:
+    """Replaces the model of an agent and of every agent reachable through its AgentTool tools."""
+
+    from google.adk.tools.agent_tool import AgentTool
+
+    agent.model = model
+    for tool in agent.tools:
+        if isinstance(tool, AgentTool):
+            use_model(tool.agent, model)
+
+
+_session_ids = itertools.count()
+
+
+async def run_query(runner, text: str) -> str:
+    """Runs one user query in a fresh session and returns the final response text."""
+
+    session = await runner.session_service.create_session(
+        app_name=runner.app_name, user_id="bench", session_id=f"s{next(_session_ids)}")
+    final = ""
+    async for event in runner.run_async(user_id="bench", session_id=session.id,
+                                        new_message=types.Content(role="user", parts=[types.Part(text=text)])):
+        if event.is_final_response() and event.content and event.content.parts:
+            final = "".join(part.text or "" for part in event.content.parts)
+    return final
@@ -0,0 +1,155 @@
+import time
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+MARKET_TIMEZONE = ZoneInfo("America/New_York")
+MARKET_CLOSE_HOUR = 16
+
+
+def seconds_until_market_close(now: datetime = None) -> float:
+    """Returns the number of seconds until the next US market close (16:00 New York time, Monday to Friday).
+
+    Exchange holidays are not taken into account, so on a holiday the result is the
+    close of that day, which only makes a cached daily series refresh a day early.
+    """
+
+    now = (now or datetime.now(MARKET_TIMEZONE)).astimezone(MARKET_TIMEZONE)
+    close = now.replace(hour=MARKET_CLOSE_HOUR, minute=0, second=0, microsecond=0)
+    if now >= close:
+        close += timedelta(days=1)
+    while close.weekday() >= 5:
+        close += timedelta(days=1)
+    return (close - now).total_seconds()
+
+
+def last_market_close(now: datetime = None) -> datetime:
+    """Returns the most recent US market close at or before 'now', ignoring exchange holidays."""
+
+    now = (now or datetime.now(MARKET_TIMEZONE)).astimezone(MARKET_TIMEZONE)
+    close = now.replace(hour=MARKET_CLOSE_HOUR, minute=0, second=0, microsecond=0)
+    if now < close:
+        close -= timedelta(days=1)
+    while close.weekday() >= 5:
+        close -= timedelta(days=1)
+    return close
+
+
+class _Call:
+    """An in-flight load that concurrent callers for the same key wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after a per-entry time to live.
+
+    Concurrent misses for the same key are coalesced: the first caller runs the loader
+    and every other caller waits for its result, so only one upstream request is made.
+    Failed loads are never cached; the error is raised to every waiting caller.
+
+    Args:
+        maxsize (int): Maximum number of entries kept before the least recently used entry is evicted.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get_or_load(self, key, loader, ttl):
+        """Returns the cached value for a key, calling 'loader' to fill it on a miss.
+
+        Args:
+            key: A hashable cache key.
+            loader: A callable without arguments that produces the value.
+            ttl (float | callable): Seconds the loaded value stays fresh, or a callable that receives
+                the loaded value and returns them. A ttl of 0 returns the value without caching it.
+
+        Returns:
+            The cached or freshly loaded value. Cached values are shared between callers and must not be mutated.
+        """
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.expirations += 1
+
+            call = self._in_flight.get(key)
+            if call is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                self.misses += 1
+                call = self._in_flight[key] = _Call()
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = loader()
+        except BaseException as e:
+            call.error = e
+            raise
+        else:
+            self.set(key, call.value, ttl(call.value) if callable(ttl) else ttl)
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            call.done.set()
+        return call.value
+
+    def set(self, key, value, ttl: float) -> None:
+        """Stores a value under a key for 'ttl' seconds, evicting least recently used entries if full."""
+
+        if self.maxsize <= 0 or ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Removes all entries and resets the counters."""
+
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.coalesced = self.evictions = self.expirations = 0
+
+    def stats(self) -> dict:
+        """Returns the hit, miss, coalesced, eviction and expiration counters along with the current size."""
+
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_ratio": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+            }
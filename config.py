@@ -0,0 +1,28 @@
+import os
+import threading
+from dotenv import load_dotenv
+
+_loaded = False
+_lock = threading.Lock()
+
+
+def load_config() -> None:
+    """Loads variables from the '.env' file into the environment, once per process.
+
+    Variables already set in the environment take precedence over the file.
+    """
+
+    global _loaded
+    if _loaded:
+        return
+    with _lock:
+        if not _loaded:
+            load_dotenv()
+            _loaded = True
+
+
+def getenv(name: str, default: str = None) -> str:
+    """Returns a setting from the environment, after loading the '.env' file if that has not happened yet."""
+
+    load_config()
+    return os.getenv(name, default)
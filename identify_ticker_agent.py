@@ -1,14 +1,11 @@
-import os
-import requests
-from dotenv import load_dotenv
-from google.adk.agents import LlmAgent
-
-load_dotenv()
-ALPHA_VANTAGE_API_KEY = os.getenv("ALPHA_VANTAGE_API_KEY")
+from .alpha_vantage import fetch, run_blocking, AlphaVantageError, AlphaVantageThrottled
+from .tracing import traced_tool
+from . import symbol_index
 
 MODEL_GEMINI_1_5_FLASH = "gemini-1.5-flash"
 
 # Tool to retrieve stock ticker symbol for a specified company
+@traced_tool
 def get_ticker(keyword: str) -> dict:
     """Retrieves the stock ticker symbol for a specified company.
 
@@ -19,44 +16,79 @@ def get_ticker(keyword: str) -> dict:
         dict: status with ticker symbol, company name and currency or error message.
     """
 
-    ticker = requests.get(f"https://www.alphavantage.co/query?function=SYMBOL_SEARCH&keywords={keyword}&apikey={ALPHA_VANTAGE_API_KEY}")
-
-    if ticker.status_code == 200:
-        data = ticker.json()
-        if "bestMatches" in data and len(data["bestMatches"]) > 0:
-            best_match = data["bestMatches"][0]
-            return {
-                "status": "success",
-                "ticker": best_match["1. symbol"],
-                "name": best_match["2. name"],
-                "currency": best_match["8. currency"]
-            }
-        else:
-            return {
-                "status": "error",
-                "error_message": f"No ticker found for '{keyword}'."
-            }
-    else:
+    # Resolve from the local symbol index first, and only call SYMBOL_SEARCH on a miss
+    listing = symbol_index.lookup(keyword)
+    if listing is not None:
+        return {
+            "status": "success",
+            "ticker": listing["ticker"],
+            "name": listing["name"],
+            # LISTING_STATUS only covers US exchanges
+            "currency": "USD"
+        }
+
+    try:
+        data = fetch("SYMBOL_SEARCH", keywords=keyword)
+    except AlphaVantageThrottled:
+        return {
+            "status": "error",
+            "error_message": f"Alpha Vantage rate limit reached while retrieving ticker information for '{keyword}'. Please try again later."
+        }
+    except AlphaVantageError:
         return {
             "status": "error",
             "error_message": f"Failed to retrieve ticker information for '{keyword}'."
         }
 
-# Create the agent that identifies stock ticker symbols using the get_ticker tool
-identify_ticker = None
-try:
-    identify_ticker = LlmAgent(
+    if "bestMatches" in data and len(data["bestMatches"]) > 0:
+        # Prefer a match on the exact ticker symbol, then the highest match score
+        best_match = max(data["bestMatches"], key=lambda match: (
+            match.get("1. symbol", "").upper() == keyword.strip().upper(),
+            float(match.get("9. matchScore", 0) or 0),
+        ))
+        return {
+            "status": "success",
+            "ticker": best_match["1. symbol"],
+            "name": best_match["2. name"],
+            "currency": best_match["8. currency"]
+        }
+    else:
+        return {
+            "status": "error",
+            "error_message": f"No ticker found for '{keyword}'."
+        }
+
+# Async variant of the get_ticker tool, awaited by ADK without blocking the event loop
+@traced_tool
+async def get_ticker_async(keyword: str) -> dict:
+    """Retrieves the stock ticker symbol for a specified company.
+
+    Args:
+        keyword (str): The name of the company or keyword for which to retrieve the ticker symbol. This is to be retrieved from the user query.
+
+    Returns:
+        dict: status with ticker symbol, company name and currency or error message.
+    """
+
+    return await run_blocking(get_ticker, keyword)
+
+# Deduplicate ticker symbols while preserving the order in which they were given
+def unique_tickers(tickers: list[str]) -> list[str]:
+    return list(dict.fromkeys(ticker.strip().upper() for ticker in tickers if ticker.strip()))
+
+# Create the agent that identifies stock ticker symbols using the get_ticker_async tool
+def create_agent():
+    from google.adk.agents import LlmAgent
+
+    return LlmAgent(
         name="identify_ticker_agent",
         model=MODEL_GEMINI_1_5_FLASH,
         description=(
-            "This agent identifies the stock ticker symbol for a specified company using the 'get_ticker' tool."
+            "This agent identifies the stock ticker symbol for a specified company using the 'get_ticker_async' tool."
         ),
-        instruction="You are an agent that identifies the stock ticker symbol for a specified company using the 'get_ticker' tool."
-        "Retrieve the appropriate company name or keyword from user query, and you should use the 'get_ticker' tool to return the ticker symbol, company name and currency for further use."
+        instruction="You are an agent that identifies the stock ticker symbol for a specified company using the 'get_ticker_async' tool."
+        "Retrieve the appropriate company name or keyword from user query, and you should use the 'get_ticker_async' tool to return the ticker symbol, company name and currency for further use."
         "If the ticker symbol is not found, return an error message."
         "NOTE: ALWAYS RETURN BACK TO THE ROOT AGENT AFTER FINALLY COMPLETING THE TASK, SO THAT IT CAN PROVIDE THE FINAL RESPONSE TO THE USER.",
-        tools=[get_ticker],
+        tools=[get_ticker_async],
     )
-    print(f"Agent '{identify_ticker.name}' created successfully.")
-except Exception as e:
-    print(f"Failed to create agent: {e}")
\ No newline at end of file
@@ -0,0 +1,125 @@
+import numpy as np
+
+# Trading days per year, used to annualise volatility
+TRADING_DAYS = 252
+
+# Return windows in trading days: 1 day, 1 week, 1 month and 3 months
+RETURN_WINDOWS = (1, 5, 21, 63)
+
+# Moving average windows in trading days
+SMA_WINDOWS = (20, 50)
+
+VOLATILITY_WINDOW = 21
+RSI_WINDOW = 14
+VOLUME_WINDOW = 20
+
+
+def stack_series(series: list, length: int = None, field: str = "close") -> np.ndarray:
+    """Stacks one field of several tickers' bars into a 2-D array, aligned on the latest bar.
+
+    Args:
+        series (list): Arrays of bars (as returned by 'timeseries_store.get_series') or 1-D arrays of values.
+        length (int): Number of most recent bars to keep. Defaults to the longest series.
+        field (str): The bar field to stack when given structured bars, e.g. 'close' or 'volume'.
+
+    Returns:
+        np.ndarray: Array of shape (tickers, length). Shorter series are padded with NaN on the left.
+    """
+
+    values = [np.asarray(s[field] if s.dtype.names else s, dtype="f8") for s in series]
+    length = length or max([len(v) for v in values], default=0)
+    stacked = np.full((len(values), length), np.nan)
+    for row, v in enumerate(values):
+        v = v[-length:]
+        if len(v):
+            stacked[row, -len(v):] = v
+    return stacked
+
+
+def compute_indicators(close: np.ndarray, volume: np.ndarray = None) -> dict:
+    """Computes technical indicators for one or many tickers in a single vectorised pass.
+
+    Indicators whose window is longer than a ticker's history are NaN for that ticker.
+
+    Args:
+        close (np.ndarray): Closing prices, shape (bars,) for one ticker or (tickers, bars), oldest bar first,
+            with missing leading bars as NaN (see 'stack_series').
+        volume (np.ndarray): Volumes with the same shape as 'close'. Volume indicators are skipped if omitted.
+
+    Returns:
+        dict: Indicator name to an array of shape (tickers,), or a scalar per indicator for 1-D input:
+            - return_{n}d: Simple return over the last n bars.
+            - sma_{n}: Simple moving average of the last n closes.
+            - price_vs_sma_{n}: Latest close relative to sma_{n}.
+            - volatility_{n}d: Annualised standard deviation of the last n daily log returns.
+            - max_drawdown: Largest peak-to-trough decline over the whole series, as a negative fraction.
+            - rsi_{n}: Relative strength index over the last n changes, using simple averages (Cutler's RSI).
+            - volume_zscore_{n}: Latest volume in standard deviations from the mean of the n bars before it.
+    """
+
+    single = np.ndim(close) == 1
+    close = np.atleast_2d(np.asarray(close, dtype="f8"))
+    bars = close.shape[1]
+    latest = close[:, -1]
+    result = {}
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for window in RETURN_WINDOWS:
+            result[f"return_{window}d"] = latest / close[:, -1 - window] - 1 if bars > window else np.full(len(close), np.nan)
+
+        for window in SMA_WINDOWS:
+            sma = close[:, -window:].mean(axis=1) if bars >= window else np.full(len(close), np.nan)
+            result[f"sma_{window}"] = sma
+            result[f"price_vs_sma_{window}"] = latest / sma - 1
+
+        log_returns = np.diff(np.log(close), axis=1)
+        if log_returns.shape[1] >= VOLATILITY_WINDOW:
+            result[f"volatility_{VOLATILITY_WINDOW}d"] = log_returns[:, -VOLATILITY_WINDOW:].std(axis=1, ddof=1) * np.sqrt(TRADING_DAYS)
+        else:
+            result[f"volatility_{VOLATILITY_WINDOW}d"] = np.full(len(close), np.nan)
+
+        # Leading NaN padding is ignored by fmax, so the running peak starts at each ticker's first bar
+        running_peak = np.fmax.accumulate(close, axis=1)
+        drawdown = close / running_peak - 1
+        all_missing = np.isnan(drawdown).all(axis=1)
+        result["max_drawdown"] = np.where(all_missing, np.nan, np.nanmin(np.where(all_missing[:, None], 0, drawdown), axis=1))
+
+        changes = np.diff(close, axis=1)
+        if changes.shape[1] >= RSI_WINDOW:
+            recent = changes[:, -RSI_WINDOW:]
+            gain = np.clip(recent, 0, None).mean(axis=1)
+            loss = np.clip(-recent, 0, None).mean(axis=1)
+            result[f"rsi_{RSI_WINDOW}"] = np.where(loss == 0, np.where(gain == 0, 50.0, 100.0), 100 - 100 / (1 + gain / loss))
+        else:
+            result[f"rsi_{RSI_WINDOW}"] = np.full(len(close), np.nan)
+
+        if volume is not None:
+            volume = np.atleast_2d(np.asarray(volume, dtype="f8"))
+            if volume.shape[1] > VOLUME_WINDOW:
+                history = volume[:, -1 - VOLUME_WINDOW:-1]
+                result[f"volume_zscore_{VOLUME_WINDOW}"] = (volume[:, -1] - history.mean(axis=1)) / history.std(axis=1, ddof=1)
+            else:
+                result[f"volume_zscore_{VOLUME_WINDOW}"] = np.full(len(volume), np.nan)
+
+    if single:
+        return {name: values[0] for name, values in result.items()}
+    return result
+
+
+def summarize(indicators: dict, row: int = None, digits: int = 4) -> dict:
+    """Returns a compact, JSON-friendly summary of the indicators of one ticker.
+
+    Args:
+        indicators (dict): The result of 'compute_indicators'.
+        row (int): The ticker's row for batched results. Omit for single-ticker results.
+        digits (int): Decimal places to round to.
+
+    Returns:
+        dict: Indicator name to a rounded float, or None where the history was too short.
+    """
+
+    summary = {}
+    for name, values in indicators.items():
+        value = float(values if row is None else values[row])
+        summary[name] = None if np.isnan(value) or np.isinf(value) else round(value, digits)
+    return summary
@@ -0,0 +1,249 @@
+import re
+import json
+import logging
+import threading
+from datetime import datetime
+from .config import getenv
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of articles kept in a news payload
+NEWS_MAX_ARTICLES = int(getenv("NEWS_MAX_ARTICLES", "8"))
+
+# Maximum characters kept of each article summary (0 drops summaries)
+NEWS_SUMMARY_CHARS = int(getenv("NEWS_SUMMARY_CHARS", "240"))
+
+# Estimated token budget of a news payload. Lowest ranked articles are dropped until it fits (0 disables)
+NEWS_TOKEN_BUDGET = int(getenv("NEWS_TOKEN_BUDGET", "1200"))
+
+# Headline word overlap (0 to 1) above which two articles are treated as the same story
+NEWS_DUPLICATE_THRESHOLD = float(getenv("NEWS_DUPLICATE_THRESHOLD", "0.7"))
+
+# Hours over which an article's ranking weight halves, relative to the newest article
+NEWS_RECENCY_HALF_LIFE = float(getenv("NEWS_RECENCY_HALF_LIFE", "24"))
+
+# Rough characters per token of JSON-encoded English text, used to estimate prompt tokens
+CHARS_PER_TOKEN = 4
+
+# Alpha Vantage sentiment label thresholds, replacing the 'sentiment_score_definition' text of each response
+SENTIMENT_LABELS = (
+    (-0.35, "Bearish"),
+    (-0.15, "Somewhat-Bearish"),
+    (0.15, "Neutral"),
+    (0.35, "Somewhat-Bullish"),
+)
+
+
+def sentiment_label(score: float) -> str:
+    """Maps a sentiment score to the Alpha Vantage label, e.g. 0.2 -> 'Somewhat-Bullish'."""
+
+    for threshold, label in SENTIMENT_LABELS:
+        if score <= threshold if threshold < 0 else score < threshold:
+            return label
+    return "Bullish"
+
+
+def _float(value, default: float = None):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _published_at(article: dict):
+    try:
+        return datetime.strptime(article.get("time_published", ""), "%Y%m%dT%H%M%S")
+    except ValueError:
+        return None
+
+
+def _ticker_sentiment(article: dict, ticker: str):
+    for entry in article.get("ticker_sentiment", []):
+        if entry.get("ticker", "").upper() == ticker:
+            return entry
+    return None
+
+
+def _headline_words(title: str) -> frozenset:
+    return frozenset(re.findall(r"[a-z0-9]+", title.lower()))
+
+
+def _is_duplicate(words: frozenset, seen: list) -> bool:
+    for other in seen:
+        union = len(words | other)
+        if union and len(words & other) / union >= NEWS_DUPLICATE_THRESHOLD:
+            return True
+    return False
+
+
+def _truncate(text: str, limit: int) -> str:
+    if len(text) <= limit:
+        return text
+    cut = text[:limit].rsplit(" ", 1)[0]
+    return cut.rstrip(" ,.;:") + "…"
+
+
+def aggregate_sentiment(feed: list, ticker: str) -> dict:
+    """Aggregates the per-ticker sentiment of every article in the feed that mentions the ticker.
+
+    Scores are weighted by each article's relevance to the ticker, so passing mentions count less.
+
+    Returns:
+        dict: Article count, relevance-weighted and plain mean scores, the label of the weighted
+            mean and the number of articles per label.
+    """
+
+    weighted_sum = weight_total = score_sum = 0.0
+    counts = {}
+    count = 0
+    for article in feed:
+        entry = _ticker_sentiment(article, ticker)
+        score = _float(entry.get("ticker_sentiment_score")) if entry else None
+        if score is None:
+            continue
+        relevance = _float(entry.get("relevance_score"), 0.0)
+        count += 1
+        score_sum += score
+        weighted_sum += score * relevance
+        weight_total += relevance
+        label = sentiment_label(score)
+        counts[label] = counts.get(label, 0) + 1
+
+    if count == 0:
+        return {"articles": 0}
+    weighted_mean = weighted_sum / weight_total if weight_total else score_sum / count
+    return {
+        "articles": count,
+        "weighted_score": round(weighted_mean, 4),
+        "mean_score": round(score_sum / count, 4),
+        "label": sentiment_label(weighted_mean),
+        "label_counts": counts,
+    }
+
+
+def rank_articles(feed: list, ticker: str) -> list:
+    """Orders articles by relevance to the ticker, decayed by age relative to the newest article."""
+
+    published = [_published_at(article) for article in feed]
+    newest = max([p for p in published if p is not None], default=None)
+
+    def weight(index: int) -> float:
+        entry = _ticker_sentiment(feed[index], ticker)
+        relevance = _float(entry.get("relevance_score"), 0.0) if entry else 0.0
+        if newest is None or published[index] is None:
+            return relevance
+        age_hours = (newest - published[index]).total_seconds() / 3600
+        return relevance * 0.5 ** (age_hours / NEWS_RECENCY_HALF_LIFE)
+
+    # Stable sort keeps the feed's own (newest first) order between equally weighted articles
+    return [feed[index] for index in sorted(range(len(feed)), key=weight, reverse=True)]
+
+
+def _compact_article(article: dict, ticker: str) -> dict:
+    compact = {
+        "title": article.get("title", "N/A"),
+        "time_published": article.get("time_published", "N/A"),
+        "source": article.get("source", "N/A"),
+    }
+    if NEWS_SUMMARY_CHARS > 0:
+        compact["summary"] = _truncate(article.get("summary", ""), NEWS_SUMMARY_CHARS)
+    entry = _ticker_sentiment(article, ticker)
+    if entry and _float(entry.get("ticker_sentiment_score")) is not None:
+        compact["sentiment_score"] = round(_float(entry["ticker_sentiment_score"]), 4)
+    else:
+        compact["sentiment_score"] = _float(article.get("overall_sentiment_score"), "N/A")
+    compact["sentiment_label"] = (sentiment_label(compact["sentiment_score"])
+                                  if isinstance(compact["sentiment_score"], float) else
+                                  article.get("overall_sentiment_label", "N/A"))
+    return compact
+
+
+def estimate_tokens(payload) -> int:
+    """Estimates the prompt tokens a tool response adds when sent to the model as JSON."""
+
+    return -(-payload_bytes(payload) // CHARS_PER_TOKEN)
+
+
+def payload_bytes(payload) -> int:
+    """Returns the size of a tool response encoded as compact JSON."""
+
+    return len(json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode())
+
+
+def compact_news(ticker: str, feed: list) -> dict:
+    """Builds a token-budgeted news digest for a ticker from a NEWS_SENTIMENT feed.
+
+    Articles are ranked by relevance and recency, near-identical headlines are dropped, summaries
+    are truncated to NEWS_SUMMARY_CHARS and at most NEWS_MAX_ARTICLES articles are kept, fewer if
+    the digest would exceed NEWS_TOKEN_BUDGET. Sentiment is aggregated over the whole feed.
+
+    Args:
+        ticker (str): The stock ticker symbol the feed was requested for.
+        feed (list): The 'feed' articles of a NEWS_SENTIMENT response.
+
+    Returns:
+        dict: The ticker, aggregated sentiment, the number of articles in the feed and the kept articles.
+    """
+
+    ticker = ticker.strip().upper()
+    news = {
+        "ticker": ticker,
+        "sentiment": aggregate_sentiment(feed, ticker),
+        "articles_in_feed": len(feed),
+        "feed": [],
+    }
+
+    seen = []
+    for article in rank_articles(feed, ticker):
+        if len(news["feed"]) >= NEWS_MAX_ARTICLES:
+            break
+        words = _headline_words(article.get("title", ""))
+        if words and _is_duplicate(words, seen):
+            continue
+        seen.append(words)
+        news["feed"].append(_compact_article(article, ticker))
+
+    # Drop the lowest ranked articles until the digest fits the budget, always keeping the top one
+    while NEWS_TOKEN_BUDGET > 0 and len(news["feed"]) > 1 and estimate_tokens(news) > NEWS_TOKEN_BUDGET:
+        news["feed"].pop()
+    return news
+
+
+_stats = {"calls": 0, "source_bytes": 0, "payload_bytes": 0}
+_stats_lock = threading.Lock()
+
+
+def record_payload(ticker: str, source, payload) -> dict:
+    """Records the size of a news response before and after compaction and logs it.
+
+    Args:
+        ticker (str): The stock ticker symbol.
+        source: The upstream response or feed the payload was built from.
+        payload: The tool response returned to the model.
+
+    Returns:
+        dict: Bytes and estimated tokens of this call's source and payload.
+    """
+
+    sizes = {"source_bytes": payload_bytes(source), "payload_bytes": payload_bytes(payload)}
+    sizes["source_tokens"] = -(-sizes["source_bytes"] // CHARS_PER_TOKEN)
+    sizes["payload_tokens"] = -(-sizes["payload_bytes"] // CHARS_PER_TOKEN)
+    with _stats_lock:
+        _stats["calls"] += 1
+        _stats["source_bytes"] += sizes["source_bytes"]
+        _stats["payload_bytes"] += sizes["payload_bytes"]
+    logger.info("news payload for %s: %d bytes (~%d tokens), compacted from %d bytes (~%d tokens)", ticker,
+                sizes["payload_bytes"], sizes["payload_tokens"], sizes["source_bytes"], sizes["source_tokens"])
+    return sizes
+
+
+def payload_stats() -> dict:
+    """Returns the totals recorded by 'record_payload' since startup."""
+
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["payload_tokens"] = -(-stats["payload_bytes"] // CHARS_PER_TOKEN)
+    stats["source_tokens"] = -(-stats["source_bytes"] // CHARS_PER_TOKEN)
+    stats["avg_payload_tokens"] = stats["payload_tokens"] / stats["calls"] if stats["calls"] else 0.0
+    stats["saved_ratio"] = 1 - stats["payload_bytes"] / stats["source_bytes"] if stats["source_bytes"] else 0.0
+    return stats
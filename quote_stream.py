@@ -0,0 +1,538 @@
+# Background quote refresher and in-process store of warm quotes.
+#
+# Subscribed tickers are re-quoted by one daemon thread, on a schedule that spends at most
+# QUOTE_REFRESH_QUOTA_SHARE of the Alpha Vantage quota and queues behind interactive calls.
+# 'get_ticker_price' answers subscribed tickers from the store without any upstream call, and
+# price changes are published to async subscribers, e.g. a server-sent events endpoint:
+#   app = google.adk.cli.fast_api.get_fast_api_app(...)
+#   quote_stream.add_quote_stream_route(app)   # GET /quotes/stream?tickers=TSLA,NVDA
+#
+# When SHARED_STORE_PATH is set, e.g. by serve.py, the subscriptions and quotes live in the shared store
+# and only one worker process at a time refreshes them, so adding workers does not multiply the refreshes.
+
+import os
+import json
+import time
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from .config import getenv
+from .tracing import start_span
+from .rate_limiter import BACKGROUND
+from .alpha_vantage import fetch, rate_limiter, AlphaVantageError, AlphaVantageThrottled, SHARED_STORE_PATH, SHARED_STORE_LEASE_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of subscribed tickers. Subscribing beyond it drops the least recently read ticker.
+QUOTE_REFRESH_MAX_TICKERS = int(getenv("QUOTE_REFRESH_MAX_TICKERS", "5"))
+
+# Minimum seconds between two refreshes of the same ticker
+QUOTE_REFRESH_INTERVAL = float(getenv("QUOTE_REFRESH_INTERVAL", "60"))
+
+# Fraction of the per-minute and per-day Alpha Vantage quota the refresher may spend
+QUOTE_REFRESH_QUOTA_SHARE = float(getenv("QUOTE_REFRESH_QUOTA_SHARE", "0.5"))
+
+# Seconds a stored quote is served by 'get_ticker_price', QUOTE_REFRESH_INTERVAL by default. An older quote,
+# e.g. when the quota share stretches the refresh period, is fetched again. 0 serves it for as long as the ticker is subscribed.
+QUOTE_MAX_AGE = float(getenv("QUOTE_MAX_AGE", str(QUOTE_REFRESH_INTERVAL)))
+
+# Subscribe every ticker quoted by 'get_ticker_price', so repeatedly asked tickers stay warm.
+# Off by default, as it spends quota on tickers nobody asked to follow.
+QUOTE_AUTO_SUBSCRIBE = getenv("QUOTE_AUTO_SUBSCRIBE", "false").lower() in ("1", "true", "yes")
+
+# Price changes buffered per stream subscriber. A subscriber that falls further behind loses the oldest ones.
+QUOTE_STREAM_QUEUE_SIZE = int(getenv("QUOTE_STREAM_QUEUE_SIZE", "100"))
+
+# Seconds between two copies of the shared subscriptions and quotes into a worker, when SHARED_STORE_PATH is set
+QUOTE_SYNC_INTERVAL = float(getenv("QUOTE_SYNC_INTERVAL", "1"))
+
+
+def _parse_quote(ticker: str, data: dict) -> dict:
+    """Builds a stored quote from the 'Global Quote' object of a GLOBAL_QUOTE response."""
+
+    return {
+        "ticker": ticker,
+        "price": data["05. price"],
+        "change": data.get("09. change"),
+        "change_percent": data.get("10. change percent"),
+        "latest_trading_day": data.get("07. latest trading day"),
+        "updated_at": time.time(),
+        "_monotonic": time.monotonic(),
+    }
+
+
+def refresh_period(tickers: int, interval: float, quota_share: float, calls_per_minute: int, calls_per_day: int) -> float:
+    """Returns the seconds between two refreshes of each of 'tickers' tickers within a share of the call quota.
+
+    Args:
+        tickers (int): Number of refreshed tickers.
+        interval (float): Minimum seconds between two refreshes of a ticker.
+        quota_share (float): Fraction of the quota the refreshes may spend. 0 ignores the quota.
+        calls_per_minute (int): Calls allowed per minute. 0 means no limit.
+        calls_per_day (int): Calls allowed per day. 0 means no limit.
+    """
+
+    period = interval
+    if tickers and quota_share > 0:
+        if calls_per_minute > 0:
+            period = max(period, tickers * 60 / (calls_per_minute * quota_share))
+        if calls_per_day > 0:
+            period = max(period, tickers * 24 * 60 * 60 / (calls_per_day * quota_share))
+    return period
+
+
+def _put_latest(queue: asyncio.Queue, event: dict) -> None:
+    # Runs on the subscriber's event loop. A full queue drops its oldest event rather than blocking the refresher.
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(event)
+
+
+class QuoteRefresher:
+    """Keeps the quotes of a bounded set of subscribed tickers warm and publishes their price changes.
+
+    Each subscribed ticker is refreshed every 'refresh_period()' seconds: at least 'interval', and
+    stretched so that all subscriptions together spend no more than 'quota_share' of the per-minute
+    and per-day call quota. Refreshes use the background priority of the rate limiter, so
+    interactive tool calls are never queued behind them. The thread is started on the first subscription.
+
+    Args:
+        max_tickers (int): Maximum number of subscribed tickers.
+        interval (float): Minimum seconds between two refreshes of the same ticker.
+        quota_share (float): Fraction of the Alpha Vantage quota the refreshes may spend.
+        max_age (float): Seconds a stored quote is served by 'get'. 0 serves it while subscribed.
+            Keep it finite when the quota share stretches the refresh period far beyond 'interval'.
+    """
+
+    def __init__(self, max_tickers: int = QUOTE_REFRESH_MAX_TICKERS, interval: float = QUOTE_REFRESH_INTERVAL,
+                 quota_share: float = QUOTE_REFRESH_QUOTA_SHARE, max_age: float = QUOTE_MAX_AGE):
+        self.max_tickers = max_tickers
+        self.interval = interval
+        self.quota_share = quota_share
+        self.max_age = max_age
+        # Subscribed tickers in least recently read order, with their stored quote or None until the first refresh
+        self._quotes = OrderedDict()
+        self._due = {}
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._stopped = False
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.errors = 0
+        self.published = 0
+        self.evictions = 0
+
+    def refresh_period(self, tickers: int = None) -> float:
+        """Returns the seconds between two refreshes of a ticker when 'tickers' tickers are subscribed."""
+
+        if tickers is None:
+            tickers = len(self._quotes)
+        return refresh_period(tickers, self.interval, self.quota_share, rate_limiter.calls_per_minute, rate_limiter.calls_per_day)
+
+    def subscribe(self, ticker: str) -> list:
+        """Adds a ticker to the refreshed set and returns the tickers evicted to make room for it."""
+
+        ticker = ticker.strip().upper()
+        evicted = []
+        with self._lock:
+            if ticker in self._quotes:
+                self._quotes.move_to_end(ticker)
+                return evicted
+            if self.max_tickers <= 0:
+                return evicted
+            while len(self._quotes) >= self.max_tickers:
+                old, _ = self._quotes.popitem(last=False)
+                del self._due[old]
+                evicted.append(old)
+                self.evictions += 1
+            self._quotes[ticker] = None
+            self._due[ticker] = time.monotonic()
+            self._start()
+        self._wakeup.set()
+        if evicted:
+            logger.info("Unsubscribed %s to make room for %s.", ", ".join(evicted), ticker)
+        return evicted
+
+    def unsubscribe(self, ticker: str) -> None:
+        """Stops refreshing a ticker and drops its stored quote."""
+
+        ticker = ticker.strip().upper()
+        with self._lock:
+            self._quotes.pop(ticker, None)
+            self._due.pop(ticker, None)
+
+    def subscribed(self) -> list:
+        """Returns the subscribed tickers, least recently read first."""
+
+        with self._lock:
+            return list(self._quotes)
+
+    def get(self, ticker: str):
+        """Returns the stored quote of a subscribed ticker, or None if it is not subscribed, not yet quoted or too old."""
+
+        ticker = ticker.strip().upper()
+        with self._lock:
+            quote = self._quotes.get(ticker)
+            if quote is None or (self.max_age > 0 and time.monotonic() - quote["_monotonic"] > self.max_age):
+                self.misses += 1
+                return None
+            self._quotes.move_to_end(ticker)
+            self.hits += 1
+            return quote
+
+    def record(self, ticker: str, data: dict) -> dict:
+        """Stores a quote fetched elsewhere if the ticker is subscribed, publishing it if the price changed.
+
+        Args:
+            ticker (str): The ticker symbol.
+            data (dict): The 'Global Quote' object of a GLOBAL_QUOTE response.
+
+        Returns:
+            dict: The quote, whether or not it was stored.
+        """
+
+        quote = _parse_quote(ticker.strip().upper(), data)
+        self._store(quote)
+        return quote
+
+    def _store(self, quote: dict) -> bool:
+        # Stores a quote of a subscribed ticker, publishing it if the price changed. Returns whether it was stored.
+        ticker = quote["ticker"]
+        with self._lock:
+            if ticker not in self._quotes:
+                return False
+            previous = self._quotes[ticker]
+            self._quotes[ticker] = quote
+            subscribers = list(self._subscribers)
+        if previous is not None and previous["price"] == quote["price"]:
+            return True
+        event = {key: value for key, value in quote.items() if not key.startswith("_")}
+        event["previous_price"] = previous["price"] if previous is not None else None
+        delivered = 0
+        for loop, queue, tickers in subscribers:
+            if tickers is None or ticker in tickers:
+                loop.call_soon_threadsafe(_put_latest, queue, event)
+                delivered += 1
+        with self._lock:
+            self.published += delivered
+        return True
+
+    def refresh(self, ticker: str) -> bool:
+        """Fetches a fresh quote for a ticker and records it. Returns whether it succeeded."""
+
+        with start_span("quote_stream.refresh", ticker=ticker):
+            try:
+                data = fetch("GLOBAL_QUOTE", priority=BACKGROUND, symbol=ticker)
+                self.record(ticker, data["Global Quote"])
+            except AlphaVantageThrottled:
+                logger.warning("Quote refresh for '%s' skipped, the Alpha Vantage rate limit is reached.", ticker)
+            except (AlphaVantageError, KeyError, TypeError):
+                logger.warning("Quote refresh for '%s' failed.", ticker, exc_info=True)
+            else:
+                self.refreshes += 1
+                return True
+        self.errors += 1
+        return False
+
+    def _start(self) -> None:
+        # Called with the lock held
+        if self._thread is None or not self._thread.is_alive():
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, name="quote_refresher", daemon=True)
+            self._thread.start()
+
+    def _next_due(self) -> tuple:
+        # Returns the ticker to refresh now, or None and the seconds until one is due (None when nothing is subscribed)
+        with self._lock:
+            ticker = min(self._due, key=self._due.get, default=None)
+            wait = None if ticker is None else self._due[ticker] - time.monotonic()
+            if wait is not None and wait <= 0:
+                self._due[ticker] = time.monotonic() + self.refresh_period()
+                return ticker, 0.0
+        return None, wait
+
+    def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            with self._lock:
+                if self._stopped:
+                    return
+            ticker, wait = self._next_due()
+            if ticker is None:
+                self._wakeup.wait(wait)
+                continue
+            self.refresh(ticker)
+
+    def stop(self) -> None:
+        """Stops the refresh thread. It is started again by the next subscription."""
+
+        with self._lock:
+            self._stopped = True
+            thread = self._thread
+        self._wakeup.set()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    async def changes(self, tickers=None, heartbeat: float = None):
+        """Yields price changes as they are published, starting with the stored quote of each ticker.
+
+        Args:
+            tickers (list[str] | None): Tickers to follow, subscribed when the stream starts. None follows
+                every subscribed ticker.
+            heartbeat (float | None): Seconds without a change after which None is yielded, e.g. to keep a
+                connection alive. None waits indefinitely.
+
+        Yields:
+            dict: The ticker, price, previous_price, change, change_percent, latest_trading_day and updated_at.
+        """
+
+        tickers = frozenset(ticker.strip().upper() for ticker in tickers) if tickers else None
+        queue = asyncio.Queue(maxsize=max(1, QUOTE_STREAM_QUEUE_SIZE))
+        subscriber = (asyncio.get_running_loop(), queue, tickers)
+        for ticker in sorted(tickers or ()):
+            self.subscribe(ticker)
+        with self._lock:
+            self._subscribers.add(subscriber)
+            current = [quote for ticker, quote in self._quotes.items() if quote is not None and (tickers is None or ticker in tickers)]
+        try:
+            for quote in current:
+                event = {key: value for key, value in quote.items() if not key.startswith("_")}
+                event["previous_price"] = None
+                yield event
+            while True:
+                if heartbeat is None:
+                    yield await queue.get()
+                    continue
+                try:
+                    yield await asyncio.wait_for(queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            with self._lock:
+                self._subscribers.discard(subscriber)
+
+    def stats(self) -> dict:
+        """Returns the subscribed tickers, refresh period, store hits and misses and refresh counters."""
+
+        with self._lock:
+            return {
+                "tickers": list(self._quotes),
+                "max_tickers": self.max_tickers,
+                "refresh_period": self.refresh_period(len(self._quotes)),
+                "subscribers": len(self._subscribers),
+                "hits": self.hits,
+                "misses": self.misses,
+                "refreshes": self.refreshes,
+                "errors": self.errors,
+                "published": self.published,
+                "evictions": self.evictions,
+            }
+
+
+class SharedQuoteRefresher(QuoteRefresher):
+    """QuoteRefresher whose subscriptions and quotes are shared by worker processes through the store.
+
+    Only the worker holding the refresher's lease in the store calls Alpha Vantage, so the refreshes
+    of all workers together spend no more than 'quota_share' of the shared quota. Every worker's
+    thread copies the subscriptions and quotes from the store every 'sync_interval' seconds,
+    publishing price changes to its own stream subscribers, and takes the lease over once its
+    holder stops renewing it. A ticker subscribed through any worker is kept warm in all of them.
+
+    Args:
+        quotes (shared_store.SharedQuotes): The shared subscriptions and quotes.
+        lease_timeout (float): Seconds the lease lasts without being renewed. It must outlast one refresh.
+        sync_interval (float): Seconds between two copies from the store.
+        **kwargs: The arguments of QuoteRefresher.
+    """
+
+    def __init__(self, quotes, lease_timeout: float, sync_interval: float = QUOTE_SYNC_INTERVAL, **kwargs):
+        super().__init__(**kwargs)
+        self.quotes = quotes
+        self.lease_timeout = lease_timeout
+        self.sync_interval = sync_interval
+        self.owner = f"{os.getpid()}:{id(self)}"
+        self.leading = False
+        # Tickers read since the last sync, marked as read in the store by the next one
+        self._reads = set()
+
+    def subscribe(self, ticker: str) -> list:
+        ticker = ticker.strip().upper()
+        if self.max_tickers <= 0:
+            return []
+        evicted = self.quotes.subscribe(ticker, self.max_tickers)
+        self._mirror(self.quotes.read())
+        with self._lock:
+            self.evictions += len(evicted)
+            self._start()
+        self._wakeup.set()
+        if evicted:
+            logger.info("Unsubscribed %s to make room for %s.", ", ".join(evicted), ticker)
+        return evicted
+
+    def unsubscribe(self, ticker: str) -> None:
+        ticker = ticker.strip().upper()
+        self.quotes.unsubscribe(ticker)
+        super().unsubscribe(ticker)
+
+    def get(self, ticker: str):
+        quote = super().get(ticker)
+        with self._lock:
+            # Subscriptions made through other workers are only seen once this worker's thread syncs
+            self._start()
+            if quote is not None:
+                self._reads.add(quote["ticker"])
+        return quote
+
+    def record(self, ticker: str, data: dict) -> dict:
+        quote = super().record(ticker, data)
+        with self._lock:
+            subscribed = quote["ticker"] in self._quotes
+        if subscribed:
+            self.quotes.write({key: value for key, value in quote.items() if not key.startswith("_")})
+        return quote
+
+    def changes(self, tickers=None, heartbeat: float = None):
+        with self._lock:
+            self._start()
+        return super().changes(tickers, heartbeat)
+
+    def _mirror(self, rows: list) -> None:
+        # Makes the local subscriptions match the shared ones and stores the shared quotes newer than the local ones
+        wall, now = time.time(), time.monotonic()
+        newer = []
+        with self._lock:
+            shared = dict(rows)
+            for ticker in [ticker for ticker in self._quotes if ticker not in shared]:
+                del self._quotes[ticker]
+                del self._due[ticker]
+            period = self.refresh_period(len(shared))
+            for ticker, quote in rows:
+                if ticker not in self._quotes:
+                    self._quotes[ticker] = None
+                    self._due[ticker] = now
+                self._quotes.move_to_end(ticker)
+                local = self._quotes[ticker]
+                if quote is not None and (local is None or local["updated_at"] < quote["updated_at"]):
+                    # Converted to this process's monotonic clock, which the age checks use
+                    quote["_monotonic"] = now - max(0.0, wall - quote["updated_at"])
+                    self._due[ticker] = quote["_monotonic"] + period
+                    newer.append(quote)
+        for quote in newer:
+            self._store(quote)
+
+    def _sync(self) -> None:
+        with self._lock:
+            reads, self._reads = self._reads, set()
+        if reads:
+            self.quotes.touch(reads)
+        self._mirror(self.quotes.read())
+        leading = bool(self._quotes) and self.quotes.hold_lease(self.owner, self.lease_timeout)
+        if self.leading and not leading:
+            self.quotes.release_lease(self.owner)
+        self.leading = leading
+
+    def _run(self) -> None:
+        from sqlalchemy.exc import SQLAlchemyError
+
+        while True:
+            self._wakeup.clear()
+            with self._lock:
+                if self._stopped:
+                    break
+            try:
+                self._sync()
+            except SQLAlchemyError:
+                logger.warning("Quote sync with the shared store failed.", exc_info=True)
+                self.leading = False
+            ticker, wait = self._next_due() if self.leading else (None, None)
+            if ticker is not None:
+                self.refresh(ticker)
+                continue
+            self._wakeup.wait(self.sync_interval if wait is None else min(wait, self.sync_interval))
+        if self.leading:
+            self.quotes.release_lease(self.owner)
+            self.leading = False
+
+    def stats(self) -> dict:
+        """Returns the counters of 'QuoteRefresher.stats' and whether this worker refreshes the quotes."""
+
+        stats = super().stats()
+        stats["leading"] = self.leading
+        return stats
+
+
+# Process-wide refresher and store read by 'get_ticker_price', shared with the other workers through SHARED_STORE_PATH
+if SHARED_STORE_PATH:
+    from .shared_store import get_engine, SharedQuotes
+    quote_refresher = SharedQuoteRefresher(SharedQuotes(get_engine(SHARED_STORE_PATH)), SHARED_STORE_LEASE_TIMEOUT + QUOTE_SYNC_INTERVAL)
+else:
+    quote_refresher = QuoteRefresher()
+
+
+def subscribe(ticker: str) -> list:
+    """Keeps a ticker's quote warm in the process-wide store. See 'QuoteRefresher.subscribe'."""
+
+    return quote_refresher.subscribe(ticker)
+
+
+def unsubscribe(ticker: str) -> None:
+    """Stops keeping a ticker's quote warm."""
+
+    quote_refresher.unsubscribe(ticker)
+
+
+def get_quote(ticker: str):
+    """Returns the warm quote of a subscribed ticker, or None if it is missing or older than QUOTE_MAX_AGE."""
+
+    return quote_refresher.get(ticker)
+
+
+def record_quote(ticker: str, data: dict) -> dict:
+    """Records a quote fetched by a tool and returns it, subscribing the ticker first when QUOTE_AUTO_SUBSCRIBE is set."""
+
+    if QUOTE_AUTO_SUBSCRIBE:
+        quote_refresher.subscribe(ticker)
+    return quote_refresher.record(ticker, data)
+
+
+def quote_changes(tickers=None, heartbeat: float = None):
+    """Async generator of price changes from the process-wide refresher. See 'QuoteRefresher.changes'."""
+
+    return quote_refresher.changes(tickers, heartbeat)
+
+
+async def sse_events(tickers=None, heartbeat: float = 15.0):
+    """Yields price changes formatted as server-sent events, with a comment line as keep-alive."""
+
+    async for event in quote_changes(tickers, heartbeat):
+        if event is None:
+            yield ": keep-alive\n\n"
+        else:
+            yield f"event: quote\ndata: {json.dumps(event)}\n\n"
+
+
+def add_quote_stream_route(app, path: str = "/quotes/stream") -> None:
+    """Adds a server-sent events endpoint of price changes to a FastAPI app, e.g. the one 'adk web' serves.
+
+    Clients pass the tickers to follow as a comma-separated 'tickers' query parameter. The route is
+    placed ahead of any mount, such as the static files of ADK's web UI mounted at '/', which would
+    otherwise catch the path first.
+    """
+
+    from fastapi.responses import StreamingResponse
+    from starlette.routing import Mount
+
+    async def quote_stream(tickers: str = ""):
+        symbols = [ticker for ticker in tickers.split(",") if ticker.strip()] or None
+        return StreamingResponse(sse_events(symbols), media_type="text/event-stream",
+                                 headers={"Cache-Control": "no-cache"})
+
+    app.add_api_route(path, quote_stream, methods=["GET"])
+    routes = app.router.routes
+    route = routes.pop()
+    first_mount = next((i for i, existing in enumerate(routes) if isinstance(existing, Mount)), len(routes))
+    routes.insert(first_mount, route)
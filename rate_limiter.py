@@ -0,0 +1,139 @@
+import heapq
+import time
+import itertools
+import threading
+from datetime import datetime, timezone
+
+# Request priorities, lower values are served first
+INTERACTIVE = 0
+BACKGROUND = 1
+
+
+class RateLimiter:
+    """Process-wide token bucket that queues callers by priority instead of failing them.
+
+    Tokens refill continuously at 'calls_per_minute' per minute, up to a burst of one
+    minute's worth of calls. Waiting callers are served strictly in priority order, and
+    in arrival order within a priority, so interactive calls overtake queued background
+    refreshes. A daily quota is tracked alongside and is never waited on, as it only
+    resets on the next (UTC) day.
+
+    Args:
+        calls_per_minute (int): Calls allowed per minute. 0 disables the per-minute limit.
+        calls_per_day (int): Calls allowed per day. 0 disables the daily limit.
+    """
+
+    def __init__(self, calls_per_minute: int, calls_per_day: int = 0):
+        self.calls_per_minute = calls_per_minute
+        self.calls_per_day = calls_per_day
+        self._tokens = float(calls_per_minute)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._day = self._today()
+        self._day_count = 0
+        self._day_exhausted = False
+        self._queue = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+
+    @staticmethod
+    def _today():
+        return datetime.now(timezone.utc).date()
+
+    def _refill(self, now: float) -> None:
+        if self.calls_per_minute > 0:
+            rate = self.calls_per_minute / 60
+            self._tokens = min(float(self.calls_per_minute), self._tokens + (now - self._updated) * rate)
+        self._updated = now
+        today = self._today()
+        if today != self._day:
+            self._day = today
+            self._day_count = 0
+            self._day_exhausted = False
+
+    def _daily_quota_left(self) -> bool:
+        if self._day_exhausted:
+            return False
+        return self.calls_per_day <= 0 or self._day_count < self.calls_per_day
+
+    def _seconds_until_available(self, now: float) -> float:
+        wait = max(0.0, self._paused_until - now)
+        if self.calls_per_minute > 0 and self._tokens < 1:
+            wait = max(wait, (1 - self._tokens) * 60 / self.calls_per_minute)
+        return wait
+
+    def _take(self, now: float) -> bool:
+        # Takes a token once '_refill' showed one is available. Returns False if it was taken by someone else meanwhile.
+        if self.calls_per_minute > 0:
+            self._tokens -= 1
+        self._day_count += 1
+        return True
+
+    def acquire(self, priority: int = INTERACTIVE, timeout: float = None) -> bool:
+        """Blocks until a call may be made and takes a token for it.
+
+        Args:
+            priority (int): INTERACTIVE or BACKGROUND. Lower values are served first.
+            timeout (float): Maximum seconds to wait in the queue. None waits indefinitely.
+
+        Returns:
+            bool: True if a token was taken, False if the daily quota is spent or the timeout expired.
+        """
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            entry = (priority, next(self._sequence))
+            heapq.heappush(self._queue, entry)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if not self._daily_quota_left():
+                        return False
+                    wait = self._seconds_until_available(now)
+                    if self._queue[0] == entry and wait == 0:
+                        if self._take(now):
+                            heapq.heappop(self._queue)
+                            return True
+                        # Another process sharing the quota took the token first, so look at the state again
+                        continue
+                    if deadline is not None:
+                        remaining = deadline - now
+                        if remaining <= 0:
+                            return False
+                        wait = min(wait, remaining) if wait else remaining
+                    # Only the head of the queue waits for a token; the others wait to be notified
+                    self._condition.wait(wait if self._queue[0] == entry or deadline is not None else None)
+            finally:
+                if entry in self._queue:
+                    self._queue.remove(entry)
+                    heapq.heapify(self._queue)
+                self._condition.notify_all()
+
+    def pause(self, seconds: float) -> None:
+        """Holds back every queued caller for the given number of seconds, e.g. after a throttle notice."""
+
+        with self._condition:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = min(self._tokens, 0.0)
+
+    def exhaust_day(self) -> None:
+        """Marks the daily quota as spent, so calls fail fast until the next day."""
+
+        with self._condition:
+            self._refill(time.monotonic())
+            self._day_exhausted = True
+            self._condition.notify_all()
+
+    def stats(self) -> dict:
+        """Returns the available tokens, queued callers and calls made today."""
+
+        with self._condition:
+            self._refill(time.monotonic())
+            return {
+                "tokens": self._tokens,
+                "queued": len(self._queue),
+                "calls_today": self._day_count,
+                "calls_per_minute": self.calls_per_minute,
+                "calls_per_day": self.calls_per_day,
+            }
@@ -0,0 +1,66 @@
+import logging
+import importlib
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Sub-agents by name. Each module defines a 'create_agent' factory for the agent of the same name.
+AGENT_MODULES = (
+    "identify_ticker_agent",
+    "ticker_price_agent",
+    "ticker_price_change_agent",
+    "ticker_news_agent",
+    "ticker_analysis_agent",
+)
+
+_agents = {}
+_agent_tools = {}
+_lock = threading.RLock()
+
+
+def get_agent(name: str):
+    """Returns the sub-agent with the given name, creating it on first use.
+
+    Agents are built lazily so that importing the package, or using a tool function directly,
+    does not import ADK or construct any agent.
+
+    Args:
+        name (str): The agent name, one of AGENT_MODULES. Example: 'ticker_price_agent'.
+
+    Returns:
+        LlmAgent: The shared agent instance.
+
+    Raises:
+        KeyError: If there is no agent with this name.
+    """
+
+    if name not in AGENT_MODULES:
+        raise KeyError(f"Unknown agent '{name}'.")
+    with _lock:
+        if name not in _agents:
+            module = importlib.import_module(f".{name}", __package__)
+            try:
+                _agents[name] = module.create_agent()
+            except Exception:
+                logger.exception("Failed to create agent '%s'.", name)
+                raise
+            logger.info("Agent '%s' created.", name)
+        return _agents[name]
+
+
+def get_agent_tool(name: str):
+    """Returns the sub-agent with the given name wrapped as an AgentTool, creating both on first use."""
+
+    with _lock:
+        if name not in _agent_tools:
+            from google.adk.tools import agent_tool
+            _agent_tools[name] = agent_tool.AgentTool(agent=get_agent(name))
+        return _agent_tools[name]
+
+
+def reset() -> None:
+    """Drops every created agent and AgentTool, so the next lookups build new instances."""
+
+    with _lock:
+        _agents.clear()
+        _agent_tools.clear()
@@ -0,0 +1,141 @@
+# Record and replay of Alpha Vantage HTTP calls, to run the agents offline and deterministically.
+#
+# With ALPHA_VANTAGE_REPLAY_MODE=record, every upstream response is appended to a cassette file
+# (ALPHA_VANTAGE_CASSETTE), one JSON object per line, while the calls still go to Alpha Vantage.
+# With ALPHA_VANTAGE_REPLAY_MODE=replay, the client answers from the cassette and never touches the
+# network. Repeated calls with the same parameters get the recorded responses in order, cycling back
+# to the first. A call that was never recorded fails like an unreachable upstream.
+#
+# The API key is never written to the cassette and is ignored when matching calls.
+
+import os
+import json
+import time
+import logging
+import threading
+from collections import defaultdict
+import requests
+from .config import getenv
+
+logger = logging.getLogger(__name__)
+
+# 'off', 'record' or 'replay'
+ALPHA_VANTAGE_REPLAY_MODE = getenv("ALPHA_VANTAGE_REPLAY_MODE", "off").lower()
+
+# Cassette file recorded to or replayed from
+ALPHA_VANTAGE_CASSETTE = getenv("ALPHA_VANTAGE_CASSETTE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "cassette.jsonl"))
+
+# Seconds every replayed call sleeps, to stand in for the upstream latency
+ALPHA_VANTAGE_REPLAY_LATENCY = float(getenv("ALPHA_VANTAGE_REPLAY_LATENCY", "0"))
+
+# Query parameters left out of the cassette
+_IGNORED_PARAMS = ("apikey",)
+
+
+class CassetteMiss(LookupError):
+    """Raised when a replayed call has no recorded response."""
+
+
+def call_key(function: str, query: dict) -> str:
+    """Returns the key recorded calls are matched on: the function and its parameters, without the API key."""
+
+    params = {name: str(value) for name, value in query.items() if name not in _IGNORED_PARAMS and name != "function"}
+    return json.dumps([function, sorted(params.items())])
+
+
+class Cassette:
+    """Recorded Alpha Vantage responses, appended to or replayed from a JSONL file.
+
+    Args:
+        path (str): The cassette file. Its directory is created when recording.
+        mode (str): 'record' or 'replay'.
+        latency (float): Seconds every replayed call sleeps.
+    """
+
+    def __init__(self, path: str = ALPHA_VANTAGE_CASSETTE, mode: str = "replay", latency: float = ALPHA_VANTAGE_REPLAY_LATENCY):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode '{mode}'.")
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self._entries = defaultdict(list)
+        self._positions = defaultdict(int)
+        self._lock = threading.Lock()
+        self.calls = defaultdict(int)
+        self.misses = 0
+        if mode == "record":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        else:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries[call_key(entry["function"], entry["params"])].append(entry)
+            logger.info("Replaying %d recorded Alpha Vantage calls from %s.", sum(map(len, self._entries.values())), path)
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._entries.values())
+
+    def record(self, function: str, query: dict, response: requests.Response) -> None:
+        """Appends an upstream response to the cassette file."""
+
+        entry = {
+            "function": function,
+            "params": {name: value for name, value in query.items() if name not in _IGNORED_PARAMS and name != "function"},
+            "status": response.status_code,
+            "body": response.text,
+        }
+        line = json.dumps(entry) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+            self._entries[call_key(function, query)].append(entry)
+            self.calls[function] += 1
+
+    def replay(self, function: str, query: dict) -> requests.Response:
+        """Returns the next recorded response for a call.
+
+        Raises:
+            CassetteMiss: If the call was never recorded.
+        """
+
+        key = call_key(function, query)
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                self.misses += 1
+                raise CassetteMiss(f"No recorded response for {function} {query.get('symbol') or query.get('keywords') or query.get('tickers') or ''}.")
+            entry = entries[self._positions[key] % len(entries)]
+            self._positions[key] += 1
+            self.calls[function] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        response = requests.Response()
+        response.status_code = entry["status"]
+        response._content = entry["body"].encode("utf-8")
+        response.encoding = "utf-8"
+        response.headers["Content-Type"] = "application/json"
+        return response
+
+    def rewind(self) -> None:
+        """Starts every call over at its first recorded response and resets the counters."""
+
+        with self._lock:
+            self._positions.clear()
+            self.calls.clear()
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """Returns the calls recorded or replayed per function and the replayed calls without a recording."""
+
+        with self._lock:
+            return {"mode": self.mode, "calls": dict(self.calls), "misses": self.misses}
+
+
+def open_cassette(mode: str = ALPHA_VANTAGE_REPLAY_MODE, path: str = ALPHA_VANTAGE_CASSETTE):
+    """Returns the cassette for a replay mode, or None when the mode is 'off'."""
+
+    if mode == "off":
+        return None
+    return Cassette(path, mode)
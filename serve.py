@@ -0,0 +1,74 @@
+# Multi-process serving of the root agent.
+#
+# Runs ADK's FastAPI app, the API behind 'adk web' and optionally its web UI, in several uvicorn
+# worker processes. Sessions are stored in a database shared by the workers, so any worker can serve
+# the next turn of a conversation, and the Alpha Vantage response cache and call quota are shared
+# through the SQLite file at SHARED_STORE_PATH (see shared_store.py). So are the quote subscriptions of
+# quote_stream.py, refreshed by one worker at a time; every worker serves their changes at /quotes/stream.
+#
+#   python -m <agent_package>.serve --workers 4 --port 8000
+
+import os
+import logging
+import argparse
+from .config import getenv
+
+logger = logging.getLogger(__name__)
+
+_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+# Number of worker processes
+SERVE_WORKERS = int(getenv("SERVE_WORKERS", str(os.cpu_count() or 1)))
+
+# Session database shared by the workers, as an SQLAlchemy URL
+SESSION_DB_URL = getenv("SESSION_DB_URL", f"sqlite:///{os.path.join(_DATA_DIR, 'sessions.db')}")
+
+# Shared store file used when SHARED_STORE_PATH is not set
+DEFAULT_SHARED_STORE_PATH = os.path.join(_DATA_DIR, "shared.db")
+
+# Serve ADK's web UI alongside the API
+SERVE_WEB_UI = getenv("SERVE_WEB_UI", "false").lower() in ("1", "true", "yes")
+
+
+def create_app():
+    """Builds the FastAPI app of one worker. Used by uvicorn as an app factory.
+
+    SHARED_STORE_PATH must be set in the environment before the package's tools are imported,
+    which 'main' does before starting the workers.
+    """
+
+    from google.adk.cli.fast_api import get_fast_api_app
+    from .quote_stream import add_quote_stream_route
+
+    # ADK loads the agent by package name from the directory that contains it
+    agent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    app = get_fast_api_app(agent_dir=agent_dir, session_db_url=SESSION_DB_URL, web=SERVE_WEB_UI)
+    add_quote_stream_route(app)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the root agent from several worker processes.")
+    parser.add_argument("--workers", type=int, default=SERVE_WORKERS)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    import uvicorn
+    from .shared_store import get_engine
+    from google.adk.sessions import DatabaseSessionService
+
+    # Workers inherit the environment, so they all open the same store
+    os.makedirs(_DATA_DIR, exist_ok=True)
+    os.environ.setdefault("SHARED_STORE_PATH", DEFAULT_SHARED_STORE_PATH)
+
+    # Create the shared tables once up front rather than in every worker at the same time
+    get_engine(os.environ["SHARED_STORE_PATH"])
+    DatabaseSessionService(db_url=SESSION_DB_URL)
+
+    logger.info("Serving with %d workers, sharing %s.", args.workers, os.environ["SHARED_STORE_PATH"])
+    uvicorn.run(f"{__package__}.serve:create_app", factory=True, host=args.host, port=args.port, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,441 @@
+# Response cache and Alpha Vantage call quota shared by worker processes through one SQLite file.
+#
+# Each worker keeps its in-process LRU cache in front of the shared one, so hot responses are still
+# served from memory. On a local miss, the shared table is read; if it has no fresh entry, one worker
+# takes a lease on the key and calls Alpha Vantage while the others poll for its result, so adding
+# workers does not multiply upstream calls. The token bucket of the rate limiter lives in the same
+# file and is updated with compare-and-swap writes, so all workers together stay within the quota.
+# Subscribed tickers of the quote refresher and their latest quotes are kept there too, so that one
+# worker at a time, the holder of the refresher's lease, refreshes them for all workers.
+#
+# Used by alpha_vantage.py when SHARED_STORE_PATH is set, e.g. by 'python -m <agent_package>.serve'.
+
+import os
+import json
+import time
+import logging
+import threading
+from sqlalchemy import MetaData, Table, Column, String, Text, Float, Integer, Boolean, create_engine, event, select, update, delete, func, or_
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.exc import OperationalError
+from .config import getenv
+from .cache import TTLCache
+from .rate_limiter import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+# Seconds between two looks at the shared cache while waiting for another worker's call
+SHARED_STORE_POLL_INTERVAL = float(getenv("SHARED_STORE_POLL_INTERVAL", "0.02"))
+
+# Expired responses are deleted after every this many writes
+_PURGE_EVERY = 64
+
+metadata = MetaData()
+
+responses = Table(
+    "responses", metadata,
+    Column("key", String, primary_key=True),
+    Column("value", Text, nullable=False),
+    Column("expires_at", Float, nullable=False, index=True),
+)
+
+leases = Table(
+    "leases", metadata,
+    Column("key", String, primary_key=True),
+    Column("owner", String, nullable=False),
+    Column("expires_at", Float, nullable=False),
+)
+
+quotas = Table(
+    "quotas", metadata,
+    Column("name", String, primary_key=True),
+    Column("tokens", Float, nullable=False),
+    Column("updated", Float, nullable=False),
+    Column("paused_until", Float, nullable=False, default=0.0),
+    Column("day", String, nullable=False),
+    Column("day_count", Integer, nullable=False, default=0),
+    Column("day_exhausted", Boolean, nullable=False, default=False),
+    Column("version", Integer, nullable=False, default=0),
+)
+
+subscriptions = Table(
+    "subscriptions", metadata,
+    Column("ticker", String, primary_key=True),
+    Column("read_at", Float, nullable=False, index=True),
+    Column("quote", Text, nullable=True),
+    Column("updated_at", Float, nullable=True),
+)
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def _configure_connection(dbapi_connection, connection_record) -> None:
+    # WAL lets readers in every worker proceed while one of them writes
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+
+def get_engine(path: str):
+    """Returns the SQLAlchemy engine for a shared store file, creating the file and its tables on first use."""
+
+    path = os.path.abspath(path)
+    with _engines_lock:
+        if path not in _engines:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            engine = create_engine(f"sqlite:///{path}", connect_args={"timeout": 30, "check_same_thread": False})
+            event.listen(engine, "connect", _configure_connection)
+            # Workers starting together race to create the tables. A loser finds the table it wanted created
+            # between its existence check and its CREATE TABLE, and tries again for the tables left.
+            for attempt in range(len(metadata.tables) + 1):
+                try:
+                    metadata.create_all(engine)
+                    break
+                except OperationalError:
+                    if attempt == len(metadata.tables):
+                        raise
+            _engines[path] = engine
+        return _engines[path]
+
+
+def _key_text(key) -> str:
+    return json.dumps(key, default=str)
+
+
+class SharedTTLCache(TTLCache):
+    """TTLCache whose misses are looked up in, and loaded into, a cache table shared by worker processes.
+
+    Concurrent misses for the same key are coalesced within a process by TTLCache, and across
+    processes by a lease: only the worker holding it runs the loader, the others poll the table,
+    with reads only, for the result until it is written or the lease expires, and then take the
+    lease over. The lease must outlast the slowest load, or a second worker makes the same call.
+    Values must be JSON serialisable. Entries read from the table stay in the local cache for
+    their remaining lifetime.
+
+    Args:
+        engine: The SQLAlchemy engine of the shared store, see 'get_engine'.
+        maxsize (int): Maximum number of entries kept in the local cache.
+        lease_timeout (float): Seconds a lease is held, i.e. the longest another worker's load is waited for.
+            alpha_vantage.py sets it from its queue wait and request timeouts.
+        poll_interval (float): Seconds between two looks at the table while waiting.
+    """
+
+    def __init__(self, engine, maxsize: int = 1024, lease_timeout: float = 60.0,
+                 poll_interval: float = SHARED_STORE_POLL_INTERVAL):
+        super().__init__(maxsize)
+        self.engine = engine
+        self.lease_timeout = lease_timeout
+        self.poll_interval = poll_interval
+        self.shared_hits = 0
+        self.shared_misses = 0
+        self.shared_waits = 0
+        self._writes = 0
+
+    def get_or_load(self, key, loader, ttl):
+        remaining = []
+
+        def load():
+            value, seconds = self._get_or_load_shared(_key_text(key), loader, ttl)
+            remaining.append(seconds)
+            return value
+
+        return super().get_or_load(key, load, lambda value: remaining[0] if remaining else 0.0)
+
+    def _read(self, key: str):
+        with self.engine.connect() as connection:
+            row = connection.execute(select(responses.c.value, responses.c.expires_at).where(responses.c.key == key)).first()
+        if row is not None and row.expires_at > time.time():
+            return row
+        return None
+
+    def _poll(self, key: str) -> tuple:
+        # Returns the fresh row, if any, and whether another worker holds an unexpired lease on the key, without writing
+        now = time.time()
+        with self.engine.connect() as connection:
+            row = connection.execute(select(responses.c.value, responses.c.expires_at).where(responses.c.key == key)).first()
+            if row is not None and row.expires_at > now:
+                return row, False
+            leased = connection.execute(select(leases.c.key).where(leases.c.key == key, leases.c.expires_at > now)).first()
+        return None, leased is not None
+
+    def _lease(self, key: str, owner: str) -> bool:
+        now = time.time()
+        with self.engine.begin() as connection:
+            connection.execute(delete(leases).where(leases.c.key == key, leases.c.expires_at <= now))
+            result = connection.execute(insert(leases).values(key=key, owner=owner, expires_at=now + self.lease_timeout)
+                                        .on_conflict_do_nothing())
+        return result.rowcount == 1
+
+    def _get_or_load_shared(self, key: str, loader, ttl) -> tuple:
+        # Returns the value and the seconds it stays fresh
+        owner = f"{os.getpid()}:{threading.get_ident()}"
+        waited = False
+        while True:
+            row, held = self._poll(key)
+            if row is not None:
+                with self._lock:
+                    self.shared_hits += 1
+                    self.shared_waits += waited
+                return json.loads(row.value), row.expires_at - time.time()
+            # Writing only once the lease looks free keeps waiting workers off SQLite's single write lock
+            if not held and self._lease(key, owner):
+                # The previous holder may have written the value and released the lease since the poll
+                row = self._read(key)
+                if row is not None:
+                    with self.engine.begin() as connection:
+                        connection.execute(delete(leases).where(leases.c.key == key, leases.c.owner == owner))
+                    continue
+                break
+            waited = True
+            time.sleep(self.poll_interval)
+
+        with self._lock:
+            self.shared_misses += 1
+        try:
+            value = loader()
+            seconds = ttl(value) if callable(ttl) else ttl
+            if seconds > 0:
+                self._write(key, value, seconds)
+            return value, seconds
+        finally:
+            with self.engine.begin() as connection:
+                connection.execute(delete(leases).where(leases.c.key == key, leases.c.owner == owner))
+
+    def _write(self, key: str, value, seconds: float) -> None:
+        now = time.time()
+        statement = insert(responses).values(key=key, value=json.dumps(value), expires_at=now + seconds)
+        statement = statement.on_conflict_do_update(index_elements=["key"], set_={
+            "value": statement.excluded.value, "expires_at": statement.excluded.expires_at})
+        with self._lock:
+            self._writes += 1
+            purge = self._writes % _PURGE_EVERY == 0
+        with self.engine.begin() as connection:
+            connection.execute(statement)
+            if purge:
+                connection.execute(delete(responses).where(responses.c.expires_at <= now))
+
+    def clear(self) -> None:
+        """Removes all entries, local and shared, and resets the counters."""
+
+        super().clear()
+        with self.engine.begin() as connection:
+            connection.execute(delete(responses))
+            connection.execute(delete(leases))
+        with self._lock:
+            self.shared_hits = self.shared_misses = self.shared_waits = 0
+
+    def stats(self) -> dict:
+        """Returns the local cache counters, along with the shared table's size, hits, misses and waits on other workers."""
+
+        stats = super().stats()
+        with self.engine.connect() as connection:
+            shared_size = connection.execute(select(func.count()).select_from(responses)).scalar()
+        with self._lock:
+            stats.update({
+                "shared_size": shared_size,
+                "shared_hits": self.shared_hits,
+                "shared_misses": self.shared_misses,
+                "shared_waits": self.shared_waits,
+            })
+        return stats
+
+
+class SharedRateLimiter(RateLimiter):
+    """RateLimiter whose token bucket and daily count are shared by worker processes through the store.
+
+    Callers within a process still queue by priority, and the head of the queue takes tokens
+    from the shared bucket. Across processes there is no priority order: whichever worker
+    finds a token first takes it. Pauses after throttle notices and an exhausted daily quota
+    apply to every worker.
+
+    Args:
+        engine: The SQLAlchemy engine of the shared store, see 'get_engine'.
+        calls_per_minute (int): Calls allowed per minute, by all workers together. 0 disables the per-minute limit.
+        calls_per_day (int): Calls allowed per day, by all workers together. 0 disables the daily limit.
+        name (str): Name of the quota in the store, for several API keys sharing one file.
+    """
+
+    def __init__(self, engine, calls_per_minute: int, calls_per_day: int = 0, name: str = "alpha_vantage"):
+        super().__init__(calls_per_minute, calls_per_day)
+        self.engine = engine
+        self.name = name
+
+    def _limited(self) -> bool:
+        return self.calls_per_minute > 0 or self.calls_per_day > 0
+
+    def _load(self) -> dict:
+        with self.engine.connect() as connection:
+            row = connection.execute(select(quotas).where(quotas.c.name == self.name)).mappings().first()
+        if row is not None:
+            return dict(row)
+        state = {"name": self.name, "tokens": float(self.calls_per_minute), "updated": time.time(), "paused_until": 0.0,
+                 "day": self._today().isoformat(), "day_count": 0, "day_exhausted": False, "version": 0}
+        with self.engine.begin() as connection:
+            connection.execute(insert(quotas).values(**state).on_conflict_do_nothing())
+        return self._load()
+
+    def _refilled(self, state: dict, now: float) -> dict:
+        state = dict(state)
+        if self.calls_per_minute > 0:
+            rate = self.calls_per_minute / 60
+            state["tokens"] = min(float(self.calls_per_minute), state["tokens"] + max(0.0, now - state["updated"]) * rate)
+        state["updated"] = now
+        today = self._today().isoformat()
+        if state["day"] != today:
+            state.update(day=today, day_count=0, day_exhausted=False)
+        return state
+
+    def _swap(self, old: dict, new: dict) -> bool:
+        # Writes the new state only if no other worker changed it since it was read
+        values = {key: value for key, value in new.items() if key not in ("name", "version")}
+        with self.engine.begin() as connection:
+            result = connection.execute(update(quotas)
+                                        .where(quotas.c.name == self.name, quotas.c.version == old["version"])
+                                        .values(**values, version=old["version"] + 1))
+        return result.rowcount == 1
+
+    def _apply(self, state: dict, now: float) -> None:
+        # Mirrors the shared state into the fields the base class reads, converting wall clock to monotonic time
+        wall = time.time()
+        self._tokens = state["tokens"]
+        self._updated = now
+        self._paused_until = now + max(0.0, state["paused_until"] - wall)
+        self._day_count = state["day_count"]
+        self._day_exhausted = state["day_exhausted"]
+
+    def _refill(self, now: float) -> None:
+        if not self._limited():
+            return super()._refill(now)
+        self._apply(self._refilled(self._load(), time.time()), now)
+
+    def _take(self, now: float) -> bool:
+        if not self._limited():
+            return super()._take(now)
+        old = self._load()
+        wall = time.time()
+        state = self._refilled(old, wall)
+        if state["paused_until"] > wall or state["day_exhausted"]:
+            return False
+        if self.calls_per_minute > 0 and state["tokens"] < 1:
+            return False
+        if self.calls_per_day > 0 and state["day_count"] >= self.calls_per_day:
+            return False
+        if self.calls_per_minute > 0:
+            state["tokens"] -= 1
+        state["day_count"] += 1
+        if not self._swap(old, state):
+            return False
+        self._apply(state, now)
+        return True
+
+    def _update(self, change) -> None:
+        while True:
+            old = self._load()
+            state = self._refilled(old, time.time())
+            change(state)
+            if self._swap(old, state):
+                return
+
+    def pause(self, seconds: float) -> None:
+        """Holds back every queued caller, in every worker, for the given number of seconds."""
+
+        if not self._limited():
+            return super().pause(seconds)
+        until = time.time() + seconds
+
+        def change(state):
+            state["paused_until"] = max(state["paused_until"], until)
+            state["tokens"] = min(state["tokens"], 0.0)
+
+        with self._condition:
+            self._update(change)
+
+    def exhaust_day(self) -> None:
+        """Marks the daily quota as spent for every worker, so calls fail fast until the next day."""
+
+        if not self._limited():
+            return super().exhaust_day()
+        with self._condition:
+            self._update(lambda state: state.update(day_exhausted=True))
+            self._condition.notify_all()
+
+
+class SharedQuotes:
+    """Subscribed tickers and their latest quotes, shared by worker processes through the store.
+
+    Also holds the lease of the one worker that refreshes the quotes, see 'quote_stream.SharedQuoteRefresher'.
+
+    Args:
+        engine: The SQLAlchemy engine of the shared store, see 'get_engine'.
+        name (str): Name of the refresher's lease in the store.
+    """
+
+    def __init__(self, engine, name: str = "quote_refresher"):
+        self.engine = engine
+        self.name = name
+
+    def subscribe(self, ticker: str, max_tickers: int) -> list:
+        """Adds or touches a subscription and returns the least recently read tickers dropped to stay within 'max_tickers'."""
+
+        now = time.time()
+        statement = insert(subscriptions).values(ticker=ticker, read_at=now)
+        statement = statement.on_conflict_do_update(index_elements=["ticker"], set_={"read_at": statement.excluded.read_at})
+        with self.engine.begin() as connection:
+            connection.execute(statement)
+            evicted = connection.execute(select(subscriptions.c.ticker).order_by(subscriptions.c.read_at.desc())
+                                         .offset(max(0, max_tickers))).scalars().all()
+            if evicted:
+                connection.execute(delete(subscriptions).where(subscriptions.c.ticker.in_(evicted)))
+        return list(evicted)
+
+    def unsubscribe(self, ticker: str) -> None:
+        """Drops a subscription and its quote."""
+
+        with self.engine.begin() as connection:
+            connection.execute(delete(subscriptions).where(subscriptions.c.ticker == ticker))
+
+    def touch(self, tickers) -> None:
+        """Marks subscribed tickers as just read, so they are the last to be dropped."""
+
+        with self.engine.begin() as connection:
+            connection.execute(update(subscriptions).where(subscriptions.c.ticker.in_(list(tickers))).values(read_at=time.time()))
+
+    def write(self, quote: dict) -> None:
+        """Stores the quote of a subscribed ticker unless a more recent one is stored. The quote must be JSON serialisable."""
+
+        with self.engine.begin() as connection:
+            connection.execute(update(subscriptions)
+                               .where(subscriptions.c.ticker == quote["ticker"],
+                                      or_(subscriptions.c.updated_at.is_(None), subscriptions.c.updated_at < quote["updated_at"]))
+                               .values(quote=json.dumps(quote), updated_at=quote["updated_at"]))
+
+    def read(self) -> list:
+        """Returns the subscribed tickers, least recently read first, each with its stored quote or None."""
+
+        with self.engine.connect() as connection:
+            rows = connection.execute(select(subscriptions.c.ticker, subscriptions.c.quote)
+                                      .order_by(subscriptions.c.read_at)).all()
+        return [(row.ticker, json.loads(row.quote) if row.quote is not None else None) for row in rows]
+
+    def hold_lease(self, owner: str, seconds: float) -> bool:
+        """Takes or renews the refresher's lease for 'seconds'. Returns False if another owner holds it."""
+
+        now = time.time()
+        with self.engine.connect() as connection:
+            row = connection.execute(select(leases.c.owner, leases.c.expires_at).where(leases.c.key == self.name)).first()
+        # Only write when the lease is free or ours, so waiting workers stay off SQLite's write lock
+        if row is not None and row.owner != owner and row.expires_at > now:
+            return False
+        with self.engine.begin() as connection:
+            connection.execute(delete(leases).where(leases.c.key == self.name, or_(leases.c.owner == owner, leases.c.expires_at <= now)))
+            result = connection.execute(insert(leases).values(key=self.name, owner=owner, expires_at=now + seconds)
+                                        .on_conflict_do_nothing())
+        return result.rowcount == 1
+
+    def release_lease(self, owner: str) -> None:
+        """Gives up the refresher's lease if 'owner' holds it."""
+
+        with self.engine.begin() as connection:
+            connection.execute(delete(leases).where(leases.c.key == self.name, leases.c.owner == owner))
@@ -0,0 +1,310 @@
+# Local, memory-mapped index of listed symbols used to resolve company names without calling SYMBOL_SEARCH.
+#
+# The index is built from an Alpha Vantage LISTING_STATUS CSV and stored as two NumPy
+# structured arrays that are memory-mapped on load, so startup does not parse anything:
+#   - rows.npy: one record per listing (symbol, name, exchange, asset type), sorted by symbol.
+#   - keys.npy: normalised name keys pointing at a row, sorted by key.
+#
+# Rebuild it with:
+#   python -m <agent_package>.symbol_index rebuild [--csv LISTING_STATUS.csv]
+
+import os
+import re
+import csv
+import io
+import shutil
+import difflib
+import argparse
+import threading
+import numpy as np
+from .config import getenv
+
+# Directory holding the index files
+SYMBOL_INDEX_DIR = getenv("SYMBOL_INDEX_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "symbol_index"))
+
+# Minimum keyword length for prefix matches, so short keywords do not match arbitrary names
+MIN_PREFIX_LENGTH = 3
+
+# Similarity ratio (0 to 1) a name must reach to be accepted as a fuzzy match
+FUZZY_CUTOFF = 0.8
+
+# Trailing words dropped from company names to build the short alias, e.g. 'Tesla Inc' -> 'tesla'
+NAME_SUFFIXES = {
+    "inc", "incorporated", "corp", "corporation", "co", "company", "ltd", "limited", "plc", "llc", "lp",
+    "sa", "nv", "ag", "se", "holding", "holdings", "group", "class", "a", "b", "c", "common", "stock",
+    "shares", "ordinary", "new", "the", "and", "adr", "ads",
+}
+
+# Common names that do not match the listed company name
+ALIASES = {
+    "google": "GOOGL",
+    "facebook": "META",
+    "instagram": "META",
+    "berkshire": "BRK-B",
+    "walmart": "WMT",
+    "coca cola": "KO",
+    "coke": "KO",
+    "jp morgan": "JPM",
+    "jpmorgan": "JPM",
+}
+
+# Exchanges preferred when several listings share a name
+MAJOR_EXCHANGES = (b"NYSE", b"NASDAQ")
+
+
+def normalize(text: str) -> str:
+    """Lower-cases a company name or keyword and reduces it to single-spaced alphanumeric words."""
+
+    text = text.lower().replace("&", " and ")
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", text).split())
+
+
+def short_name(name: str) -> str:
+    """Returns the normalised name with corporate suffixes such as 'Inc' or 'Class A' removed."""
+
+    words = normalize(name).split()
+    while len(words) > 1 and words[-1] in NAME_SUFFIXES:
+        words.pop()
+    if len(words) > 1 and words[0] == "the":
+        words.pop(0)
+    return " ".join(words)
+
+
+def build_index(csv_text: str, index_dir: str = SYMBOL_INDEX_DIR) -> int:
+    """Builds the index from LISTING_STATUS CSV text and writes it to 'index_dir'.
+
+    Args:
+        csv_text (str): The CSV with at least 'symbol', 'name', 'exchange' and 'assetType' columns.
+        index_dir (str): The directory to write the index to. An existing index is replaced.
+
+    Returns:
+        int: The number of listings in the index.
+    """
+
+    listings = {}
+    for record in csv.DictReader(io.StringIO(csv_text)):
+        symbol = (record.get("symbol") or "").strip().upper()
+        name = (record.get("name") or "").strip()
+        if symbol and name and record.get("status", "Active") == "Active":
+            listings[symbol] = (name, record.get("exchange", ""), record.get("assetType", ""))
+
+    symbols = sorted(listings)
+    encoded_names = [listings[symbol][0].encode() for symbol in symbols]
+    rows = np.zeros(len(symbols), dtype=[
+        ("symbol", f"S{max([len(symbol) for symbol in symbols], default=1)}"),
+        ("name", f"S{max([len(name) for name in encoded_names], default=1)}"),
+        ("exchange", "S16"),
+        ("asset_type", "S8"),
+    ])
+    rows["symbol"] = [symbol.encode() for symbol in symbols]
+    rows["name"] = encoded_names
+    rows["exchange"] = [listings[symbol][1].encode()[:16] for symbol in symbols]
+    rows["asset_type"] = [listings[symbol][2].encode()[:8] for symbol in symbols]
+
+    key_rows = set()
+    for row, symbol in enumerate(symbols):
+        name = listings[symbol][0]
+        key_rows.add((normalize(name).encode(), row))
+        key_rows.add((short_name(name).encode(), row))
+    key_rows = sorted(key for key in key_rows if key[0])
+    keys = np.zeros(len(key_rows), dtype=[("key", f"S{max([len(k) for k, _ in key_rows], default=1)}"), ("row", "<i4")])
+    keys["key"] = [key for key, _ in key_rows]
+    keys["row"] = [row for _, row in key_rows]
+
+    # Write to a temporary directory and swap it in, so readers never see a half-written index
+    tmp_dir = f"{index_dir}.tmp"
+    old_dir = f"{index_dir}.old"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    np.save(os.path.join(tmp_dir, "rows.npy"), rows)
+    np.save(os.path.join(tmp_dir, "keys.npy"), keys)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if os.path.isdir(index_dir):
+        os.rename(index_dir, old_dir)
+    os.rename(tmp_dir, index_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    return len(rows)
+
+
+class SymbolIndex:
+    """Read-only view of an index built by 'build_index', memory-mapped from disk.
+
+    Args:
+        index_dir (str): The directory the index was written to.
+    """
+
+    def __init__(self, index_dir: str = SYMBOL_INDEX_DIR):
+        self.rows = np.load(os.path.join(index_dir, "rows.npy"), mmap_mode="r")
+        self.keys = np.load(os.path.join(index_dir, "keys.npy"), mmap_mode="r")
+        self._symbols = self.rows["symbol"]
+        self._key_values = self.keys["key"]
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def _record(self, row: int) -> dict:
+        record = self.rows[row]
+        return {
+            "ticker": record["symbol"].decode(),
+            "name": record["name"].decode(),
+            "exchange": record["exchange"].decode(),
+            "asset_type": record["asset_type"].decode(),
+        }
+
+    def _rank(self, row: int, key: bytes, keyword: bytes):
+        # Prefer exact and whole-word matches, then stocks on major exchanges, then short symbols
+        record = self.rows[row]
+        boundary = key == keyword or key[len(keyword):len(keyword) + 1] == b" "
+        return (key != keyword, not boundary, record["asset_type"] != b"Stock",
+                record["exchange"] not in MAJOR_EXCHANGES, len(key), len(record["symbol"]), record["symbol"])
+
+    def find_symbol(self, ticker: str):
+        """Returns the listing with exactly this ticker symbol, or None."""
+
+        symbol = ticker.strip().upper().encode()
+        position = int(np.searchsorted(self._symbols, symbol))
+        if position < len(self._symbols) and self._symbols[position] == symbol:
+            return self._record(position)
+        return None
+
+    def find_prefix(self, keyword: str, limit: int = 64, stocks_only: bool = False):
+        """Returns the best listing whose name (or short name) starts with the keyword as whole words, or None.
+
+        A keyword that stops mid-word ('cat' for 'Cato Corp') is not a match, as it is more likely
+        to be a ticker symbol or a name the index does not know. With 'stocks_only', funds and other
+        asset types are left out.
+        """
+
+        prefix = normalize(keyword).encode()
+        if len(prefix) < MIN_PREFIX_LENGTH:
+            return None
+        start = int(np.searchsorted(self._key_values, prefix, side="left"))
+        end = int(np.searchsorted(self._key_values, prefix + b"\xff", side="left"))
+        candidates = [candidate for candidate in self.keys[start:min(end, start + limit)]
+                      if (candidate["key"] == prefix or candidate["key"][len(prefix):len(prefix) + 1] == b" ")
+                      and (not stocks_only or self.rows[int(candidate["row"])]["asset_type"] == b"Stock")]
+        if not candidates:
+            return None
+        best = min(candidates, key=lambda candidate: self._rank(int(candidate["row"]), candidate["key"], prefix))
+        return self._record(int(best["row"]))
+
+    def find_name(self, keyword: str):
+        """Returns the best listing whose name (or short name) is exactly the keyword, or None."""
+
+        key = normalize(keyword).encode()
+        if not key:
+            return None
+        start = int(np.searchsorted(self._key_values, key, side="left"))
+        end = int(np.searchsorted(self._key_values, key, side="right"))
+        if start == end:
+            return None
+        best = min(range(start, end), key=lambda position: self._rank(int(self.keys[position]["row"]), key, key))
+        return self._record(int(self.keys[best]["row"]))
+
+    def find_fuzzy(self, keyword: str):
+        """Returns the listing whose name is closest to the keyword, if it is similar enough, or None.
+
+        Only names sharing the keyword's first letter and of a similar length are compared,
+        which keeps the scan small.
+        """
+
+        query = short_name(keyword)
+        if not query:
+            return None
+        first = query[0].encode()
+        start = int(np.searchsorted(self._key_values, first, side="left"))
+        end = int(np.searchsorted(self._key_values, bytes([first[0] + 1]), side="left"))
+        candidates = self._key_values[start:end]
+        # Similarity is at most 2 * min(a, b) / (a + b), so longer or shorter names than this cannot reach the cutoff
+        lengths = np.char.str_len(candidates)
+        slack = int(2 * len(query) * (1 - FUZZY_CUTOFF) / FUZZY_CUTOFF)
+        names = [key.decode() for key in candidates[np.abs(lengths - len(query)) <= slack]]
+        matches = difflib.get_close_matches(query, names, n=1, cutoff=FUZZY_CUTOFF)
+        if not matches:
+            return None
+        return self.find_prefix(matches[0])
+
+    def lookup(self, keyword: str):
+        """Resolves a ticker symbol, alias or company name to a listing.
+
+        Keywords written like a ticker symbol ('TSLA') are looked up as a symbol first, then as a name.
+        Plain words are matched, in order, against: a known alias, an exact name, a stock whose name
+        starts with the keyword's words ('ford' for 'Ford Motor Co' rather than the symbol FORD), an
+        exact ticker symbol, any other listing whose name starts with the keyword's words, and a fuzzy
+        name match. Keywords that stop mid-word never match a name by prefix, so 'cat' finds CAT
+        rather than 'Cato Corp'.
+
+        Returns:
+            dict: The listing with 'ticker', 'name', 'exchange' and 'asset_type', or None if nothing matched.
+        """
+
+        keyword = (keyword or "").strip()
+        if not keyword:
+            return None
+        alias = ALIASES.get(normalize(keyword))
+        if alias:
+            return self.find_symbol(alias)
+        if keyword.isupper() and " " not in keyword:
+            return self.find_symbol(keyword) or self.find_prefix(keyword) or self.find_fuzzy(keyword)
+        return (self.find_name(keyword) or self.find_prefix(keyword, stocks_only=True) or self.find_symbol(keyword)
+                or self.find_prefix(keyword) or self.find_fuzzy(keyword))
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """Returns the shared symbol index, loading it on first use, or None if it has not been built."""
+
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None and os.path.exists(os.path.join(SYMBOL_INDEX_DIR, "keys.npy")):
+                _index = SymbolIndex(SYMBOL_INDEX_DIR)
+    return _index
+
+
+def lookup(keyword: str):
+    """Resolves a keyword with the shared symbol index. Returns None on a miss or if no index has been built."""
+
+    index = get_index()
+    return index.lookup(keyword) if index is not None else None
+
+
+def rebuild_index(csv_path: str = None, index_dir: str = SYMBOL_INDEX_DIR) -> int:
+    """Rebuilds the index from a LISTING_STATUS CSV file, or downloads it from Alpha Vantage if no file is given.
+
+    Returns:
+        int: The number of listings in the new index.
+    """
+
+    global _index
+    if csv_path:
+        with open(csv_path, encoding="utf-8") as f:
+            csv_text = f.read()
+    else:
+        from .alpha_vantage import fetch_csv
+        csv_text = fetch_csv("LISTING_STATUS")
+
+    count = build_index(csv_text, index_dir)
+    with _index_lock:
+        _index = None
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the local symbol index.")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    rebuild = subcommands.add_parser("rebuild", help="Rebuild the index from LISTING_STATUS.")
+    rebuild.add_argument("--csv", help="Path to a LISTING_STATUS CSV file. Downloaded from Alpha Vantage if omitted.")
+    rebuild.add_argument("--index-dir", default=SYMBOL_INDEX_DIR)
+    args = parser.parse_args()
+
+    if args.command == "rebuild":
+        count = rebuild_index(args.csv, args.index_dir)
+        print(f"Symbol index rebuilt with {count} listings in '{args.index_dir}'.")
+
+
+if __name__ == "__main__":
+    main()
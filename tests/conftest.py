@@ -0,0 +1,28 @@
+"""Shared fixtures for the tests.
+
+The repository root is itself the agent package (as expected by 'adk web'), so the
+tests import it by directory name after putting its parent on sys.path.
+"""
+
+import os
+import sys
+import importlib
+
+import pytest
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE_NAME = os.path.basename(PACKAGE_DIR)
+
+
+@pytest.fixture(scope="session")
+def load_module():
+    """Returns a function that imports the agent package, or one of its submodules, by name."""
+
+    parent = os.path.dirname(PACKAGE_DIR)
+    if parent not in sys.path:
+        sys.path.insert(0, parent)
+
+    def load(name: str = ""):
+        return importlib.import_module(f"{PACKAGE_NAME}.{name}" if name else PACKAGE_NAME)
+
+    return load
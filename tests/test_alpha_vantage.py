@@ -0,0 +1,53 @@
+import pytest
+
+BURST_NOTICE = ("Thank you for using Alpha Vantage! Please consider spreading out your free API requests more sparingly "
+                "(1 request per second). You may subscribe to any of the premium plans at https://www.alphavantage.co/premium/ "
+                "to lift the free key rate limit (25 requests per day), raise the per-minute limit, and instantly unlock all premium endpoints")
+DAILY_NOTICE = ("We have detected your API key as DEMO and our standard API rate limit is 25 requests per day. "
+                "Please subscribe to any of the premium plans at https://www.alphavantage.co/premium/ to instantly remove all daily rate limits.")
+MINUTE_NOTICE = ("Thank you for using Alpha Vantage! Our standard API call frequency is 5 calls per minute and 500 calls per day.")
+
+
+@pytest.fixture
+def alpha_vantage(load_module):
+    return load_module("alpha_vantage")
+
+
+@pytest.mark.parametrize("notice, daily", [(BURST_NOTICE, False), (MINUTE_NOTICE, False), (DAILY_NOTICE, True)])
+def test_daily_limit_notice(alpha_vantage, notice, daily):
+    assert alpha_vantage._throttle_notice({"Information": notice}) == notice
+    assert alpha_vantage._daily_limit_notice(notice) is daily
+
+
+class Limiter:
+    def __init__(self):
+        self.pauses = []
+        self.exhausted = False
+
+    def acquire(self, priority, timeout=None):
+        return not self.exhausted
+
+    def pause(self, seconds):
+        self.pauses.append(seconds)
+
+    def exhaust_day(self):
+        self.exhausted = True
+
+
+@pytest.mark.parametrize("notice, pauses, exhausted", [(BURST_NOTICE, 1, False), (DAILY_NOTICE, 0, True)])
+def test_burst_notice_is_retried_and_daily_notice_is_not(alpha_vantage, monkeypatch, notice, pauses, exhausted):
+    responses = iter([{"Information": notice}, {"Global Quote": {"05. price": "200.00"}}])
+
+    class Response:
+        def json(self):
+            return next(responses)
+
+    limiter = Limiter()
+    monkeypatch.setattr(alpha_vantage, "rate_limiter", limiter)
+    monkeypatch.setattr(alpha_vantage, "_http_get", lambda function, query: Response())
+    if exhausted:
+        with pytest.raises(alpha_vantage.AlphaVantageThrottled):
+            alpha_vantage._fetch_upstream("GLOBAL_QUOTE", {"symbol": "TSLA"}, alpha_vantage.INTERACTIVE)
+    else:
+        assert alpha_vantage._fetch_upstream("GLOBAL_QUOTE", {"symbol": "TSLA"}, alpha_vantage.INTERACTIVE)["Global Quote"]
+    assert (len(limiter.pauses), limiter.exhausted) == (pauses, exhausted)
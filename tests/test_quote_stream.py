@@ -0,0 +1,116 @@
+import time
+
+import pytest
+
+
+def global_quote(price: str) -> dict:
+    return {"Global Quote": {"01. symbol": "TSLA", "05. price": price, "07. latest trading day": "2024-01-05",
+                             "09. change": "1.0", "10. change percent": "0.5%"}}
+
+
+@pytest.fixture
+def quote_stream(load_module, monkeypatch):
+    module = load_module("quote_stream")
+    # Refreshes triggered by a subscription fail rather than calling Alpha Vantage, so only recorded quotes are stored
+    def fetch(function, **params):
+        raise module.AlphaVantageError("offline")
+
+    monkeypatch.setattr(module, "fetch", fetch)
+    refresher = module.QuoteRefresher(max_tickers=2, interval=3600, quota_share=0, max_age=60)
+    monkeypatch.setattr(module, "quote_refresher", refresher)
+    yield module
+    refresher.stop()
+
+
+def test_quote_older_than_max_age_is_not_served(quote_stream):
+    refresher = quote_stream.quote_refresher
+    refresher.subscribe("TSLA")
+    refresher.record("TSLA", global_quote("210.00")["Global Quote"])
+    assert refresher.get("TSLA")["price"] == "210.00"
+
+    refresher.get("TSLA")["_monotonic"] -= 61
+    assert refresher.get("TSLA") is None
+
+
+def test_unsubscribed_quote_is_returned_but_not_stored(quote_stream):
+    quote = quote_stream.record_quote("NVDA", global_quote("100.00")["Global Quote"])
+    assert quote["price"] == "100.00"
+    assert quote_stream.get_quote("NVDA") is None
+
+
+def test_stale_quote_falls_back_to_fetch(quote_stream, load_module, monkeypatch):
+    ticker_price_agent = load_module("ticker_price_agent")
+    calls = []
+    monkeypatch.setattr(ticker_price_agent, "fetch", lambda function, **params: calls.append(params) or global_quote("220.00"))
+    monkeypatch.setattr(ticker_price_agent, "get_quote", quote_stream.get_quote)
+    monkeypatch.setattr(ticker_price_agent, "record_quote", quote_stream.record_quote)
+
+    quote_stream.subscribe("TSLA")
+    quote_stream.record_quote("TSLA", global_quote("210.00")["Global Quote"])
+    warm = ticker_price_agent.get_ticker_price("TSLA")
+    assert (warm["price"], calls) == ("210.00", [])
+    assert warm["latest_trading_day"] == "2024-01-05"
+    assert warm["updated_at"].endswith("+00:00")
+
+    quote_stream.get_quote("TSLA")["_monotonic"] -= 61
+    fresh = ticker_price_agent.get_ticker_price("TSLA")
+    assert fresh["price"] == "220.00"
+    assert calls == [{"symbol": "TSLA"}]
+    assert quote_stream.get_quote("TSLA")["price"] == "220.00"
+
+
+@pytest.fixture
+def workers(load_module, monkeypatch, tmp_path):
+    module = load_module("quote_stream")
+    shared_store = load_module("shared_store")
+    fetched = []
+
+    def fetch(function, **params):
+        fetched.append(params["symbol"])
+        return global_quote(f"{200 + len(fetched)}.00")
+
+    monkeypatch.setattr(module, "fetch", fetch)
+    engine = shared_store.get_engine(str(tmp_path / "shared.db"))
+    # Two refreshers on one store stand in for two worker processes
+    refreshers = [module.SharedQuoteRefresher(shared_store.SharedQuotes(engine), lease_timeout=0.5, sync_interval=0.02,
+                                              max_tickers=2, interval=3600, quota_share=0, max_age=3600) for _ in range(2)]
+    yield refreshers, fetched
+    for refresher in refreshers:
+        refresher.stop()
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_one_worker_refreshes_for_all(workers):
+    (first, second), fetched = workers
+    first.get("TSLA")
+    second.subscribe("TSLA")
+    wait_for(lambda: first.get("TSLA") is not None and second.get("TSLA") is not None)
+    time.sleep(0.2)
+    assert fetched == ["TSLA"]
+    assert first.get("TSLA")["price"] == second.get("TSLA")["price"]
+    assert [first.leading, second.leading].count(True) == 1
+
+
+def test_subscriptions_are_bounded_across_workers(workers):
+    (first, second), _ = workers
+    first.subscribe("TSLA")
+    second.subscribe("NVDA")
+    assert second.subscribe("AAPL") == ["TSLA"]
+    wait_for(lambda: first.subscribed() == ["NVDA", "AAPL"])
+
+
+def test_lease_is_taken_over_when_the_leader_stops(workers):
+    (first, second), fetched = workers
+    first.subscribe("TSLA")
+    second.get("TSLA")
+    wait_for(lambda: first.leading or second.leading)
+    leader, follower = (first, second) if first.leading else (second, first)
+    leader.stop()
+    wait_for(lambda: follower.leading)
+    assert follower.get("TSLA") is not None
@@ -0,0 +1,25 @@
+import json
+
+import pytest
+
+
+@pytest.fixture
+def alpha_vantage(load_module, monkeypatch, tmp_path):
+    module = load_module("alpha_vantage")
+    replay = load_module("replay")
+    path = tmp_path / "cassette.jsonl"
+    body = json.dumps({"Global Quote": {"01. symbol": "TSLA", "05. price": "200.00"}})
+    path.write_text(json.dumps({"function": "GLOBAL_QUOTE", "params": {"symbol": "TSLA"}, "status": 200, "body": body}) + "\n")
+    monkeypatch.setattr(module, "response_cache", load_module("cache").TTLCache(maxsize=0))
+    # One call per day, which the replayed calls below would spend many times over
+    monkeypatch.setattr(module, "rate_limiter", load_module("rate_limiter").RateLimiter(calls_per_minute=1, calls_per_day=1))
+    monkeypatch.setattr(module, "MAX_QUEUE_WAIT", 0.1)
+    monkeypatch.setattr(module, "cassette", replay.Cassette(str(path), "replay", latency=0))
+    return module
+
+
+def test_replayed_calls_take_no_rate_limiter_tokens(alpha_vantage):
+    for _ in range(5):
+        assert alpha_vantage.fetch("GLOBAL_QUOTE", symbol="TSLA")["Global Quote"]["05. price"] == "200.00"
+    assert alpha_vantage.rate_limiter.stats()["calls_today"] == 0
+    assert alpha_vantage.cassette.stats()["calls"] == {"GLOBAL_QUOTE": 5}
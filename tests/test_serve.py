@@ -0,0 +1,42 @@
+import pytest
+
+
+@pytest.fixture
+def quote_stream(load_module, monkeypatch):
+    module = load_module("quote_stream")
+
+    def fetch(function, **params):
+        raise module.AlphaVantageError("offline")
+
+    monkeypatch.setattr(module, "fetch", fetch)
+    refresher = module.QuoteRefresher(max_tickers=2, interval=3600, quota_share=0, max_age=60)
+    monkeypatch.setattr(module, "quote_refresher", refresher)
+    refresher.subscribe("TSLA")
+    refresher.record("TSLA", {"05. price": "200.00", "07. latest trading day": "2024-01-05"})
+    events = module.sse_events
+
+    # The stream never ends on its own, so it is cut after the snapshot of the stored quote
+    async def first_event(tickers=None, heartbeat=15.0):
+        async for event in events(tickers, heartbeat):
+            yield event
+            return
+
+    monkeypatch.setattr(module, "sse_events", first_event)
+    yield module
+    refresher.stop()
+
+
+@pytest.mark.parametrize("web_ui", [False, True])
+def test_quote_stream_is_served_alongside_the_web_ui(load_module, quote_stream, monkeypatch, tmp_path, web_ui):
+    from fastapi.testclient import TestClient
+
+    serve = load_module("serve")
+    monkeypatch.setattr(serve, "SERVE_WEB_UI", web_ui)
+    monkeypatch.setattr(serve, "SESSION_DB_URL", f"sqlite:///{tmp_path / 'sessions.db'}")
+    client = TestClient(serve.create_app())
+
+    response = client.get("/quotes/stream", params={"tickers": "TSLA"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.text.startswith("event: quote\n")
+    assert '"price": "200.00"' in response.text
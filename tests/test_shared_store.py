@@ -0,0 +1,80 @@
+import threading
+import time
+
+import pytest
+
+
+@pytest.fixture
+def shared_store(load_module):
+    return load_module("shared_store")
+
+
+@pytest.fixture
+def engine(shared_store, tmp_path):
+    return shared_store.get_engine(str(tmp_path / "shared.db"))
+
+
+def take_all(limiters: list, attempts: int) -> int:
+    # Every limiter stands in for a worker process, calling from several threads at once
+    taken = []
+
+    def worker(limiter):
+        taken.append(sum(limiter.acquire(timeout=0) for _ in range(attempts)))
+
+    threads = [threading.Thread(target=worker, args=(limiter,)) for limiter in limiters for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(taken)
+
+
+def test_rate_limiter_shares_the_minute_quota(shared_store, engine):
+    limiters = [shared_store.SharedRateLimiter(engine, calls_per_minute=20) for _ in range(3)]
+    start = time.monotonic()
+    taken = take_all(limiters, attempts=20)
+    # The burst, plus what refilled at one token every 3 seconds while the threads ran
+    assert 20 <= taken <= 20 + int((time.monotonic() - start) / 3) + 1
+
+
+def test_rate_limiter_shares_the_daily_quota(shared_store, engine):
+    limiters = [shared_store.SharedRateLimiter(engine, calls_per_minute=0, calls_per_day=7) for _ in range(3)]
+    assert take_all(limiters, attempts=10) == 7
+    assert limiters[0].stats()["calls_today"] == 7
+
+
+def test_exhausted_day_applies_to_every_worker(shared_store, engine):
+    first, second = (shared_store.SharedRateLimiter(engine, calls_per_minute=60, calls_per_day=100) for _ in range(2))
+    assert second.acquire(timeout=0)
+    first.exhaust_day()
+    assert not second.acquire(timeout=0)
+
+
+def test_waiting_worker_gets_the_lease_holders_value(shared_store, engine):
+    caches = [shared_store.SharedTTLCache(engine, lease_timeout=5, poll_interval=0.01) for _ in range(2)]
+    loads = []
+    results = []
+
+    def load(name):
+        loads.append(name)
+        time.sleep(0.2)
+        return {"loaded_by": name}
+
+    threads = [threading.Thread(target=lambda i=i: results.append(caches[i].get_or_load("key", lambda: load(i), 60)))
+               for i in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(loads) == 1
+    assert results == [{"loaded_by": loads[0]}] * 2
+    assert sum(cache.stats()["shared_waits"] for cache in caches) == 1
+
+
+def test_expired_lease_is_taken_over(shared_store, engine):
+    cache = shared_store.SharedTTLCache(engine, lease_timeout=0.2, poll_interval=0.01)
+    # A worker that took the lease and died before writing the value
+    assert cache._lease('"key"', "crashed")
+    start = time.monotonic()
+    assert cache.get_or_load("key", lambda: "value", 60) == "value"
+    assert 0.15 <= time.monotonic() - start < 2
@@ -0,0 +1,34 @@
+"""Cold-start import checks, run in fresh interpreters. See benchmarks/bench_startup.py for the detailed timings."""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import PACKAGE_DIR, PACKAGE_NAME
+
+CHILD = """
+import sys, time, json
+start = time.perf_counter()
+exec({statement!r})
+print(json.dumps({{"seconds": time.perf_counter() - start, "adk": "google.adk" in sys.modules}}))
+"""
+
+
+# (label, statement, seconds). The budgets are several times the usual import time, to catch
+# an eager ADK or model import rather than to measure small regressions.
+@pytest.mark.parametrize("label, statement, budget", [
+    ("package", f"import {PACKAGE_NAME}", 1.0),
+    ("tool functions", f"from {PACKAGE_NAME}.ticker_price_agent import get_ticker_prices; "
+                       f"from {PACKAGE_NAME}.ticker_news_agent import get_ticker_news; "
+                       f"from {PACKAGE_NAME}.ticker_analysis_agent import get_ticker_analysis", 3.0),
+])
+def test_import_does_not_load_adk(label, statement, budget):
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(PACKAGE_DIR), PYTHONDONTWRITEBYTECODE="1")
+    completed = subprocess.run([sys.executable, "-c", CHILD.format(statement=statement)],
+                               capture_output=True, text=True, env=env, check=True, timeout=60)
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    assert not result["adk"], f"importing the {label} loads google.adk"
+    assert result["seconds"] < budget, f"importing the {label} took {result['seconds']:.2f}s"
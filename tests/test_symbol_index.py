@@ -0,0 +1,57 @@
+import pytest
+
+# A LISTING_STATUS sample with listings whose names start like other listings' symbols
+LISTING_STATUS = """symbol,name,exchange,assetType,ipoDate,delistingDate,status
+AAPL,Apple Inc,NASDAQ,Stock,1980-12-12,null,Active
+AMD,Advanced Micro Devices Inc,NASDAQ,Stock,1972-09-27,null,Active
+CAT,Caterpillar Inc,NYSE,Stock,1929-12-02,null,Active
+CATO,Cato Corp,NYSE,Stock,1987-04-30,null,Active
+DOX,Amdocs Ltd,NASDAQ,Stock,1998-06-19,null,Active
+F,Ford Motor Co,NYSE,Stock,1972-06-01,null,Active
+FORD,Forward Industries Inc,NASDAQ,Stock,1972-04-06,null,Active
+IBM,International Business Machines Corp,NYSE,Stock,1962-01-02,null,Active
+IBMX,IBM Target Term ETF,NYSE ARCA,ETF,2021-05-01,null,Active
+TSLA,Tesla Inc,NASDAQ,Stock,2010-06-29,null,Active
+"""
+
+
+@pytest.fixture
+def index(load_module, tmp_path):
+    symbol_index = load_module("symbol_index")
+    symbol_index.build_index(LISTING_STATUS, str(tmp_path))
+    return symbol_index.SymbolIndex(str(tmp_path))
+
+
+@pytest.mark.parametrize("keyword, ticker", [
+    ("cat", "CAT"),
+    ("amd", "AMD"),
+    ("ibm", "IBM"),
+    ("ford", "F"),
+    ("tesla", "TSLA"),
+    ("Apple", "AAPL"),
+    ("TSLA", "TSLA"),
+    ("caterpillar", "CAT"),
+    ("advanced micro", "AMD"),
+    ("international business machines", "IBM"),
+])
+def test_lookup(index, keyword, ticker):
+    assert index.lookup(keyword)["ticker"] == ticker
+
+
+def test_prefix_must_end_on_a_word_boundary(index):
+    assert index.find_prefix("cat") is None
+    assert index.find_prefix("amd") is None
+    assert index.find_prefix("advanced micro")["ticker"] == "AMD"
+
+
+def test_etf_name_does_not_shadow_stock_symbol(index):
+    # 'IBM Target Term ETF' starts with the keyword, but the IBM stock symbol wins over a fund
+    assert index.find_prefix("ibm")["ticker"] == "IBMX"
+    assert index.find_prefix("ibm", stocks_only=True) is None
+    assert index.lookup("ibm")["ticker"] == "IBM"
+
+
+def test_partial_word_without_symbol_is_a_miss(index):
+    # Neither a name, a symbol nor close enough to a name, so the caller falls back to SYMBOL_SEARCH
+    assert index.lookup("catx") is None
+    assert index.lookup("tes") is None
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def analysis(load_module, monkeypatch):
+    """Returns the analysis agent module and a function that makes the store return given bars, or raise, and counts its calls."""
+
+    module = load_module("ticker_analysis_agent")
+    price_change_agent = load_module("ticker_price_change_agent")
+    calls = []
+
+    def store(result):
+        def get_series(ticker):
+            calls.append(ticker)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        monkeypatch.setattr(price_change_agent.timeseries_store, "get_series", get_series)
+        return calls
+
+    return module, store
+
+
+def bars(load_module, count: int) -> np.ndarray:
+    series = np.zeros(count, dtype=load_module("timeseries_store").BAR_DTYPE)
+    series["date"] = np.arange(count) + np.datetime64("2024-01-01")
+    series["close"] = 100 + np.arange(count)
+    series["volume"] = 1000
+    return series
+
+
+def test_price_change_and_indicators_share_one_series(analysis, load_module):
+    module, store = analysis
+    calls = store(bars(load_module, 60))
+    price_change, technical_indicators = module._price_change_and_indicators("AAPL", 7)
+    assert calls == ["AAPL"]
+    assert price_change["price_change"] == 7.0
+    assert technical_indicators is not None
+
+
+def test_failed_fetch_is_not_retried_for_the_indicators(analysis, load_module):
+    module, store = analysis
+    calls = store(load_module("alpha_vantage").AlphaVantageThrottled("quota exhausted"))
+    price_change, technical_indicators = module._price_change_and_indicators("AAPL", 7)
+    assert price_change["status"] == "error"
+    assert technical_indicators is None
+    assert calls == ["AAPL"]
@@ -0,0 +1,29 @@
+import pytest
+
+
+def global_quote(ticker: str) -> dict:
+    return {"Global Quote": {"01. symbol": ticker, "05. price": "200.00", "07. latest trading day": "2024-01-05"}}
+
+
+@pytest.fixture
+def agent(load_module, monkeypatch):
+    module = load_module("ticker_price_agent")
+    monkeypatch.setattr(module, "get_quote", lambda ticker: None)
+    monkeypatch.setattr(module, "fetch", lambda function, **params: global_quote(params["symbol"]))
+    monkeypatch.setattr(module, "get_ticker", lambda keyword: {"status": "success", "ticker": "TSLA", "name": "Tesla Inc", "currency": "USD"})
+    return module
+
+
+def test_batch_prices_carry_their_age(agent):
+    result = agent.get_ticker_prices(["TSLA", "NVDA"])
+    assert result["status"] == "success"
+    for ticker in ("TSLA", "NVDA"):
+        assert result["prices"][ticker]["price"] == "200.00"
+        assert result["prices"][ticker]["latest_trading_day"] == "2024-01-05"
+        assert result["prices"][ticker]["updated_at"].endswith("+00:00")
+
+
+def test_resolve_and_quote_carries_the_age(agent):
+    result = agent.resolve_and_quote("tesla")
+    assert (result["ticker"], result["price"], result["latest_trading_day"]) == ("TSLA", "200.00", "2024-01-05")
+    assert "updated_at" in result
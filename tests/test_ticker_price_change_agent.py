@@ -0,0 +1,23 @@
+import pytest
+
+
+@pytest.fixture
+def agent(load_module, monkeypatch):
+    module = load_module("ticker_price_change_agent")
+    series = [{"date": f"2024-01-0{day}", "close": str(100 + day)} for day in range(1, 6)]
+    monkeypatch.setattr(module.timeseries_store, "get_series", lambda ticker: series)
+    return module
+
+
+@pytest.mark.parametrize("days", [0, -1, 1.5])
+def test_rejects_days_below_one(agent, days):
+    result = agent.get_ticker_price_change("AAPL", days)
+    assert result["status"] == "error"
+    assert "at least 1" in result["error_message"]
+
+
+def test_change_over_one_day(agent):
+    result = agent.get_ticker_price_change("AAPL", 1)
+    assert result["status"] == "success"
+    assert result["price_change"] == 1.0
+    assert result["previous_date"] == "2024-01-04"
@@ -0,0 +1,60 @@
+import os
+import subprocess
+import sys
+from datetime import timedelta
+
+import numpy as np
+import pytest
+
+from conftest import PACKAGE_DIR, PACKAGE_NAME
+
+
+@pytest.fixture
+def store(load_module, monkeypatch, tmp_path):
+    module = load_module("timeseries_store")
+    monkeypatch.setattr(module, "TIMESERIES_STORE_DIR", str(tmp_path))
+    return module
+
+
+def save(store, ticker: str, last_date, fetched_at) -> None:
+    bars = np.zeros(3, dtype=store.BAR_DTYPE)
+    bars["date"] = np.datetime64(last_date.isoformat(), "D") - np.arange(3)[::-1]
+    store._save(ticker, bars)
+    os.utime(store._path(ticker), (fetched_at.timestamp(), fetched_at.timestamp()))
+
+
+@pytest.mark.parametrize("last_bar_days_before, fetched_after, fresh", [
+    (0, timedelta(minutes=5), True),            # the close's bar is in
+    (1, timedelta(minutes=5), False),           # fetched before the close's bar was published
+    (1, timedelta(hours=3), True),              # still missing long after the close, as on a holiday
+    (0, -timedelta(hours=1), False),            # fetched before the close
+])
+def test_fresh_only_with_the_last_close_bar_or_after_the_publish_delay(store, load_module, last_bar_days_before, fetched_after, fresh):
+    close = load_module("cache").last_market_close()
+    save(store, "AAPL", close.date() - timedelta(days=last_bar_days_before), close + fetched_after)
+    assert store._is_fresh("AAPL") is fresh
+
+
+def test_daily_series_without_the_last_close_bar_is_cached_briefly(load_module, monkeypatch):
+    alpha_vantage = load_module("alpha_vantage")
+    close = load_module("cache").last_market_close()
+    monkeypatch.setattr(alpha_vantage, "DAILY_BAR_DELAY", 10 ** 9)
+    stale = {"Time Series (Daily)": {(close.date() - timedelta(days=1)).isoformat(): {}}}
+    current = {"Time Series (Daily)": {close.date().isoformat(): {}}}
+    assert alpha_vantage.cache_ttl("TIME_SERIES_DAILY", stale) <= alpha_vantage.TTL_UNPUBLISHED_DAILY
+    assert alpha_vantage.cache_ttl("TIME_SERIES_DAILY", current) == pytest.approx(alpha_vantage.seconds_until_market_close(), abs=5)
+
+
+def test_concurrent_saves_from_several_processes(store, load_module, tmp_path):
+    # Thread idents repeat across processes, which the same ident in every process stands in for
+    script = (f"import sys, types, threading, numpy as np; sys.path.insert(0, {os.path.dirname(PACKAGE_DIR)!r})\n"
+              f"from {PACKAGE_NAME} import timeseries_store as store\n"
+              "store.threading = types.SimpleNamespace(Lock=threading.Lock, get_ident=lambda: 1)\n"
+              f"store.TIMESERIES_STORE_DIR = {str(tmp_path)!r}\n"
+              "bars = np.zeros(100, dtype=store.BAR_DTYPE)\n"
+              "for _ in range(200):\n"
+              "    store._save('AAPL', bars)\n")
+    processes = [subprocess.Popen([sys.executable, "-c", script]) for _ in range(3)]
+    assert [process.wait(timeout=60) for process in processes] == [0, 0, 0]
+    assert os.listdir(tmp_path) == ["AAPL.npy"]
+    assert len(store.load("AAPL")) == 100
@@ -1,15 +1,81 @@
-import os
-from dotenv import load_dotenv
-from google.adk.agents import LlmAgent
-from .ticker_news_agent import get_ticker_news
-from .ticker_price_change_agent import get_ticker_price_change
-
-load_dotenv()
-ALPHA_VANTAGE_API_KEY = os.getenv("ALPHA_VANTAGE_API_KEY")
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from .alpha_vantage import run_blocking, submit_in_context
+from .tracing import traced_tool
+from .identify_ticker_agent import unique_tickers
+from .ticker_news_agent import get_ticker_news, get_ticker_news_async
+from .ticker_price_change_agent import get_price_change_and_series
+from . import indicators
 
 MODEL_GEMINI_1_5_FLASH = "gemini-1.5-flash"
 
+# Maximum number of tickers analysed at the same time by the multi-ticker tool
+MAX_CONCURRENT_ANALYSES = 4
+
+# Retrieve the price change, followed by technical indicators computed from the same daily bars, fetched once
+def _price_change_and_indicators(ticker: str, days: int):
+    price_change, series = get_price_change_and_series(ticker, days)
+    if series is None:
+        return price_change, None
+    return price_change, indicators.summarize(indicators.compute_indicators(series["close"], series["volume"]))
+
+# Combine the news and price change results into a single analysis, keeping whichever side succeeded
+def _combine_analysis(ticker: str, news: dict, price_change: dict, technical_indicators: dict = None) -> dict:
+    if news["status"] != "success" and price_change["status"] != "success":
+        return {
+            "status": "error",
+            "error_message": f"Failed to retrieve complete analysis for '{ticker}'. "
+                             f"{news['error_message']} {price_change['error_message']}"
+        }
+
+    analysis = {
+        "status": "success",
+        "ticker": ticker,
+    }
+    errors = []
+    if news["status"] == "success":
+        news["news"].pop("ticker")
+        analysis["news"] = news["news"]
+    else:
+        errors.append(news["error_message"])
+    if price_change["status"] == "success":
+        price_change.pop("ticker")
+        price_change.pop("status")
+        analysis["price_change"] = price_change
+    else:
+        errors.append(price_change["error_message"])
+    if technical_indicators is not None:
+        analysis["indicators"] = technical_indicators
+
+    # Return partial results when only one of the two lookups failed
+    if errors:
+        analysis["status"] = "partial"
+        analysis["errors"] = errors
+    return analysis
+
+# Combine per-ticker analyses into a single multi-ticker response
+def _combine_multi_analysis(tickers: list[str], analyses: list[dict]) -> dict:
+    if not tickers:
+        return {
+            "status": "error",
+            "error_message": "No ticker symbols were provided."
+        }
+
+    results = dict(zip(tickers, analyses))
+    failed = [ticker for ticker, analysis in results.items() if analysis["status"] != "success"]
+    if len(failed) == len(tickers):
+        status = "error"
+    elif failed:
+        status = "partial"
+    else:
+        status = "success"
+    return {
+        "status": status,
+        "analyses": results,
+    }
+
 # Tool to retrieve the latest news articles and price change for a specified ticker symbol
+@traced_tool
 def get_ticker_analysis(ticker: str, days: int = 7) -> dict:
     """Retrieves the latest news articles and price change for a specified ticker symbol.
 
@@ -18,47 +84,93 @@ def get_ticker_analysis(ticker: str, days: int = 7) -> dict:
         days (int): The number of days over which to calculate the price change. Example: 1 for today, 7 for a week, 30 for a month, etc. Default is 7 days.
 
     Returns:
-        dict: status with news articles and price change or error message.
+        dict: status with news articles, price change and technical indicators (returns over several windows, moving averages, volatility, drawdown, RSI and volume anomaly), partial status with whichever was retrieved and the errors, or error message.
     """
-    
-    news = get_ticker_news(ticker)
-    price_change = get_ticker_price_change(ticker, days)
 
-    if news["status"] == "success" and price_change["status"] == "success":
-        news["news"].pop("ticker")
-        price_change.pop("ticker")
-        price_change.pop("status")
-        
-        # Amalgamate the results into a single response
-        return {
-            "status": "success",
-            "ticker": ticker,
-            "news": news["news"],
-            "price_change": price_change
-        }
-    else:
-        return {
-            "status": "error",
-            "error_message": f"Failed to retrieve complete analysis for '{ticker}'."
-        }
+    # Fetch the news and the price change concurrently, so the latency is that of the slower call
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        news = submit_in_context(executor, get_ticker_news, ticker)
+        price_change = submit_in_context(executor, _price_change_and_indicators, ticker, days)
+        return _combine_analysis(ticker, news.result(), *price_change.result())
+
+# Async variant of the get_ticker_analysis tool, awaited by ADK without blocking the event loop
+@traced_tool
+async def get_ticker_analysis_async(ticker: str, days: int = 7) -> dict:
+    """Retrieves the latest news articles and price change for a specified ticker symbol.
+
+    Args:
+        ticker (str): The stock ticker symbol for which to retrieve the latest news articles and price change. This is to be retrieved using 'identify_ticker_agent' sub-agent.
+        days (int): The number of days over which to calculate the price change. Example: 1 for today, 7 for a week, 30 for a month, etc. Default is 7 days.
+
+    Returns:
+        dict: status with news articles, price change and technical indicators (returns over several windows, moving averages, volatility, drawdown, RSI and volume anomaly), partial status with whichever was retrieved and the errors, or error message.
+    """
+
+    news, (price_change, technical_indicators) = await asyncio.gather(
+        get_ticker_news_async(ticker),
+        run_blocking(_price_change_and_indicators, ticker, days),
+    )
+    return _combine_analysis(ticker, news, price_change, technical_indicators)
+
+# Tool to retrieve the latest news articles and price changes for several ticker symbols at once
+@traced_tool
+def get_multi_ticker_analysis(tickers: list[str], days: int = 7) -> dict:
+    """Retrieves the latest news articles and price changes for several ticker symbols, to compare them.
+
+    Args:
+        tickers (list[str]): The stock ticker symbols to analyse and compare. Example: ['NVDA', 'AMD', 'INTC']. These are to be retrieved using 'identify_ticker_agent' sub-agent.
+        days (int): The number of days over which to calculate the price changes. Example: 1 for today, 7 for a week, 30 for a month, etc. Default is 7 days.
+
+    Returns:
+        dict: status with the analysis of each ticker symbol, partial status if some of them failed, or error message.
+    """
+
+    tickers = unique_tickers(tickers)
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_ANALYSES) as executor:
+        futures = [submit_in_context(executor, get_ticker_analysis, ticker, days) for ticker in tickers]
+        analyses = [future.result() for future in futures]
+    return _combine_multi_analysis(tickers, analyses)
+
+# Async variant of the get_multi_ticker_analysis tool, awaited by ADK without blocking the event loop
+@traced_tool
+async def get_multi_ticker_analysis_async(tickers: list[str], days: int = 7) -> dict:
+    """Retrieves the latest news articles and price changes for several ticker symbols, to compare them.
+
+    Args:
+        tickers (list[str]): The stock ticker symbols to analyse and compare. Example: ['NVDA', 'AMD', 'INTC']. These are to be retrieved using 'identify_ticker_agent' sub-agent.
+        days (int): The number of days over which to calculate the price changes. Example: 1 for today, 7 for a week, 30 for a month, etc. Default is 7 days.
+
+    Returns:
+        dict: status with the analysis of each ticker symbol, partial status if some of them failed, or error message.
+    """
+
+    tickers = unique_tickers(tickers)
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_ANALYSES)
+
+    async def analyse(ticker: str) -> dict:
+        async with semaphore:
+            return await get_ticker_analysis_async(ticker, days)
+
+    analyses = await asyncio.gather(*(analyse(ticker) for ticker in tickers))
+    return _combine_multi_analysis(tickers, analyses)
+
+# Create the agent that analyzes stock ticker symbols using the get_ticker_analysis_async tool
+def create_agent():
+    from google.adk.agents import LlmAgent
 
-# Create the agent that analyzes stock ticker symbols using the get_ticker_analysis tool
-ticker_analysis = None
-try:
-    ticker_analysis = LlmAgent(
+    return LlmAgent(
         name="ticker_analysis_agent",
         model=MODEL_GEMINI_1_5_FLASH,
         description=(
-            "This agent analyzes stock ticker symbols by retrieving the latest news articles and price changes for a specified ticker symbol."
+            "This agent analyzes stock ticker symbols by retrieving the latest news articles and price changes for a specified ticker symbol, or compares several ticker symbols."
         ),
-        instruction="You are an agent that analyzes stock ticker symbols by retrieving the latest news articles and price changes for a specified ticker symbol using the 'get_ticker_analysis' tool."
-        "You will be provided with a ticker symbol, and you should use the 'get_ticker_analysis' tool to return the latest news articles and price change over a specified number of days. Example: 1 for today, 7 for a week, 30 for a month, etc."
-        "Analyze the news articles and price change to provide insights on the stock's performance."
+        instruction="You are an agent that analyzes stock ticker symbols by retrieving the latest news articles and price changes for a specified ticker symbol using the 'get_ticker_analysis_async' tool."
+        "You will be provided with a ticker symbol, and you should use the 'get_ticker_analysis_async' tool to return the latest news articles and price change over a specified number of days. Example: 1 for today, 7 for a week, 30 for a month, etc."
+        "Analyze the news articles, price change and technical indicators (returns over several windows, moving averages, volatility, drawdown, RSI and volume anomaly) to provide insights on the stock's performance."
         "Use this information to provide a comprehensive analysis of the stock ticker symbol and answer questions like 'What is the current status of the stock?' and 'Why has the stock price changed over the last 7 days?'."
+        "If you are provided with several ticker symbols to compare, use the 'get_multi_ticker_analysis_async' tool once with all of them instead of calling 'get_ticker_analysis_async' for each one."
+        "If only part of the analysis could be retrieved (status 'partial'), analyze what is available and mention what could not be retrieved."
         "If the analysis is not found, return an error message."
         "NOTE: ALWAYS RETURN BACK TO THE ROOT AGENT AFTER FINALLY COMPLETING THE TASK, SO THAT IT CAN PROVIDE THE FINAL RESPONSE TO THE USER.",
-        tools=[get_ticker_analysis],
+        tools=[get_ticker_analysis_async, get_multi_ticker_analysis_async],
     )
-    print(f"Agent '{ticker_analysis.name}' created successfully.")
-except Exception as e:
-    print(f"Failed to create agent: {e}")
\ No newline at end of file
@@ -1,14 +1,32 @@
-import os
-from dotenv import load_dotenv
-import requests
-from google.adk.agents import LlmAgent
-
-load_dotenv()
-ALPHA_VANTAGE_API_KEY = os.getenv("ALPHA_VANTAGE_API_KEY")
+import asyncio
+import threading
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from .alpha_vantage import fetch, run_blocking, submit_in_context, AlphaVantageError, AlphaVantageThrottled
+from .tracing import traced_tool
+from .quote_stream import get_quote, record_quote
+from .identify_ticker_agent import get_ticker, unique_tickers
 
 MODEL_GEMINI_1_5_FLASH = "gemini-1.5-flash"
 
+# Maximum number of quotes fetched at the same time by the batch price tool
+MAX_CONCURRENT_QUOTES = 8
+
+# Fields of a quote returned by the price tools
+_QUOTE_FIELDS = ("price", "latest_trading_day", "updated_at")
+
+# Build the tool result of a quote, with how recent it is so stale prices can be recognised
+def _price_result(ticker: str, quote: dict) -> dict:
+    return {
+        "status": "success",
+        "ticker": ticker,
+        "price": quote["price"],
+        "latest_trading_day": quote["latest_trading_day"],
+        "updated_at": datetime.fromtimestamp(quote["updated_at"], timezone.utc).isoformat(timespec="seconds"),
+    }
+
 # Tool to retrieve the current stock price for a specified ticker symbol
+@traced_tool
 def get_ticker_price(ticker: str) -> dict:
     """Retrieves the current stock price for a specified ticker symbol.
 
@@ -16,45 +34,186 @@ def get_ticker_price(ticker: str) -> dict:
         ticker (str): The stock ticker symbol for which to retrieve the current price. This is to be retrieved using 'identify_ticker_agent' sub-agent.
 
     Returns:
-        dict: status with current price or error message.
+        dict: status with current price, latest trading day and time it was quoted, or error message.
     """
-    
-    response = requests.get(f"https://www.alphavantage.co/query?function=GLOBAL_QUOTE&symbol={ticker}&apikey={ALPHA_VANTAGE_API_KEY}")
-
-    if response.status_code == 200:
-        data = response.json()
-        if "Global Quote" in data and "05. price" in data["Global Quote"]:
-            return {
-                "status": "success",
-                "ticker": ticker,
-                "price": data["Global Quote"]["05. price"],
-            }
-        else:
-            return {
-                "status": "error",
-                "error_message": f"No price found for ticker '{ticker}'."
-            }
-    else:
+
+    # Subscribed tickers are kept warm by the quote refresher and need no upstream call until their quote is too old
+    quote = get_quote(ticker)
+    if quote is not None:
+        return _price_result(ticker, quote)
+
+    try:
+        data = fetch("GLOBAL_QUOTE", symbol=ticker)
+    except AlphaVantageThrottled:
+        return {
+            "status": "error",
+            "error_message": f"Alpha Vantage rate limit reached while retrieving price information for '{ticker}'. Please try again later."
+        }
+    except AlphaVantageError:
         return {
             "status": "error",
             "error_message": f"Failed to retrieve price information for '{ticker}'."
         }
-    
-# Create the agent that retrieves the current stock price for a specified ticker symbol using the get_ticker_price tool
-ticker_price = None
-try:
-    ticker_price = LlmAgent(
+
+    if "Global Quote" in data and "05. price" in data["Global Quote"]:
+        return _price_result(ticker, record_quote(ticker, data["Global Quote"]))
+    else:
+        return {
+            "status": "error",
+            "error_message": f"No price found for ticker '{ticker}'."
+        }
+
+# Async variant of the get_ticker_price tool, awaited by ADK without blocking the event loop
+@traced_tool
+async def get_ticker_price_async(ticker: str) -> dict:
+    """Retrieves the current stock price for a specified ticker symbol.
+
+    Args:
+        ticker (str): The stock ticker symbol for which to retrieve the current price. This is to be retrieved using 'identify_ticker_agent' sub-agent.
+
+    Returns:
+        dict: status with current price, latest trading day and time it was quoted, or error message.
+    """
+
+    return await run_blocking(get_ticker_price, ticker)
+
+# Retrieve one quote of a batch, skipping the upstream call once the batch has hit the rate limit
+def _batch_quote(ticker: str, throttled: threading.Event) -> dict:
+    if throttled.is_set():
+        return {
+            "status": "error",
+            "error_message": f"Alpha Vantage rate limit reached while retrieving price information for '{ticker}'. Please try again later."
+        }
+    price = get_ticker_price(ticker)
+    if price["status"] != "success" and "rate limit" in price["error_message"]:
+        throttled.set()
+    return price
+
+# Combine per-ticker quotes into a single batch response
+def _combine_quotes(tickers: list[str], quotes: list[dict]) -> dict:
+    if not tickers:
+        return {
+            "status": "error",
+            "error_message": "No ticker symbols were provided."
+        }
+
+    # Each price keeps the latest trading day and quote time of 'get_ticker_price', so stale prices can be recognised
+    prices = {ticker: {field: quote[field] for field in _QUOTE_FIELDS}
+              for ticker, quote in zip(tickers, quotes) if quote["status"] == "success"}
+    errors = {ticker: quote["error_message"] for ticker, quote in zip(tickers, quotes) if quote["status"] != "success"}
+    if not prices:
+        status = "error"
+    elif errors:
+        status = "partial"
+    else:
+        status = "success"
+    result = {
+        "status": status,
+        "prices": prices,
+    }
+    if errors:
+        result["errors"] = errors
+    return result
+
+# Tool to retrieve the current stock prices for a list of ticker symbols in a single call
+@traced_tool
+def get_ticker_prices(tickers: list[str]) -> dict:
+    """Retrieves the current stock prices for several ticker symbols at once, e.g. for a watchlist or portfolio.
+
+    Args:
+        tickers (list[str]): The stock ticker symbols for which to retrieve the current prices. Example: ['AAPL', 'MSFT', 'NVDA']. These are to be retrieved using 'identify_ticker_agent' sub-agent.
+
+    Returns:
+        dict: status with the current price, latest trading day and time it was quoted of each ticker symbol, partial status with the prices found and the errors of the others, or error message.
+    """
+
+    # Repeated symbols are fetched once, and recently quoted ones are served from the response cache
+    tickers = unique_tickers(tickers)
+    throttled = threading.Event()
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_QUOTES) as executor:
+        futures = [submit_in_context(executor, _batch_quote, ticker, throttled) for ticker in tickers]
+        quotes = [future.result() for future in futures]
+    return _combine_quotes(tickers, quotes)
+
+# Async variant of the get_ticker_prices tool, awaited by ADK without blocking the event loop
+@traced_tool
+async def get_ticker_prices_async(tickers: list[str]) -> dict:
+    """Retrieves the current stock prices for several ticker symbols at once, e.g. for a watchlist or portfolio.
+
+    Args:
+        tickers (list[str]): The stock ticker symbols for which to retrieve the current prices. Example: ['AAPL', 'MSFT', 'NVDA']. These are to be retrieved using 'identify_ticker_agent' sub-agent.
+
+    Returns:
+        dict: status with the current price, latest trading day and time it was quoted of each ticker symbol, partial status with the prices found and the errors of the others, or error message.
+    """
+
+    tickers = unique_tickers(tickers)
+    throttled = threading.Event()
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_QUOTES)
+
+    async def quote(ticker: str) -> dict:
+        async with semaphore:
+            return await run_blocking(_batch_quote, ticker, throttled)
+
+    quotes = await asyncio.gather(*(quote(ticker) for ticker in tickers))
+    return _combine_quotes(tickers, quotes)
+
+# Tool to resolve a company name to its ticker symbol and retrieve the current stock price in a single call
+@traced_tool
+def resolve_and_quote(keyword: str) -> dict:
+    """Identifies the stock ticker symbol for a specified company and retrieves its current stock price.
+
+    Args:
+        keyword (str): The name of the company or keyword for which to retrieve the current price. This is to be retrieved from the user query.
+
+    Returns:
+        dict: status with ticker symbol, company name, currency, current price, latest trading day and time it was quoted, or error message.
+    """
+
+    ticker = get_ticker(keyword)
+    if ticker["status"] != "success":
+        return ticker
+
+    price = get_ticker_price(ticker["ticker"])
+    if price["status"] != "success":
+        return price
+
+    return {
+        "status": "success",
+        "ticker": ticker["ticker"],
+        "name": ticker["name"],
+        "currency": ticker["currency"],
+        **{field: price[field] for field in _QUOTE_FIELDS},
+    }
+
+# Async variant of the resolve_and_quote tool, awaited by ADK without blocking the event loop
+@traced_tool
+async def resolve_and_quote_async(keyword: str) -> dict:
+    """Identifies the stock ticker symbol for a specified company and retrieves its current stock price.
+
+    Args:
+        keyword (str): The name of the company or keyword for which to retrieve the current price. This is to be retrieved from the user query.
+
+    Returns:
+        dict: status with ticker symbol, company name, currency, current price, latest trading day and time it was quoted, or error message.
+    """
+
+    return await run_blocking(resolve_and_quote, keyword)
+
+# Create the agent that retrieves current stock prices using the get_ticker_price_async and get_ticker_prices_async tools
+def create_agent():
+    from google.adk.agents import LlmAgent
+
+    return LlmAgent(
         name="ticker_price_agent",
         model=MODEL_GEMINI_1_5_FLASH,
         description=(
-            "This agent retrieves the current stock price for a specified ticker symbol using the 'get_ticker_price' tool."
+            "This agent retrieves the current stock price for a specified ticker symbol using the 'get_ticker_price_async' tool, or for a list of ticker symbols using the 'get_ticker_prices_async' tool."
         ),
-        instruction="You are an agent that retrieves the current stock price for a specified ticker symbol using the 'get_ticker_price' tool."
-        "You will be provided with a ticker symbol, and you should use the 'get_ticker_price' tool to return the current price."
+        instruction="You are an agent that retrieves the current stock price for a specified ticker symbol using the 'get_ticker_price_async' tool."
+        "You will be provided with a ticker symbol, and you should use the 'get_ticker_price_async' tool to return the current price."
+        "If you are given several ticker symbols, such as a watchlist or portfolio, use the 'get_ticker_prices_async' tool once with all of them instead of calling 'get_ticker_price_async' for each."
         "If the price is not found, return an error message."
         "NOTE: ALWAYS RETURN BACK TO THE ROOT AGENT AFTER FINALLY COMPLETING THE TASK, SO THAT IT CAN PROVIDE THE FINAL RESPONSE TO THE USER.",
-        tools=[get_ticker_price],
+        tools=[get_ticker_price_async, get_ticker_prices_async],
     )
-    print(f"Agent '{ticker_price.name}' created successfully.")
-except Exception as e:
-    print(f"Failed to create agent: {e}")
\ No newline at end of file
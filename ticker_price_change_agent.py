@@ -1,14 +1,63 @@
-import os
-from dotenv import load_dotenv
-import requests
-from google.adk.agents import LlmAgent
-
-load_dotenv()
-ALPHA_VANTAGE_API_KEY = os.getenv("ALPHA_VANTAGE_API_KEY")
+from .alpha_vantage import run_blocking, AlphaVantageError, AlphaVantageThrottled
+from .tracing import traced_tool
+from . import timeseries_store
 
 MODEL_GEMINI_1_5_FLASH = "gemini-1.5-flash"
 
+# Retrieve the daily bars of a ticker once and compute the price change over N trading days from them.
+# Returns the price change tool result, and the bars it was computed from or None if it failed, so that
+# other results, like the analysis agent's indicators, can be computed from the same bars.
+def get_price_change_and_series(ticker: str, days: int = 7) -> tuple:
+    # A change over zero or a negative number of days would compare the latest close with itself or a later one
+    if not isinstance(days, int) or days < 1:
+        return {
+            "status": "error",
+            "error_message": f"The number of days must be a whole number of at least 1, got {days!r}."
+        }, None
+
+    try:
+        series = timeseries_store.get_series(ticker)
+    except AlphaVantageThrottled:
+        return {
+            "status": "error",
+            "error_message": f"Alpha Vantage rate limit reached while retrieving price change information for '{ticker}'. Please try again later."
+        }, None
+    except AlphaVantageError:
+        return {
+            "status": "error",
+            "error_message": f"Failed to retrieve price change information for '{ticker}'."
+        }, None
+
+    if series is not None and len(series) > 0:
+        # The change over N days compares the latest close with the close N trading days before it
+        if len(series) > days:
+            latest = series[-1]
+            previous = series[-1 - days]
+            latest_price = float(latest["close"])
+            previous_price = float(previous["close"])
+            price_change = latest_price - previous_price
+            return {
+                "status": "success",
+                "ticker": ticker,
+                "price_change": price_change,
+                "latest_date": str(latest["date"]),
+                "latest_price": latest_price,
+                "previous_date": str(previous["date"]),
+                "previous_price": previous_price,
+            }, series
+        else:
+            return {
+                "status": "error",
+                "error_message": f"Not enough data available for '{ticker}' over {days} days."
+            }, None
+    else:
+        return {
+            "status": "error",
+            "error_message": f"No data found for ticker '{ticker}'."
+        }, None
+
 # Tool to retrieve the stock price change for a specified ticker symbol over a given number of days
+@traced_tool
 def get_ticker_price_change(ticker: str, days: int = 7) -> dict:
     """Retrieves the stock price change for a specified ticker symbol over a given number of days.
 
@@ -19,61 +68,37 @@ def get_ticker_price_change(ticker: str, days: int = 7) -> dict:
     Returns:
         dict: status with price change or error message.
     """
-    
-    response = requests.get(f"https://www.alphavantage.co/query?function=TIME_SERIES_DAILY&symbol={ticker}&apikey={ALPHA_VANTAGE_API_KEY}")
 
-    if response.status_code == 200:
-        data = response.json()
-        if "Time Series (Daily)" in data:
-            time_series = data["Time Series (Daily)"]
-            dates = sorted(time_series.keys(), reverse=True)
-            if len(dates) >= days:
-                # Get the latest and previous dates and their corresponding prices
-                latest_date = dates[0]
-                previous_date = dates[days - 1]
-                latest_price = float(time_series[latest_date]["4. close"])
-                previous_price = float(time_series[previous_date]["4. close"])
-                price_change = latest_price - previous_price
-                return {
-                    "status": "success",
-                    "ticker": ticker,
-                    "price_change": price_change,
-                    "latest_date": latest_date,
-                    "latest_price": latest_price,
-                    "previous_date": previous_date,
-                    "previous_price": previous_price,
-                }
-            else:
-                return {
-                    "status": "error",
-                    "error_message": f"Not enough data available for '{ticker}' over {days} days."
-                }
-        else:
-            return {
-                "status": "error",
-                "error_message": f"No data found for ticker '{ticker}'."
-            }
-    else:
-        return {
-            "status": "error",
-            "error_message": f"Failed to retrieve price change information for '{ticker}'."
-        }
+    return get_price_change_and_series(ticker, days)[0]
+
+# Async variant of the get_ticker_price_change tool, awaited by ADK without blocking the event loop
+@traced_tool
+async def get_ticker_price_change_async(ticker: str, days: int = 7) -> dict:
+    """Retrieves the stock price change for a specified ticker symbol over a given number of days.
+
+    Args:
+        ticker (str): The stock ticker symbol for which to retrieve the price change. This is to be retrieved using 'identify_ticker_agent' sub-agent.
+        days (int): The number of days over which to calculate the price change. Example: 1 for today, 7 for a week, 30 for a month, etc. Default is 7 days.
+
+    Returns:
+        dict: status with price change or error message.
+    """
+
+    return await run_blocking(get_ticker_price_change, ticker, days)
+
+# Create the agent that retrieves the stock price change for a specified ticker symbol using the get_ticker_price_change_async tool
+def create_agent():
+    from google.adk.agents import LlmAgent
 
-# Create the agent that retrieves the stock price change for a specified ticker symbol using the get_ticker_price_change tool  
-ticker_price_change = None
-try:
-    ticker_price_change = LlmAgent(
+    return LlmAgent(
         name="ticker_price_change_agent",
         model=MODEL_GEMINI_1_5_FLASH,
         description=(
-            "This agent retrieves the stock price change for a specified ticker symbol over a given number of days using the 'get_ticker_price_change' tool."
+            "This agent retrieves the stock price change for a specified ticker symbol over a given number of days using the 'get_ticker_price_change_async' tool."
         ),
-        instruction="You are an agent that retrieves the stock price change for a specified ticker symbol over a given number of days using the 'get_ticker_price_change' tool."
-        "You will be provided with a ticker symbol and the number of days, and you should use the 'get_ticker_price_change' tool to return the price change."
+        instruction="You are an agent that retrieves the stock price change for a specified ticker symbol over a given number of days using the 'get_ticker_price_change_async' tool."
+        "You will be provided with a ticker symbol and the number of days, and you should use the 'get_ticker_price_change_async' tool to return the price change."
         "If the price change is not found, return an error message."
         "NOTE: ALWAYS RETURN BACK TO THE ROOT AGENT AFTER FINALLY COMPLETING THE TASK, SO THAT IT CAN PROVIDE THE FINAL RESPONSE TO THE USER.",
-        tools=[get_ticker_price_change],
+        tools=[get_ticker_price_change_async],
     )
-    print(f"Agent '{ticker_price_change.name}' created successfully.")
-except Exception as e:
-    print(f"Failed to create agent: {e}")
\ No newline at end of file
@@ -0,0 +1,164 @@
+import os
+import atexit
+import shutil
+import tempfile
+import threading
+import numpy as np
+from datetime import datetime, timezone
+from .config import getenv
+from .alpha_vantage import fetch, includes_last_close, AlphaVantageError
+from .replay import ALPHA_VANTAGE_REPLAY_MODE
+
+# Directory holding one memory-mappable .npy file of daily bars per ticker
+TIMESERIES_STORE_DIR = getenv("TIMESERIES_STORE_DIR")
+
+# Recorded and replayed runs start from an empty store of their own, removed on exit, so that the daily
+# series they request do not depend on the bars earlier runs left in the default store
+if not TIMESERIES_STORE_DIR and ALPHA_VANTAGE_REPLAY_MODE in ("record", "replay"):
+    TIMESERIES_STORE_DIR = tempfile.mkdtemp(prefix="timeseries-")
+    atexit.register(shutil.rmtree, TIMESERIES_STORE_DIR, ignore_errors=True)
+elif not TIMESERIES_STORE_DIR:
+    TIMESERIES_STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "timeseries")
+
+# Output size of the first download of a ticker. 'compact' returns the last 100 bars, 'full' (a premium
+# feature) the whole history. Later updates always use 'compact', which only needs to cover the new bars.
+INITIAL_OUTPUTSIZE = getenv("TIMESERIES_INITIAL_OUTPUTSIZE", "compact")
+
+# Daily bars of a ticker, in ascending date order
+BAR_DTYPE = np.dtype([
+    ("date", "M8[D]"),
+    ("open", "f8"),
+    ("high", "f8"),
+    ("low", "f8"),
+    ("close", "f8"),
+    ("volume", "f8"),
+])
+
+_locks = {}
+_locks_lock = threading.Lock()
+
+
+def _lock_for(ticker: str) -> threading.Lock:
+    with _locks_lock:
+        return _locks.setdefault(ticker, threading.Lock())
+
+
+def _path(ticker: str) -> str:
+    # Ticker symbols may contain '.' or '-' but never path separators
+    return os.path.join(TIMESERIES_STORE_DIR, f"{ticker.upper().replace(os.sep, '_')}.npy")
+
+
+def parse_daily_series(time_series: dict) -> np.ndarray:
+    """Converts the 'Time Series (Daily)' object of a TIME_SERIES_DAILY response to an array of bars.
+
+    Args:
+        time_series (dict): Mapping of 'YYYY-MM-DD' dates to bars with '1. open' ... '5. volume' fields.
+
+    Returns:
+        np.ndarray: Bars with BAR_DTYPE, in ascending date order.
+    """
+
+    bars = np.empty(len(time_series), dtype=BAR_DTYPE)
+    bars["date"] = np.array(list(time_series.keys()), dtype="M8[D]")
+    values = np.array([
+        (bar["1. open"], bar["2. high"], bar["3. low"], bar["4. close"], bar["5. volume"])
+        for bar in time_series.values()
+    ], dtype="f8").reshape(-1, 5)
+    for column, field in enumerate(("open", "high", "low", "close", "volume")):
+        bars[field] = values[:, column]
+    return bars[np.argsort(bars["date"], kind="stable")]
+
+
+def load(ticker: str):
+    """Returns the stored bars of a ticker, memory-mapped read-only, or None if the ticker has not been stored."""
+
+    try:
+        return np.load(_path(ticker), mmap_mode="r")
+    except FileNotFoundError:
+        return None
+
+
+def _save(ticker: str, bars: np.ndarray) -> None:
+    # Write to a temporary file and swap it in, so readers never see a half-written file.
+    # Readers holding a memory map of the previous file keep a consistent view of it.
+    os.makedirs(TIMESERIES_STORE_DIR, exist_ok=True)
+    path = _path(ticker)
+    # A unique name, as worker processes sharing the directory may save the same ticker at the same time
+    fd, tmp_path = tempfile.mkstemp(dir=TIMESERIES_STORE_DIR, prefix=f"{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, bars)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _is_fresh(ticker: str) -> bool:
+    # Stored bars are up to date if they were fetched after the most recent market close and include its bar,
+    # which Alpha Vantage publishes some time after the close
+    try:
+        fetched_at = datetime.fromtimestamp(os.path.getmtime(_path(ticker)), timezone.utc)
+    except FileNotFoundError:
+        return False
+    bars = load(ticker)
+    last_date = str(bars["date"][-1]) if bars is not None and len(bars) > 0 else ""
+    return includes_last_close(last_date, fetched_at)
+
+
+def merge_bars(stored: np.ndarray, new: np.ndarray) -> np.ndarray:
+    """Appends newly fetched bars to the stored ones. New bars replace stored bars of the same dates.
+
+    If the new bars do not reach back to the last stored bar, there would be a gap, so only the new bars are kept.
+    """
+
+    if stored is None or len(stored) == 0:
+        return new
+    if len(new) == 0:
+        return np.asarray(stored)
+    if new["date"][0] > stored["date"][-1] + np.timedelta64(7, "D"):
+        return new
+    keep = stored[stored["date"] < new["date"][0]]
+    return np.concatenate([keep, new])
+
+
+def get_series(ticker: str):
+    """Returns the daily bars of a ticker, fetching only the bars added since the last update.
+
+    Bars fetched after the most recent market close, and including its bar, are served from the
+    store without any upstream call. If a refresh fails, the stored bars are returned when there are any.
+
+    Args:
+        ticker (str): The stock ticker symbol.
+
+    Returns:
+        np.ndarray: Bars with BAR_DTYPE in ascending date order, or None if Alpha Vantage has no data for the ticker.
+
+    Raises:
+        AlphaVantageThrottled: If the call quota is exhausted and no stored bars exist.
+        AlphaVantageError: If the download fails and no stored bars exist.
+    """
+
+    ticker = ticker.strip().upper()
+    if _is_fresh(ticker):
+        return load(ticker)
+
+    with _lock_for(ticker):
+        # Another thread may have refreshed the ticker while this one waited for the lock
+        if _is_fresh(ticker):
+            return load(ticker)
+
+        stored = load(ticker)
+        outputsize = "compact" if stored is not None else INITIAL_OUTPUTSIZE
+        try:
+            data = fetch("TIME_SERIES_DAILY", symbol=ticker, outputsize=outputsize)
+        except AlphaVantageError:
+            if stored is not None:
+                return stored
+            raise
+
+        if "Time Series (Daily)" not in data:
+            return stored
+        bars = merge_bars(stored, parse_daily_series(data["Time Series (Daily)"]))
+        _save(ticker, bars)
+        return load(ticker)
@@ -0,0 +1,157 @@
+import os
+import json
+import inspect
+import logging
+import functools
+import threading
+import contextlib
+from .config import getenv
+
+logger = logging.getLogger(__name__)
+
+# Where spans are exported: 'none' (spans still go to any tracer provider already installed, e.g. by
+# 'adk web'), 'memory' (kept in process, see 'memory_exporter') or 'jsonl' (appended to TRACE_JSONL_PATH)
+TRACE_EXPORTER = getenv("TRACE_EXPORTER", "none").lower()
+
+# File the 'jsonl' exporter appends one span per line to
+TRACE_JSONL_PATH = getenv("TRACE_JSONL_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "traces.jsonl"))
+
+# Tracer used by 'start_span', None until 'configure_tracing' is called. OpenTelemetry is only imported
+# then, so tool functions used without tracing pay neither the import nor any per-call cost.
+_tracer = None
+_memory_exporter = None
+_configure_lock = threading.Lock()
+
+
+class _NoopSpan:
+    def set_attribute(self, key, value):
+        pass
+
+    def set_attributes(self, attributes):
+        pass
+
+    def add_event(self, name, attributes=None):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def configure_tracing(exporter: str = TRACE_EXPORTER, path: str = TRACE_JSONL_PATH) -> None:
+    """Enables the spans of the tools and the Alpha Vantage client and sets up a local exporter.
+
+    If an OpenTelemetry SDK tracer provider is already installed, e.g. by 'adk web', the exporter is added to
+    it; otherwise a new provider is installed. ADK's own agent, model and tool call spans go to the same
+    provider, so a trace covers a whole user request. With 'none' and no provider installed, tracing stays
+    disabled. Once tracing is enabled, calling this again does nothing.
+
+    Args:
+        exporter (str): 'none', 'memory' or 'jsonl'.
+        path (str): The file the 'jsonl' exporter appends to.
+    """
+
+    global _tracer, _memory_exporter
+    with _configure_lock:
+        if _tracer is not None:
+            return
+        from opentelemetry import trace
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import SimpleSpanProcessor, BatchSpanProcessor
+
+        provider = trace.get_tracer_provider()
+        if not isinstance(provider, TracerProvider):
+            # Without an exporter and without a provider installed by someone else, nothing would collect the spans
+            if exporter == "none":
+                return
+            provider = TracerProvider()
+            trace.set_tracer_provider(provider)
+
+        if exporter == "memory":
+            from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+            _memory_exporter = InMemorySpanExporter()
+            provider.add_span_processor(SimpleSpanProcessor(_memory_exporter))
+        elif exporter == "jsonl":
+            from .tracing_export import JsonlSpanExporter
+            provider.add_span_processor(BatchSpanProcessor(JsonlSpanExporter(path)))
+        elif exporter != "none":
+            raise ValueError(f"Unknown trace exporter '{exporter}'.")
+
+        _tracer = trace.get_tracer(__name__)
+        logger.info("Tracing enabled with the '%s' exporter.", exporter)
+
+
+def memory_exporter():
+    """Returns the in-memory span exporter when tracing was configured with 'memory', otherwise None."""
+
+    return _memory_exporter
+
+
+def flush() -> None:
+    """Exports every finished span that is still buffered, e.g. before reading the JSONL file."""
+
+    if _tracer is not None:
+        from opentelemetry import trace
+        provider = trace.get_tracer_provider()
+        if hasattr(provider, "force_flush"):
+            provider.force_flush()
+
+
+@contextlib.contextmanager
+def start_span(name: str, **attributes):
+    """Starts a span as a child of the current one, or yields a no-op span when tracing is not configured."""
+
+    if _tracer is None:
+        yield _NOOP_SPAN
+        return
+    with _tracer.start_as_current_span(name, attributes=attributes) as span:
+        yield span
+
+
+def _record_call(span, signature, args: tuple, kwargs: dict) -> None:
+    try:
+        bound = signature.bind_partial(*args, **kwargs)
+    except TypeError:
+        return
+    span.set_attribute("tool.args", json.dumps(bound.arguments, default=str))
+
+
+def _record_result(span, result) -> None:
+    if isinstance(result, dict):
+        status = result.get("status", "")
+        span.set_attribute("tool.status", status)
+        if status == "error":
+            span.set_attribute("tool.error_message", result.get("error_message", ""))
+    span.set_attribute("tool.response_bytes", len(json.dumps(result, default=str).encode()))
+
+
+def traced_tool(func):
+    """Wraps a tool function, sync or async, in a 'tool [name]' span with its arguments, status and response size.
+
+    The wrapper keeps the function's name, signature and docstring, which ADK uses to declare the tool.
+    """
+
+    name = f"tool [{func.__name__}]"
+    signature = inspect.signature(func)
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            with start_span(name) as span:
+                if span is not _NOOP_SPAN:
+                    _record_call(span, signature, args, kwargs)
+                result = await func(*args, **kwargs)
+                if span is not _NOOP_SPAN:
+                    _record_result(span, result)
+                return result
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with start_span(name) as span:
+            if span is not _NOOP_SPAN:
+                _record_call(span, signature, args, kwargs)
+            result = func(*args, **kwargs)
+            if span is not _NOOP_SPAN:
+                _record_result(span, result)
+            return result
+    return wrapper
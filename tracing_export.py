@@ -0,0 +1,201 @@
+# Local span export and offline analysis of traces recorded by 'tracing.configure_tracing'.
+#
+# Spans are stored as one JSON object per line. Each user request is one trace, rooted at ADK's
+# 'invocation' span, with ADK's agent, model ('call_llm') and tool call spans, the 'tool [...]'
+# spans of the tool functions and the 'alpha_vantage.*' spans of the upstream client below it.
+#
+# Summarise a trace file per request, or print folded stacks for a flame graph, with:
+#   python -m <agent_package>.tracing_export summarize data/traces.jsonl
+#   python -m <agent_package>.tracing_export folded data/traces.jsonl > traces.folded
+
+import os
+import sys
+import json
+import argparse
+import threading
+from collections import defaultdict
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+
+def span_to_dict(span) -> dict:
+    """Converts a finished OpenTelemetry span to a JSON-friendly dict."""
+
+    context = span.get_span_context()
+    return {
+        "name": span.name,
+        "trace_id": format(context.trace_id, "032x"),
+        "span_id": format(context.span_id, "016x"),
+        "parent_id": format(span.parent.span_id, "016x") if span.parent else None,
+        "start_time": span.start_time,
+        "end_time": span.end_time,
+        "duration_ms": (span.end_time - span.start_time) / 1e6,
+        "status": span.status.status_code.name,
+        "attributes": {key: list(value) if isinstance(value, tuple) else value for key, value in (span.attributes or {}).items()},
+    }
+
+
+class JsonlSpanExporter(SpanExporter):
+    """Appends finished spans to a JSONL file, one span per line.
+
+    Args:
+        path (str): The file to append to. Its directory is created if needed.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+    def export(self, spans) -> SpanExportResult:
+        lines = "".join(json.dumps(span_to_dict(span), default=str) + "\n" for span in spans)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        pass
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return True
+
+
+def load_spans(path: str) -> list:
+    """Reads the spans written by 'JsonlSpanExporter'."""
+
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _group_by_trace(spans: list) -> dict:
+    traces = defaultdict(list)
+    for span in spans:
+        traces[span["trace_id"]].append(span)
+    return traces
+
+
+def _tool_name(span_name: str) -> str:
+    return span_name[span_name.index("[") + 1:-1]
+
+
+def summarize_request(spans: list, agent_names=()) -> dict:
+    """Summarises the spans of one trace, i.e. one user request.
+
+    Args:
+        spans (list): The spans of the trace, as dicts.
+        agent_names: Names of the agents wrapped as AgentTools, to tell sub-agent calls from function tool calls.
+
+    Returns:
+        dict: Wall time, model calls and their own time, tool and sub-agent calls, upstream calls, latency, queue
+            wait, response bytes, retries and response cache hits and misses.
+    """
+
+    ids = {span["span_id"] for span in spans}
+    roots = [span for span in spans if span["parent_id"] not in ids]
+    children_ms = defaultdict(float)
+    for span in spans:
+        children_ms[span["parent_id"]] += span["duration_ms"]
+    start = min(span["start_time"] for span in spans)
+    end = max(span["end_time"] for span in spans)
+    summary = {
+        "trace_id": spans[0]["trace_id"],
+        "root": roots[0]["name"] if len(roots) == 1 else None,
+        "duration_ms": round((end - start) / 1e6, 3),
+        "llm_calls": 0, "llm_ms": 0.0,
+        "tool_calls": 0, "agent_tool_calls": 0, "tools": defaultdict(int),
+        "upstream_calls": 0, "upstream_ms": 0.0, "queue_wait_ms": 0.0, "response_bytes": 0, "retries": 0,
+        "cache_hits": 0, "cache_misses": 0,
+        "errors": 0,
+    }
+    for span in spans:
+        name, attributes = span["name"], span["attributes"]
+        if span["status"] == "ERROR":
+            summary["errors"] += 1
+        if name == "call_llm":
+            # ADK runs the tools a model response asks for inside the 'call_llm' span, so only its self time is the model's
+            summary["llm_calls"] += 1
+            summary["llm_ms"] += max(0.0, span["duration_ms"] - children_ms[span["span_id"]])
+        elif name.startswith("tool_call ["):
+            # ADK's span around every tool the model calls, function tools and AgentTools alike
+            tool = _tool_name(name)
+            summary["tools"][tool] += 1
+            if tool in agent_names:
+                summary["agent_tool_calls"] += 1
+            else:
+                summary["tool_calls"] += 1
+        elif name == "alpha_vantage.http":
+            summary["upstream_calls"] += 1
+            summary["upstream_ms"] += span["duration_ms"]
+            summary["response_bytes"] += attributes.get("http.response_bytes", 0)
+        elif name == "alpha_vantage.upstream":
+            summary["retries"] += attributes.get("alpha_vantage.retries", 0)
+            summary["queue_wait_ms"] += attributes.get("alpha_vantage.queue_wait_ms", 0.0)
+        elif name == "alpha_vantage.fetch":
+            cache = attributes.get("alpha_vantage.cache")
+            if cache == "hit":
+                summary["cache_hits"] += 1
+            elif cache == "miss":
+                summary["cache_misses"] += 1
+    for key in ("llm_ms", "upstream_ms", "queue_wait_ms"):
+        summary[key] = round(summary[key], 3)
+    summary["tools"] = dict(summary["tools"])
+    return summary
+
+
+def summarize_requests(spans: list, agent_names=None) -> list:
+    """Summarises every trace in a list of spans with 'summarize_request', oldest request first."""
+
+    if agent_names is None:
+        from .registry import AGENT_MODULES
+        agent_names = AGENT_MODULES
+    traces = _group_by_trace(spans)
+    summaries = [summarize_request(trace_spans, agent_names) for trace_spans in traces.values()]
+    return sorted(summaries, key=lambda summary: min(s["start_time"] for s in traces[summary["trace_id"]]))
+
+
+def folded_stacks(spans: list) -> dict:
+    """Aggregates the self time of every span by its stack of span names, in microseconds.
+
+    The result can be written as 'name;name;name value' lines, the folded stack format read by
+    flame graph tools such as flamegraph.pl and speedscope. Children that ran concurrently can
+    together outlast their parent, in which case the parent's self time is counted as zero.
+    """
+
+    by_id = {span["span_id"]: span for span in spans}
+    children_ns = defaultdict(int)
+    for span in spans:
+        if span["parent_id"] in by_id:
+            children_ns[span["parent_id"]] += span["end_time"] - span["start_time"]
+
+    stacks = defaultdict(int)
+    for span in spans:
+        names = []
+        current = span
+        while current is not None:
+            names.append(current["name"].replace(";", ","))
+            current = by_id.get(current["parent_id"])
+        self_ns = max(0, span["end_time"] - span["start_time"] - children_ns[span["span_id"]])
+        stacks[";".join(reversed(names))] += self_ns // 1000
+    return dict(stacks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyse spans recorded by the JSONL trace exporter.")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    summarize = subcommands.add_parser("summarize", help="Print a summary of each request.")
+    summarize.add_argument("path")
+    folded = subcommands.add_parser("folded", help="Print folded stacks for a flame graph.")
+    folded.add_argument("path")
+    args = parser.parse_args()
+
+    spans = load_spans(args.path)
+    if args.command == "summarize":
+        for summary in summarize_requests(spans):
+            print(json.dumps(summary))
+    elif args.command == "folded":
+        for stack, micros in sorted(folded_stacks(spans).items()):
+            sys.stdout.write(f"{stack} {micros}\n")
+
+
+if __name__ == "__main__":
+    main()